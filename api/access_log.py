@@ -0,0 +1,92 @@
+"""Queued log handlers and the structured, sampled access log.
+
+Log calls only put the record on a queue; a listener thread formats and
+writes it, so a slow stdout or disk never stalls the event loop. Access log
+entries are serialized to JSON on that thread as well.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+# One JSON line per request on the "api.access" logger
+ACCESS_LOG = os.getenv("ACCESS_LOG", "true").strip().lower() in ("1", "true", "yes")
+# Share of requests logged; server errors (5xx) are always logged
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+# Log every request's method, path and headers (API key redacted)
+LOG_REQUEST_HEADERS = os.getenv("LOG_REQUEST_HEADERS", "false").strip().lower() in ("1", "true", "yes")
+
+ACCESS_LOGGER = "api.access"
+REDACTED_HEADERS = frozenset({"x-api-key", "authorization", "cookie"})
+
+access_logger = logging.getLogger(ACCESS_LOGGER)
+
+_handler: QueueHandler | None = None
+_listener: QueueListener | None = None
+
+
+class _Formatter(logging.Formatter):
+    """Plain text for application logs, a JSON object per access log entry."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = getattr(record, "access", None)
+        if entry is None:
+            return super().format(record)
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+        return json.dumps({"time": timestamp, **entry})
+
+
+def configure_logging() -> None:
+    """Route all logging through a queue drained by a background thread."""
+    global _handler, _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(_Formatter(logging.BASIC_FORMAT))
+    records = queue.SimpleQueue()
+    _handler = QueueHandler(records)
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    # uvicorn's access log duplicates ours; its other logs go through the
+    # queue too instead of uvicorn's own stream handlers
+    logging.getLogger("uvicorn.access").disabled = True
+    uvicorn_logger = logging.getLogger("uvicorn")
+    uvicorn_logger.handlers.clear()
+    uvicorn_logger.propagate = True
+    _listener = QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _handler, _listener
+    if _listener is not None:
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+    _handler = _listener = None
+
+
+def sample(status: int) -> float | None:
+    """Sample rate applied to a request with this status, or None to skip it."""
+    if not ACCESS_LOG:
+        return None
+    rate = 1.0 if status >= 500 else ACCESS_LOG_SAMPLE_RATE
+    return rate if random.random() < rate else None
+
+
+def log_access(sample_rate: float, **entry) -> None:
+    """Queue one access log entry; it is turned into JSON off the event loop."""
+    access_logger.info("access", extra={"access": {**entry, "sample_rate": sample_rate}})
+
+
+def redacted_headers(headers) -> dict:
+    return {
+        name: "[redacted]" if name in REDACTED_HEADERS else value
+        for name, value in headers.items()
+    }
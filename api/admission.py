@@ -0,0 +1,84 @@
+"""Admission control: turn away renders that would wait too long in the queue."""
+
+import math
+import os
+import re
+import threading
+
+# Reject interactive renders whose projected queue wait is above this; 0 disables
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "30"))
+# Assumed render time before any render of a theme has been measured
+RENDER_ESTIMATE_INITIAL_SECONDS = float(os.getenv("RENDER_ESTIMATE_INITIAL_SECONDS", "2"))
+# Weight of the newest measurement in the moving average
+RENDER_ESTIMATE_ALPHA = 0.2
+
+# `theme: sb2nov` inside rendercv YAML, without parsing the document
+THEME_PATTERN = re.compile(r"^\s+theme:\s*['\"]?([\w-]+)", re.MULTILINE)
+
+
+def document_theme(document: str | dict) -> str | None:
+    """The rendercv theme a document asks for, or None for the default."""
+    if isinstance(document, dict):
+        return (document.get("design") or {}).get("theme")
+    match = THEME_PATTERN.search(document)
+    return match.group(1) if match else None
+
+
+class AdmissionController:
+    """Moving render-time estimates per theme, and the work they put ahead of a new request.
+
+    Every render adds its estimated duration to the pending work when it is
+    queued and removes it once it finishes. With ``concurrency`` renders in
+    parallel, a new render waits about ``pending / concurrency`` seconds.
+    """
+
+    def __init__(self, concurrency: int, max_wait: float = ADMISSION_MAX_WAIT_SECONDS,
+                 initial: float = RENDER_ESTIMATE_INITIAL_SECONDS, alpha: float = RENDER_ESTIMATE_ALPHA):
+        self.concurrency = max(concurrency, 1)
+        self.max_wait = max_wait
+        self.alpha = alpha
+        self._overall = initial
+        self._themes: dict[str, float] = {}
+        self._pending = 0.0
+        self._lock = threading.Lock()
+
+    def estimate(self, theme: str | None) -> float:
+        return self._themes.get(theme, self._overall)
+
+    def observe(self, theme: str | None, seconds: float) -> None:
+        """Fold a finished render's duration into the estimates."""
+        with self._lock:
+            self._overall += self.alpha * (seconds - self._overall)
+            if theme is not None:
+                previous = self._themes.get(theme, seconds)
+                self._themes[theme] = previous + self.alpha * (seconds - previous)
+
+    def start(self, theme: str | None) -> float:
+        """Count a queued render as pending; returns the amount to ``finish`` with."""
+        estimate = self.estimate(theme)
+        with self._lock:
+            self._pending += estimate
+        return estimate
+
+    def finish(self, estimate: float) -> None:
+        with self._lock:
+            self._pending = max(self._pending - estimate, 0.0)
+
+    def projected_wait(self) -> float:
+        return self._pending / self.concurrency
+
+    def retry_after(self) -> int | None:
+        """Seconds until the projected wait is back within budget, or None to admit."""
+        wait = self.projected_wait()
+        if not self.max_wait or wait <= self.max_wait:
+            return None
+        # Pending work drains at `concurrency` seconds per second
+        return max(math.ceil(wait - self.max_wait), 1)
+
+    def stats(self) -> dict:
+        return {
+            "projected_wait_seconds": round(self.projected_wait(), 3),
+            "max_wait_seconds": self.max_wait,
+            "estimate_seconds": round(self._overall, 3),
+            "theme_estimate_seconds": {theme: round(value, 3) for theme, value in self._themes.items()},
+        }
@@ -0,0 +1,240 @@
+"""Content-addressed cache for rendered PDFs."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import date
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import yaml
+
+from api.serialization import load_yaml_without_aliases
+
+logger = logging.getLogger(__name__)
+
+# "memory" (LRU in this process), "disk" (shared directory) or "none"
+PDF_CACHE_BACKEND = os.getenv("PDF_CACHE_BACKEND", "memory").strip().lower()
+PDF_CACHE_MAX_MB = float(os.getenv("PDF_CACHE_MAX_MB", "64"))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "/tmp/resume-generator-cache")
+
+try:
+    RENDERCV_VERSION = version("rendercv")
+except PackageNotFoundError:
+    RENDERCV_VERSION = "unknown"
+
+
+def content_key(document: str | dict) -> str:
+    """Hash of the document (rendercv YAML text or dict) and the rendercv version.
+
+    The document already carries the theme (design.theme). YAML text is
+    parsed first, so it hashes like the equivalent dict whatever its
+    formatting. Text that doesn't parse, or uses aliases (which could expand
+    enormously), is hashed as it is. Parsing takes a while for big
+    documents, so call this off the event loop.
+    """
+    if isinstance(document, str):
+        try:
+            document = load_yaml_without_aliases(document)
+        except yaml.YAMLError:
+            pass
+    if not isinstance(document, str):
+        # Key order matters: it decides the order of sections in the PDF,
+        # so keys aren't sorted
+        document = json.dumps(document, ensure_ascii=False, default=str)
+    digest = hashlib.sha256()
+    digest.update(f"rendercv={RENDERCV_VERSION}\n".encode())
+    digest.update(document.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cache_key(document: str | dict) -> str:
+    """Hash of everything that determines the rendered PDF.
+
+    rendercv stamps the current date into the document, so the date is part
+    of the key as well as the content.
+    """
+    return hashlib.sha256(f"date={date.today().isoformat()}\n{content_key(document)}".encode()).hexdigest()
+
+
+class CacheBackend:
+    """Base class keeping hit/miss counters for a cache backend."""
+
+    name = "none"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str) -> bytes | Path | None:
+        """Return the cached PDF as bytes, or as a file path for disk backends."""
+        data = self._get(key)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def get(self, key: str) -> bytes | None:
+        data = self.lookup(key)
+        return data.read_bytes() if isinstance(data, Path) else data
+
+    def set(self, key: str, data: bytes) -> None:
+        self._set(key, data)
+
+    def set_file(self, key: str, path: Path) -> None:
+        """Store a rendered PDF straight from disk."""
+        pass
+
+    def lock_path(self, key: str) -> Path | None:
+        """Lock file for rendering key, for backends shared between processes."""
+        return None
+
+    def _get(self, key: str) -> bytes | Path | None:
+        return None
+
+    def _set(self, key: str, data: bytes) -> None:
+        pass
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache bounded by the total size of stored PDFs."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def _set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def set_file(self, key: str, path: Path) -> None:
+        if path.stat().st_size <= self.max_bytes:
+            self._set(key, path.read_bytes())
+
+    def stats(self) -> dict:
+        return {**super().stats(), "entries": len(self._items), "bytes": self.size}
+
+
+class DiskCache(CacheBackend):
+    """Directory of ``<key>.pdf`` files, evicting least recently used first.
+
+    Recency is tracked through file mtimes, so the directory can be shared
+    by several uvicorn workers.
+    """
+
+    name = "disk"
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def _get(self, key: str) -> Path | None:
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def lock_path(self, key: str) -> Path:
+        return self._path(key).with_suffix(".lock")
+
+    def _tmp_path(self, key: str) -> Path:
+        return self._path(key).with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+
+    def _set(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        tmp_path = self._tmp_path(key)
+        tmp_path.write_bytes(data)
+        # Atomic rename so readers never see a partially written PDF
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def set_file(self, key: str, path: Path) -> None:
+        if path.stat().st_size > self.max_bytes:
+            return
+        tmp_path = self._tmp_path(key)
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> dict:
+        return {**super().stats(), "directory": str(self.directory)}
+
+
+_cache: CacheBackend | None = None
+
+
+def get_cache() -> CacheBackend:
+    """Return the configured cache backend, creating it on first use."""
+    global _cache
+    if _cache is None:
+        max_bytes = int(PDF_CACHE_MAX_MB * 1024 * 1024)
+        if PDF_CACHE_BACKEND == "memory":
+            _cache = MemoryCache(max_bytes)
+        elif PDF_CACHE_BACKEND == "disk":
+            _cache = DiskCache(PDF_CACHE_DIR, max_bytes)
+        elif PDF_CACHE_BACKEND == "none":
+            _cache = CacheBackend()
+        else:
+            raise RuntimeError(
+                f"Unknown PDF_CACHE_BACKEND '{PDF_CACHE_BACKEND}'. Use one of: memory, disk, none"
+            )
+        logger.info(f"Using '{_cache.name}' PDF cache")
+    return _cache
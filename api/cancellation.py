@@ -0,0 +1,43 @@
+"""Cancellation of renders whose caller has gone away.
+
+``render()`` runs each render with its own ``threading.Event`` in a context
+variable, which ``asyncio.to_thread`` carries into the render thread. When
+the caller is cancelled the event is set; engines check it between steps
+and kill the process doing the work, so the render slot frees up early.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# How often blocking waits inside a render look for a cancellation
+CANCEL_POLL_SECONDS = 0.1
+
+
+class RenderCancelled(Exception):
+    """Raised inside a render whose caller no longer wants the result."""
+
+
+_cancel_event: ContextVar[threading.Event | None] = ContextVar("render_cancel_event", default=None)
+
+
+@contextmanager
+def cancel_scope():
+    """Give renders started inside this block an event that cancels them."""
+    event = threading.Event()
+    token = _cancel_event.set(event)
+    try:
+        yield event
+    finally:
+        _cancel_event.reset(token)
+
+
+def cancel_requested() -> bool:
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def check_cancelled() -> None:
+    """Raise RenderCancelled if the current render has been cancelled."""
+    if cancel_requested():
+        raise RenderCancelled()
@@ -0,0 +1,345 @@
+"""Asynchronous render jobs: submit, poll, fetch artifacts, get a callback."""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+from urllib.parse import urlparse
+
+from fastapi import HTTPException
+
+from api.rendering import render
+
+logger = logging.getLogger(__name__)
+
+# "memory" keeps jobs in this process; "sqlite" persists them in JOB_DB_PATH
+# so queued jobs survive a restart.
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory").strip().lower()
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "/tmp/resume-generator-jobs.sqlite3")
+# Artifacts of finished jobs, one directory per job; the stores keep only names
+JOB_ARTIFACT_DIR = os.getenv("JOB_ARTIFACT_DIR", "/tmp/resume-generator-jobs")
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+# Finished jobs and their artifacts are dropped after this many seconds
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+# Callbacks may only target these hosts
+JOB_CALLBACK_HOSTS = [
+    host.strip() for host in os.getenv("JOB_CALLBACK_HOSTS", "localhost,127.0.0.1").split(",")
+]
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def check_callback_url(url: str) -> str:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or parsed.hostname not in JOB_CALLBACK_HOSTS:
+        raise ValueError(f"Callback URL must be http(s) on one of: {', '.join(JOB_CALLBACK_HOSTS)}")
+    return url
+
+
+class MemoryJobStore:
+    """Jobs and artifact names held in process memory."""
+
+    def __init__(self):
+        self._jobs: dict[str, dict] = {}
+        self._artifacts: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: dict) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updated=time.time())
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def unfinished(self) -> list[dict]:
+        return []
+
+    def save_artifacts(self, job_id: str, names: list[str]) -> None:
+        with self._lock:
+            self._artifacts[job_id] = list(names)
+
+    def artifact_names(self, job_id: str) -> list[str]:
+        with self._lock:
+            return list(self._artifacts.get(job_id, []))
+
+    def purge(self, older_than: float) -> list[str]:
+        """Drop finished jobs last updated before older_than and return their ids."""
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["status"] in (DONE, FAILED) and job["updated"] < older_than
+            ]
+            for job_id in expired:
+                self._jobs.pop(job_id)
+                self._artifacts.pop(job_id, None)
+        return expired
+
+
+class SqliteJobStore:
+    """Jobs and artifact names in a local SQLite file; no external services needed."""
+
+    FIELDS = ("id", "status", "priority", "yaml_content", "formats", "stem",
+              "callback_url", "error", "created", "updated")
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT, priority INTEGER,"
+                " yaml_content TEXT, formats TEXT, stem TEXT, callback_url TEXT, error TEXT,"
+                " created REAL, updated REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts (job_id TEXT, name TEXT, PRIMARY KEY (job_id, name))"
+            )
+
+    def _row_to_job(self, row) -> dict:
+        job = dict(zip(self.FIELDS, row))
+        job["formats"] = json.loads(job["formats"])
+        return job
+
+    def create(self, job: dict) -> None:
+        values = {**job, "formats": json.dumps(job["formats"])}
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO jobs VALUES ({', '.join('?' * len(self.FIELDS))})",
+                [values.get(field) for field in self.FIELDS],
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?", [*fields.values(), job_id]
+            )
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def unfinished(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM jobs WHERE status IN (?, ?) ORDER BY created",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def save_artifacts(self, job_id: str, names: list[str]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO artifacts (job_id, name) VALUES (?, ?)",
+                [(job_id, name) for name in names],
+            )
+
+    def artifact_names(self, job_id: str) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name FROM artifacts WHERE job_id = ? ORDER BY rowid", (job_id,)
+            ).fetchall()
+        return [name for (name,) in rows]
+
+    def purge(self, older_than: float) -> list[str]:
+        """Drop finished jobs last updated before older_than and return their ids."""
+        with self._lock, self._conn:
+            expired = [
+                job_id for (job_id,) in self._conn.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ?",
+                    (DONE, FAILED, older_than),
+                )
+            ]
+            self._conn.executemany("DELETE FROM artifacts WHERE job_id = ?", [(job_id,) for job_id in expired])
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+        return expired
+
+
+class JobQueue:
+    """Bounded priority queue of render jobs worked off by background tasks.
+
+    Higher ``priority`` runs first; equal priorities run in submission order.
+    ``start`` runs the workers in the current event loop (at app startup, or
+    on the first submit) and requeues jobs a previous run left unfinished.
+    Store calls run in a thread, since the SQLite store blocks. Artifacts
+    are moved to a directory per job under ``artifact_dir`` rather than
+    held in memory.
+    """
+
+    def __init__(self, store, max_size: int = 100, workers: int = 1, artifact_dir: str | None = None):
+        self.store = store
+        self.max_size = max_size
+        self.workers = workers
+        self.artifact_dir = Path(artifact_dir or JOB_ARTIFACT_DIR)
+        self._counter = itertools.count()
+        self._queue: asyncio.PriorityQueue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._loop = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue(self.max_size)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        # Pick up work left behind by a previous run (SQLite backend)
+        unfinished = await asyncio.to_thread(self.store.unfinished)
+        for job in unfinished[: self.max_size]:
+            await asyncio.to_thread(self.store.update, job["id"], status=QUEUED)
+            self._queue.put_nowait((-job["priority"], next(self._counter), job["id"]))
+        if unfinished:
+            logger.info(f"Requeued {min(len(unfinished), self.max_size)} unfinished jobs")
+
+    def stop(self) -> None:
+        """Cancel the workers; running jobs stay unfinished and are requeued on the next start."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._loop = None
+
+    async def submit(self, yaml_content: str, formats: list[str], stem: str,
+                     priority: int = 0, callback_url: str | None = None) -> dict:
+        await self.start()
+        if self._queue.full():
+            raise HTTPException(status_code=503, detail="Job queue is full, try again later")
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "priority": priority,
+            "yaml_content": yaml_content,
+            "formats": list(formats),
+            "stem": stem,
+            "callback_url": callback_url,
+            "error": None,
+            "created": now,
+            "updated": now,
+        }
+        await asyncio.to_thread(self.store.create, job)
+        self._queue.put_nowait((-priority, next(self._counter), job["id"]))
+        return job
+
+    async def _work(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception(f"Job {job_id} crashed")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None:
+            return
+        await asyncio.to_thread(self.store.update, job_id, status=RUNNING)
+        try:
+            result = await render(job["yaml_content"], job["formats"])
+            try:
+                names = await asyncio.to_thread(self._keep_artifacts, job_id, result, job["stem"])
+            finally:
+                result.cleanup()
+            await asyncio.to_thread(self.store.save_artifacts, job_id, names)
+        except HTTPException as e:
+            await asyncio.to_thread(self.store.update, job_id, status=FAILED, error=str(e.detail))
+        except Exception:
+            logger.exception(f"Job {job_id} failed")
+            await asyncio.to_thread(
+                self.store.update, job_id, status=FAILED, error="Rendering failed unexpectedly"
+            )
+        else:
+            await asyncio.to_thread(self.store.update, job_id, status=DONE)
+        await asyncio.to_thread(self._purge)
+        if job["callback_url"]:
+            await asyncio.to_thread(self._notify, job["callback_url"], await self.describe(job_id))
+
+    def _keep_artifacts(self, job_id: str, result, stem: str) -> list[str]:
+        """Move a render's artifacts into the job's directory and return their names."""
+        directory = self.artifact_dir / job_id
+        directory.mkdir(parents=True, exist_ok=True)
+        names = []
+        for name, path in result.files(stem):
+            shutil.move(path, directory / name)
+            names.append(name)
+        return names
+
+    def _purge(self) -> None:
+        for job_id in self.store.purge(time.time() - JOB_TTL_SECONDS):
+            shutil.rmtree(self.artifact_dir / job_id, ignore_errors=True)
+
+    @staticmethod
+    def _notify(url: str, payload: dict) -> None:
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError as e:
+            logger.warning(f"Job callback to {url} failed: {e}")
+
+    async def describe(self, job_id: str) -> dict | None:
+        """Public view of a job: status, error and artifact names."""
+        return await asyncio.to_thread(self._describe, job_id)
+
+    async def artifact(self, job_id: str, name: str) -> Path | None:
+        """Path of a finished job's artifact, or None if it has no such artifact."""
+        names = await asyncio.to_thread(self.store.artifact_names, job_id)
+        return self.artifact_dir / job_id / name if name in names else None
+
+    def _describe(self, job_id: str) -> dict | None:
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "priority": job["priority"],
+            "formats": job["formats"],
+            "error": job["error"],
+            "artifacts": self.store.artifact_names(job_id) if job["status"] == DONE else [],
+        }
+
+
+_job_queue: JobQueue | None = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the configured job queue, creating it on first use."""
+    global _job_queue
+    if _job_queue is None:
+        if JOB_BACKEND == "memory":
+            store = MemoryJobStore()
+        elif JOB_BACKEND == "sqlite":
+            store = SqliteJobStore(JOB_DB_PATH)
+        else:
+            raise RuntimeError(f"Unknown JOB_BACKEND '{JOB_BACKEND}'. Use one of: memory, sqlite")
+        _job_queue = JobQueue(store, max_size=JOB_QUEUE_SIZE, workers=JOB_WORKERS)
+    return _job_queue
@@ -0,0 +1,84 @@
+"""Wall-clock, CPU and memory limits for a single render.
+
+CPU and address-space limits are rlimits on the process running rendercv,
+so they only apply to the "subprocess" and "pool" engines; renders inside
+the API process are bounded by the wall-clock timeout alone.
+"""
+
+import resource
+import signal
+
+from fastapi import HTTPException
+
+
+class RenderLimitExceeded(HTTPException):
+    """A render stopped for running too long or needing too much memory.
+
+    ``limit`` is "timeout", "cpu" or "memory". Time limits answer 504,
+    memory 413: the input is too large to render, retrying won't help.
+    """
+
+    STATUS_CODES = {"timeout": 504, "cpu": 504, "memory": 413}
+
+    def __init__(self, limit: str, detail: str):
+        super().__init__(status_code=self.STATUS_CODES[limit], detail=detail)
+        self.limit = limit
+
+    @classmethod
+    def timeout(cls, seconds: float) -> "RenderLimitExceeded":
+        return cls("timeout", f"Rendering took longer than {seconds:g}s and was stopped")
+
+    @classmethod
+    def cpu(cls, seconds: float) -> "RenderLimitExceeded":
+        return cls("cpu", f"Rendering used more than {seconds:g}s of CPU time and was stopped")
+
+    @classmethod
+    def memory(cls, megabytes: float) -> "RenderLimitExceeded":
+        return cls("memory", f"This resume needs more than {megabytes:g} MB of memory to render")
+
+
+class CpuTimeExceeded(Exception):
+    """Raised in a render worker when its per-job CPU limit (SIGXCPU) is hit."""
+
+
+def _raise_cpu_time_exceeded(signum, frame):
+    raise CpuTimeExceeded()
+
+
+def limit_process(pid: int, cpu_seconds: int = 0, memory_mb: int = 0) -> None:
+    """Apply CPU-seconds and address-space rlimits to another process (Linux)."""
+    if cpu_seconds:
+        # Hard limit a little higher: SIGXCPU first, SIGKILL if it's ignored
+        resource.prlimit(pid, resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 5))
+    if memory_mb:
+        size = memory_mb * 1024 * 1024
+        resource.prlimit(pid, resource.RLIMIT_AS, (size, size))
+
+
+def limit_memory(memory_mb: int) -> None:
+    """Cap this process's address space; allocations beyond it fail."""
+    if memory_mb:
+        size = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (size, resource.getrlimit(resource.RLIMIT_AS)[1]))
+
+
+def handle_cpu_limit() -> None:
+    """Turn SIGXCPU into CpuTimeExceeded in this (worker) process."""
+    signal.signal(signal.SIGXCPU, _raise_cpu_time_exceeded)
+
+
+def limit_cpu_from_now(cpu_seconds: int) -> None:
+    """Allow this process cpu_seconds more CPU time before SIGXCPU.
+
+    RLIMIT_CPU counts the process's whole lifetime, so long-lived workers
+    move the soft limit forward before each job. The hard limit is left
+    alone because it could never be raised again.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds, resource.getrlimit(resource.RLIMIT_CPU)[1]))
+
+
+def clear_cpu_limit() -> None:
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
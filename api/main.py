@@ -1,19 +1,49 @@
-from fastapi import FastAPI, HTTPException, Request, Depends, Security
+from fastapi import FastAPI, HTTPException, Request, Depends, Security, WebSocket, WebSocketDisconnect
 from fastapi.security.api_key import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response, JSONResponse
+from fastapi.responses import FileResponse, Response, JSONResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
-from pydantic import BaseModel, EmailStr, HttpUrl, field_validator
-import tempfile
+from starlette.requests import HTTPConnection
+from pydantic import BaseModel, EmailStr, Field, HttpUrl, TypeAdapter, ValidationError, field_validator, model_validator
+from contextlib import asynccontextmanager
+import asyncio
+import base64
+import io
+import json
+import mimetypes
 import os
-import yaml
-import subprocess
+import re
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from typing import Any, get_args, get_origin
 from pathlib import Path
+import yaml
+from limits import parse as parse_limit
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
+from api.access_log import LOG_REQUEST_HEADERS, configure_logging, log_access, redacted_headers, sample, stop_logging
+from api.cache import cache_key, get_cache
+from api.jobs import check_callback_url, get_job_queue
+from api.metrics import ADMISSION_REJECTIONS, CLIENT_DISCONNECTS, PREVIEW_SESSIONS, RATE_LIMITED, REQUEST_SECONDS, REQUESTS, Gauge, render_metrics
+from api.preview import PREVIEW_MAX_SESSIONS, PreviewSession
+from api.rendering import (
+    FORMATS, RENDER_WARMUP, RenderResult, engine_stats, get_admission, get_engine, render, shutdown_engine,
+    skip_warm_up, warm_up_engine, warmup_status,
+)
+from api.scratch import get_scratch_pool, shutdown_scratch
+from api.serialization import dump_yaml, load_yaml
+from api.singleflight import Flight, SingleFlight, file_lock
+from api.timing import SERVER_TIMING, record, server_timing, start_request, timed
+from api.validation import (
+    VALID_NETWORKS, VALID_THEMES, DateStr, NetworkStr, OptionalDateStr, PhoneStr, RequiredStr,
+    ThemeStr, check_stackoverflow_username, required_str,
+)
+
 
 import logging
 
@@ -21,19 +51,19 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 
 # Setup logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
 # Parse ALLOWED_ORIGINS
 ALLOWED_ORIGINS_ENV = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000")
 allowed_origins = [origin.strip() for origin in ALLOWED_ORIGINS_ENV.split(",")]
-logger.info(f"DEBUG: Parsed Allowed Origins: {allowed_origins}")
+logger.info(f"Allowed origins: {allowed_origins}")
 
 # Parse ALLOWED_HOSTS
 ALLOWED_HOSTS_ENV = os.getenv("ALLOWED_HOSTS", "")
 allowed_hosts = [host.strip() for host in ALLOWED_HOSTS_ENV.split(",")]
-logger.info(f"DEBUG: Parsed Allowed Hosts: {allowed_hosts}")
+logger.info(f"Allowed hosts: {allowed_hosts}")
 
 # API Security
 API_SECRET = os.getenv("API_SECRET", "default-dev-secret")
@@ -50,9 +80,31 @@ async def verify_api_key(api_key: str = Security(api_key_header)):
         )
     return api_key
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Render every theme once in the background; /ready reports 503 until
+    # this finishes, so no traffic is routed to a cold instance
+    warm_up = None
+    if RENDER_WARMUP:
+        warm_up = asyncio.create_task(asyncio.to_thread(warm_up_engine))
+    else:
+        skip_warm_up()
+    # Run queued jobs, including any a previous run left unfinished
+    job_queue = get_job_queue()
+    await job_queue.start()
+    yield
+    job_queue.stop()
+    if warm_up is not None:
+        warm_up.cancel()
+    # Stop render worker processes so they don't outlive the server
+    shutdown_engine()
+    shutdown_scratch()
+    stop_logging()
+
+
 # Initialize app
 limiter = Limiter(key_func=get_remote_address)
-app = FastAPI(title="Resume Generator API", version="1.0.0")
+app = FastAPI(title="Resume Generator API", version="1.0.0", lifespan=lifespan)
 app.state.limiter = limiter
 
 # Security Middlewares
@@ -80,12 +132,12 @@ async def limit_upload_size(request: Request, call_next):
             
     return await call_next(request)
 
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+def rate_limit_exceeded(request: Request, exc: RateLimitExceeded):
+    RATE_LIMITED.inc(route=route_template(request))
+    return _rate_limit_exceeded_handler(request, exc)
 
-# Debug: Log allowed origins
-logger.info(f"DEBUG: ALLOWED_ORIGINS env var: '{ALLOWED_ORIGINS_ENV}'")
-logger.info(f"DEBUG: Parsed Allowed Origins: {allowed_origins}")
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded)
+app.add_middleware(SlowAPIMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -95,25 +147,82 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Debug middleware to log request origin (Added LAST so it runs FIRST)
+# Debug logging of every request's headers, opt-in with LOG_REQUEST_HEADERS
+async def log_request_headers(request: Request, call_next):
+    logger.info(f"{request.method} {request.url.path} headers: {redacted_headers(request.headers)}")
+    return await call_next(request)
+
+if LOG_REQUEST_HEADERS:
+    app.middleware("http")(log_request_headers)
+
+
+def route_template(request: HTTPConnection) -> str:
+    """Path template of the matched route, so /jobs/{job_id} is one series."""
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def mark_validated(request: Request) -> None:
+    """Record the validation stage: request arrival until the endpoint runs.
+    
+    Covers reading the body, authentication and model validation. Requests
+    marked here also get their response write timed.
+    """
+    record("validation", time.perf_counter() - request.state.received)
+    request.state.timed_stages = True
+
+
+# Added after every other middleware so it runs first and times everything
 @app.middleware("http")
-async def log_request_origin(request: Request, call_next):
-    origin = request.headers.get("origin")
-    logger.info(f"DEBUG: Incoming {request.method} Request to {request.url.path}")
-    logger.info(f"DEBUG: Headers: {request.headers}")
+async def record_metrics(request: Request, call_next):
+    received = request.state.received = time.perf_counter()
+    spans = start_request()
     response = await call_next(request)
+    route = route_template(request)
+    REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    if SERVER_TIMING:
+        # The body is still to be sent, so response_write can't be included
+        response.headers["Server-Timing"] = server_timing(
+            {**spans, "total": time.perf_counter() - received}
+        )
+    time_write = getattr(request.state, "timed_stages", False)
+    body = response.body_iterator
+    
+    async def timed_body():
+        write_started = time.perf_counter()
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finished = time.perf_counter()
+            if time_write:
+                record("response_write", finished - write_started)
+            REQUEST_SECONDS.observe(finished - received, route=route)
+            sample_rate = sample(response.status_code)
+            if sample_rate is not None:
+                log_access(
+                    sample_rate,
+                    method=request.method,
+                    path=request.url.path,
+                    route=route,
+                    status=response.status_code,
+                    client=request.client.host if request.client else None,
+                    duration_ms=round((finished - received) * 1000, 1),
+                    spans_ms={name: round(seconds * 1000, 1) for name, seconds in spans.items()},
+                )
+    
+    response.body_iterator = timed_body()
     return response
 
 # Explicit OPTIONS handler to debug/bypass CORS middleware issues
 @app.options("/generate")
 async def generate_options(request: Request):
-    logger.info("DEBUG: Explicit OPTIONS /generate called")
+    logger.debug("Explicit OPTIONS /generate called")
     return Response(status_code=200)
 
-# Debug: Log 404s to see what path is actually being requested
 @app.exception_handler(404)
 async def custom_404_handler(request: Request, exc):
-    logger.error(f"DEBUG: 404 Not Found for path: {request.url.path}")
+    logger.debug("404 Not Found: %s", request.url.path)
     return JSONResponse(status_code=404, content={"detail": f"Path {request.url.path} not found"})
 
 # --- Custom Exception Handler for Friendly Validation Errors ---
@@ -134,13 +243,14 @@ FIELD_NAMES = {
     "degree": "Degree",
 }
 
-@app.exception_handler(RequestValidationError)
-async def validation_exception_handler(request: Request, exc: RequestValidationError):
+def friendly_errors(validation_errors) -> list[str]:
+    """Turn pydantic errors into messages naming the field in plain words."""
     errors = []
-    for error in exc.errors():
-        # Get field name from location (e.g., ['body', 'email'] -> 'email')
+    for error in validation_errors:
+        # Get field name from location (e.g., ['body', 'email'] -> 'email').
+        # List indexes are skipped (['body', 'items', 0] -> 'items').
         loc = error.get("loc", [])
-        field = loc[-1] if loc else "field"
+        field = next((part for part in reversed(loc) if isinstance(part, str)), "field")
         friendly_field = FIELD_NAMES.get(field, field.replace("_", " ").title())
         
         # Create friendly message based on error type
@@ -161,173 +271,74 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             message = f"{friendly_field}: {reason}"
         
         errors.append(message)
-    
+    return errors
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
     return JSONResponse(
         status_code=422,
-        content={"detail": "Please fix the following issues:", "errors": errors}
+        content={"detail": "Please fix the following issues:", "errors": friendly_errors(exc.errors())}
     )
 
 
 
-# --- Constants for Validation ---
-
-VALID_NETWORKS = [
-    "LinkedIn", "GitHub", "GitLab", "IMDB", "Instagram", "ORCID", 
-    "Mastodon", "StackOverflow", "ResearchGate", "YouTube", 
-    "Google Scholar", "Telegram", "WhatsApp", "Leetcode", "X", "Bluesky"
-]
-
-VALID_THEMES = ["classic", "engineeringclassic", "engineeringresumes", "moderncv", "sb2nov"]
-
-
 # --- Pydantic Models ---
 
 class SocialNetwork(BaseModel):
-    network: str
-    username: str
+    network: NetworkStr
+    username: required_str("Username cannot be empty")
     
-    @field_validator("network")
-    @classmethod
-    def valid_network(cls, v: str) -> str:
-        if v not in VALID_NETWORKS:
-            raise ValueError(
-                f"'{v}' is not a valid social network. "
-                f"Use one of: {', '.join(VALID_NETWORKS)}"
-            )
-        return v
-    
-    @field_validator("username")
-    @classmethod
-    def valid_username(cls, v: str, info) -> str:
-        if not v or not v.strip():
-            raise ValueError("Username cannot be empty")
-        return v.strip()
-    
-    @classmethod
-    def model_validator_stackoverflow(cls, values):
-        # Note: This is handled in ResumeData validator since we need both fields
-        return values
+    @model_validator(mode="after")
+    def valid_stackoverflow_username(self):
+        if self.network == "StackOverflow":
+            check_stackoverflow_username(self.username)
+        return self
 
 
 class ExperienceEntry(BaseModel):
-    company: str
-    position: str
-    start_date: str
-    end_date: str = "present"
+    company: RequiredStr
+    position: RequiredStr
+    start_date: DateStr
+    end_date: DateStr = "present"
     location: str | None = None
     highlights: list[str] = []
-    
-    @field_validator("company", "position")
-    @classmethod
-    def not_empty(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError("This field cannot be empty")
-        return v.strip()
-    
-    @field_validator("start_date", "end_date")
-    @classmethod
-    def valid_date_format(cls, v: str) -> str:
-        import re
-        if v.lower() == "present":
-            return "present"
-        # Accept YYYY-MM, YYYY-MM-DD, or YYYY formats
-        if not re.match(r'^\d{4}(-\d{2})?(-\d{2})?$', v):
-            raise ValueError(
-                f"Date '{v}' should be in YYYY-MM format (e.g., 2020-01) or 'present'"
-            )
-        return v
 
 
 class EducationEntry(BaseModel):
-    institution: str
-    area: str
+    institution: RequiredStr
+    area: RequiredStr
     degree: str | None = None
-    start_date: str | None = None
-    end_date: str | None = None
+    start_date: OptionalDateStr = None
+    end_date: OptionalDateStr = None
     location: str | None = None
     highlights: list[str] = []
-    
-    @field_validator("institution", "area")
-    @classmethod
-    def not_empty(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError("This field cannot be empty")
-        return v.strip()
-    
-    @field_validator("start_date", "end_date")
-    @classmethod
-    def valid_date_format(cls, v: str | None) -> str | None:
-        import re
-        if v is None or v == "":
-            return None
-        if v.lower() == "present":
-            return "present"
-        if not re.match(r'^\d{4}(-\d{2})?(-\d{2})?$', v):
-            raise ValueError(
-                f"Date '{v}' should be in YYYY-MM format (e.g., 2020-01)"
-            )
-        return v
 
 
 class ProjectEntry(BaseModel):
-    name: str
-    start_date: str | None = None
-    end_date: str | None = None
+    name: required_str("Project name cannot be empty")
+    start_date: OptionalDateStr = None
+    end_date: OptionalDateStr = None
     location: str | None = None
     summary: str | None = None
     highlights: list[str] = []
-    
-    @field_validator("name")
-    @classmethod
-    def not_empty(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError("Project name cannot be empty")
-        return v.strip()
-    
-    @field_validator("start_date", "end_date")
-    @classmethod
-    def valid_date_format(cls, v: str | None) -> str | None:
-        import re
-        if v is None or v == "":
-            return None
-        if v.lower() == "present":
-            return "present"
-        if not re.match(r'^\d{4}(-\d{2})?(-\d{2})?$', v):
-            raise ValueError(
-                f"Date '{v}' should be in YYYY-MM format (e.g., 2020-01)"
-            )
-        return v
 
 
 class SkillEntry(BaseModel):
-    label: str
-    details: str
-    
-    @field_validator("label", "details")
-    @classmethod
-    def not_empty(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError("This field cannot be empty")
-        return v.strip()
+    label: RequiredStr
+    details: RequiredStr
 
 
 class CustomSectionItem(BaseModel):
-    title: str
+    title: required_str("Section title cannot be empty")
     entries: list[str] = []
-    
-    @field_validator("title")
-    @classmethod
-    def not_empty(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError("Section title cannot be empty")
-        return v.strip()
 
 
 class ResumeData(BaseModel):
-    name: str
+    name: required_str("Name cannot be empty")
     headline: str | None = None
     email: EmailStr | None = None
-    phone: str | None = None
+    phone: PhoneStr = None
     location: str | None = None
     website: HttpUrl | None = None
     social_networks: list[SocialNetwork] = []
@@ -337,50 +348,7 @@ class ResumeData(BaseModel):
     projects: list[ProjectEntry] = []
     skills: list[SkillEntry] = []
     custom_sections: list[CustomSectionItem] = []
-    theme: str = "classic"
-    
-    @field_validator("name")
-    @classmethod
-    def name_not_empty(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError("Name cannot be empty")
-        return v.strip()
-    
-    @field_validator("phone")
-    @classmethod
-    def valid_phone(cls, v: str | None) -> str | None:
-        import re
-        if v is None or v == "":
-            return None
-        # Must start with + and contain only digits after
-        cleaned = v.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-        if not re.match(r'^\+\d{10,15}$', cleaned):
-            raise ValueError(
-                "Phone number should be in international format starting with + "
-                "(e.g., +14155551234). Remove spaces, dashes, and parentheses."
-            )
-        return cleaned
-    
-    @field_validator("theme")
-    @classmethod
-    def valid_theme(cls, v: str) -> str:
-        if v not in VALID_THEMES:
-            raise ValueError(f"Theme must be one of: {', '.join(VALID_THEMES)}")
-        return v
-    
-    @field_validator("social_networks")
-    @classmethod
-    def validate_social_networks(cls, v: list[SocialNetwork]) -> list[SocialNetwork]:
-        import re
-        for sn in v:
-            # StackOverflow requires user_id/username format
-            if sn.network == "StackOverflow":
-                if not re.match(r'^\d+/[\w-]+$', sn.username):
-                    raise ValueError(
-                        f"StackOverflow username should be in format 'user_id/username' "
-                        f"(e.g., '12345678/john-doe'), got '{sn.username}'"
-                    )
-        return v
+    theme: ThemeStr = "classic"
 
 
 # --- Helper Functions ---
@@ -389,6 +357,7 @@ def global_limit_key(request: Request):
     """Key function for global rate limiting."""
     return "global"
 
+@timed("resume_to_yaml")
 def resume_to_yaml(data: ResumeData) -> dict:
     """Convert ResumeData to rendercv YAML structure."""
     cv: dict = {"name": data.name}
@@ -480,47 +449,233 @@ def resume_to_yaml(data: ResumeData) -> dict:
     }
 
 
-def generate_pdf_with_rendercv(yaml_content: str) -> bytes:
-    """Generate PDF using rendercv CLI."""
-    import sys
+def rendercv_to_resume_data(document: dict) -> dict:
+    """Map a rendercv YAML document back onto the ResumeData fields.
     
-    with tempfile.TemporaryDirectory() as tmpdir:
-        yaml_path = Path(tmpdir) / "resume.yaml"
-        yaml_path.write_text(yaml_content)
-        
-        # Run rendercv using the same Python interpreter
-        result = subprocess.run(
-            [sys.executable, "-m", "rendercv", "render", str(yaml_path)],
-            cwd=tmpdir,
-            capture_output=True,
-            text=True,
+    This is the inverse of resume_to_yaml for the parts ResumeData models.
+    Extra rendercv sections become custom sections when their entries can
+    be shown as text; entry types with no equivalent (e.g. publications)
+    are left out.
+    """
+    cv = document.get("cv") or {}
+    data: dict = {
+        key: cv[key]
+        for key in ("name", "headline", "email", "phone", "location", "website", "social_networks")
+        if cv.get(key) is not None
+    }
+    if "design" in document and "theme" in (document["design"] or {}):
+        data["theme"] = document["design"]["theme"]
+    
+    custom_sections = []
+    for title, entries in (cv.get("sections") or {}).items():
+        entries = entries or []
+        if title == "summary":
+            data["summary"] = "\n\n".join(str(e) for e in entries)
+        elif title in ("experience", "education", "projects", "skills"):
+            data[title] = entries
+        else:
+            lines = []
+            for entry in entries:
+                if isinstance(entry, str):
+                    lines.append(entry)
+                elif isinstance(entry, dict) and "bullet" in entry:
+                    lines.append(entry["bullet"])
+                elif isinstance(entry, dict) and "label" in entry:
+                    lines.append(f"{entry['label']}: {entry.get('details', '')}")
+            if lines:
+                custom_sections.append({"title": title, "entries": lines})
+    if custom_sections:
+        data["custom_sections"] = custom_sections
+    
+    return data
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag.
+    
+    Only concrete tags count: the render routes are POSTs, for which ``*``
+    can't mean "the client already has this PDF".
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+# PDF renders in flight, by cache key
+_pdf_flights = SingleFlight(cleanup=RenderResult.cleanup)
+
+
+async def render_pdf_once(key: str, document: str | dict) -> RenderResult:
+    """Render and cache the PDF for document, once across all uvicorn workers.
+    
+    With a disk cache, a worker that finds another one rendering the same
+    document waits for its lock and then serves the cached file.
+    """
+    cache = get_cache()
+    lock_path = cache.lock_path(key)
+    if lock_path is None:
+        return await render_cached_pdf(cache, key, document)
+    async with file_lock(lock_path):
+        cached = cache.lookup(key)
+        if isinstance(cached, Path):
+            return RenderResult(pdf=cached)
+        return await render_cached_pdf(cache, key, document)
+
+
+async def render_cached_pdf(cache, key: str, document: str | dict) -> RenderResult:
+    result = await render(document, ("pdf",))
+    try:
+        cache.set_file(key, result.pdf)
+    except OSError as e:
+        logger.warning(f"Could not cache PDF: {e}")
+    return result
+
+
+async def shared_pdf_render(key: str, document: str | dict) -> Flight:
+    """Render the PDF for document, sharing the render with identical requests in flight.
+    
+    Every caller gets the same file in ``flight.result.pdf`` and must call
+    ``flight.release()`` once it has been sent or read.
+    """
+    return await _pdf_flights.join(key, lambda: render_pdf_once(key, document))
+
+
+async def cached_render_pdf(key: str, document: str | dict) -> tuple[bytes, str]:
+    """Return the PDF for document and whether it was a cache HIT or MISS."""
+    pdf_bytes = get_cache().get(key)
+    if pdf_bytes is not None:
+        return pdf_bytes, "HIT"
+    flight = await shared_pdf_render(key, document)
+    try:
+        return flight.result.pdf.read_bytes(), "MISS"
+    finally:
+        flight.release()
+
+
+class ClientDisconnected(Exception):
+    """The client went away while its response was being prepared."""
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Return once the client has disconnected; the body must be read already."""
+    # Polling request.is_disconnected() doesn't work behind BaseHTTPMiddleware,
+    # so wait for the disconnect message itself, like StreamingResponse does
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def unless_disconnected(request: Request, awaitable):
+    """Await awaitable, cancelling it if the client disconnects first.
+    
+    Cancelling a render stops it and frees its slot for queued requests.
+    """
+    task = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        CLIENT_DISCONNECTS.inc(route=route_template(request))
+        raise ClientDisconnected()
+    finally:
+        task.cancel()
+        watcher.cancel()
+
+
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnected):
+    # Nobody will read this; 499 (as in nginx) marks it in logs and metrics
+    return Response(status_code=499)
+
+
+def check_admission(request: HTTPConnection) -> None:
+    """Reject a render with 503 when it would wait in the queue longer than the budget.
+    
+    Retry-After says when the queue is expected to be short enough again.
+    """
+    retry_after = get_admission().retry_after()
+    if retry_after is not None:
+        ADMISSION_REJECTIONS.inc(route=route_template(request))
+        raise HTTPException(
+            status_code=503,
+            detail=f"The server is busy rendering other resumes. Please try again in {retry_after}s.",
+            headers={"Retry-After": str(retry_after)},
         )
-        
-        if result.returncode != 0:
-            error_msg = result.stderr or result.stdout or "Unknown error"
-            raise HTTPException(
-                status_code=500,
-                detail=f"rendercv failed: {error_msg}"
-            )
-        
-        # Find the generated PDF
-        output_dir = Path(tmpdir) / "rendercv_output"
-        
-        if not output_dir.exists():
-            raise HTTPException(
-                status_code=500,
-                detail=f"Output directory not created. stdout: {result.stdout}, stderr: {result.stderr}"
-            )
-        
-        pdf_files = list(output_dir.glob("*.pdf"))
-        
-        if not pdf_files:
-            raise HTTPException(
-                status_code=500,
-                detail=f"No PDF was generated. Files in output: {list(output_dir.iterdir())}"
-            )
-        
-        return pdf_files[0].read_bytes()
+
+
+async def pdf_response(request: Request, document: str | dict, filename: str) -> Response:
+    """Serve the PDF for a rendercv document, from the cache when possible."""
+    key = await asyncio.to_thread(cache_key, document)
+    etag = f'"{key}"'
+    
+    # The ETag is derived from the input, so a match means the client
+    # already holds this exact PDF
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "ETag": etag,
+    }
+    
+    cache = get_cache()
+    cached = cache.lookup(key)
+    if isinstance(cached, Path):
+        # Disk cache: stream the stored file instead of reading it in
+        return FileResponse(cached, media_type="application/pdf", headers={**headers, "X-Cache": "HIT"})
+    if cached is not None:
+        return Response(content=cached, media_type="application/pdf", headers={**headers, "X-Cache": "HIT"})
+    
+    # Requests joining a render already in flight add no load
+    if not _pdf_flights.in_flight(key):
+        check_admission(request)
+    flight = await unless_disconnected(request, shared_pdf_render(key, document))
+    # Sent in chunks from the render directory, which is removed once every
+    # request sharing the render is done with it
+    return RenderFileResponse(
+        flight.result.pdf,
+        flight.release,
+        media_type="application/pdf",
+        headers={**headers, "X-Cache": "MISS"},
+    )
+
+
+class RenderFileResponse(FileResponse):
+    """FileResponse for a file in a render directory, calling ``cleanup`` once sent.
+    
+    Unlike a background task, cleanup also runs when sending fails, e.g. when
+    the client disconnects mid-download, so the directory is always freed.
+    """
+    
+    def __init__(self, path: Path, cleanup, **kwargs):
+        super().__init__(path, **kwargs)
+        self.cleanup = cleanup
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.cleanup()
+
+
+def zip_files(files: list[tuple[str, bytes | Path]], target=None):
+    """Bundle files into a zip archive, compressing only text formats.
+    
+    Contents may be bytes or paths on disk. The archive is written to
+    ``target`` (a path or file object) if given, otherwise returned as bytes.
+    """
+    buffer = io.BytesIO() if target is None else target
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files:
+            # PDF and PNG are already compressed
+            compression = zipfile.ZIP_STORED if name.endswith((".pdf", ".png")) else zipfile.ZIP_DEFLATED
+            if isinstance(content, Path):
+                archive.write(content, name, compress_type=compression)
+            else:
+                archive.writestr(name, content, compress_type=compression)
+    return buffer.getvalue() if target is None else target
 
 
 # --- API Endpoints ---
@@ -530,21 +685,102 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once the startup warm-up has finished, else 503.
+    
+    Includes how long the warm-up took per theme.
+    """
+    status = warmup_status()
+    return JSONResponse(status_code=200 if status["status"] == "ready" else 503, content=status)
+
+
+@app.get("/render/stats", dependencies=[Depends(verify_api_key)])
+async def render_stats():
+    """Render engine state, including worker pool queue depth, cache hits, scratch space
+    and the render time estimates used for admission control."""
+    return {
+        **get_engine().stats(),
+        "cache": get_cache().stats(),
+        "scratch": get_scratch_pool().stats(),
+        "admission": get_admission().stats(),
+        "single_flight": _pdf_flights.stats(),
+    }
+
+
+# Read at scrape time from the same state /render/stats reports
+Gauge("pdf_cache_hit_ratio", "Share of PDF cache lookups that hit.", lambda: get_cache().stats()["hit_ratio"])
+Gauge("job_queue_depth", "Render jobs waiting to run.", lambda: get_job_queue().depth)
+Gauge("render_projected_wait_seconds", "Estimated queue wait for a new render.", lambda: get_admission().projected_wait())
+Gauge("render_pool_queue_depth", "Renders waiting for a worker process.", lambda: engine_stats().get("queue_depth", 0))
+
+
+@app.get("/metrics", dependencies=[Depends(verify_api_key)])
+async def metrics():
+    """Request, render stage and queue metrics in Prometheus text format."""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def file_stem(name: str) -> str:
+    """Download file name stem for a resume, e.g. ``Jane_Doe_CV``.
+    
+    Only word characters, dots and dashes are kept, so the name is safe as
+    a path component, a zip entry and in Content-Disposition.
+    """
+    return re.sub(r"[^\w.-]", "", name.replace(" ", "_")) + "_CV"
+
+
+def parse_formats(formats: str) -> list[str]:
+    """Split a comma-separated ``formats`` query parameter."""
+    return [f.strip().lower() for f in formats.split(",") if f.strip()]
+
+
+async def bundle_response(request: Request, document: str | dict, formats: list[str], stem: str) -> Response:
+    """Render formats in one pass and send them as a zip of files named after stem."""
+    check_admission(request)
+    result = await unless_disconnected(request, render(document, formats))
+    try:
+        # A fixed name: the stem is only used for the names the client sees
+        archive = zip_files(result.files(stem), result.directory / "output.zip")
+    except BaseException:
+        result.cleanup()
+        raise
+    return RenderFileResponse(
+        archive,
+        result.cleanup,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{stem}.zip"'},
+    )
+
+
 @app.post("/generate", dependencies=[Depends(verify_api_key)])
 @limiter.limit("5/minute")
-async def generate_pdf(request: Request, data: ResumeData):
-    """Generate PDF from resume data."""
-    yaml_dict = resume_to_yaml(data)
-    yaml_content = yaml.dump(yaml_dict, default_flow_style=False, allow_unicode=True, sort_keys=False)
+async def generate_pdf(request: Request, data: ResumeData, formats: str = "pdf"):
+    """Generate PDF from resume data.
     
-    pdf_bytes = generate_pdf_with_rendercv(yaml_content)
+    The rendercv dict goes straight to the renderer; no YAML is produced.
+    Other `formats` than the default pdf are returned as a zip, like
+    /generate/bundle does.
+    """
+    mark_validated(request)
+    formats = parse_formats(formats)
+    stem = file_stem(data.name)
+    if formats == ["pdf"]:
+        return await pdf_response(request, resume_to_yaml(data), f"{stem}.pdf")
+    return await bundle_response(request, resume_to_yaml(data), formats, stem)
+
+
+@app.post("/generate/bundle", dependencies=[Depends(verify_api_key)])
+@limiter.limit("5/minute")
+async def generate_bundle(request: Request, data: ResumeData, formats: str = "pdf,png"):
+    """Render several formats in one pass and return them as a zip.
     
-    filename = data.name.replace(" ", "_") + "_CV.pdf"
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
+    `formats` is a comma-separated subset of pdf, png, typst, markdown, html.
+    The Typst source is generated once and compiled to both PDF and PNG.
+    """
+    mark_validated(request)
+    stem = file_stem(data.name)
+    return await bundle_response(request, resume_to_yaml(data), parse_formats(formats), stem)
 
 
 @app.post("/yaml", dependencies=[Depends(verify_api_key)])
@@ -552,10 +788,11 @@ async def generate_pdf(request: Request, data: ResumeData):
 @limiter.limit("15/minute")
 async def generate_yaml(request: Request, data: ResumeData):
     """Generate YAML from resume data."""
+    mark_validated(request)
     yaml_dict = resume_to_yaml(data)
-    yaml_content = yaml.dump(yaml_dict, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    yaml_content = dump_yaml(yaml_dict)
     
-    filename = data.name.replace(" ", "_") + "_CV.yaml"
+    filename = file_stem(data.name) + ".yaml"
     return Response(
         content=yaml_content,
         media_type="application/x-yaml",
@@ -576,12 +813,453 @@ class YamlRenderRequest(BaseModel):
 
 @app.post("/yaml/render", dependencies=[Depends(verify_api_key)])
 @limiter.limit("5/minute")
-async def render_yaml(request: Request, request_data: YamlRenderRequest):
-    """Render PDF from raw YAML content."""
-    pdf_bytes = generate_pdf_with_rendercv(request_data.yaml_content)
+async def render_yaml(request: Request, request_data: YamlRenderRequest, formats: str = "pdf"):
+    """Render PDF from raw YAML content.
     
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={"Content-Disposition": 'attachment; filename="resume.pdf"'}
+    Other `formats` than the default pdf are returned as a zip, as from
+    /generate.
+    """
+    mark_validated(request)
+    formats = parse_formats(formats)
+    if formats == ["pdf"]:
+        return await pdf_response(request, request_data.yaml_content, "resume.pdf")
+    return await bundle_response(request, request_data.yaml_content, formats, "resume")
+
+
+
+# --- Live Validation ---
+
+# Validated documents kept for incremental /validate patches
+VALIDATION_CACHE_SIZE = int(os.getenv("VALIDATION_CACHE_SIZE", "1000"))
+_validated_documents: OrderedDict[str, ResumeData] = OrderedDict()
+
+# experience[3] -> ("experience", "3"); phone -> ("phone", None)
+PATCH_PATH = re.compile(r"(\w+)(?:\[(\d+)\])?")
+
+# Item validators for list sections, so a patch to one entry validates only that entry
+SECTION_ITEMS = {
+    name: TypeAdapter(get_args(field.annotation)[0])
+    for name, field in ResumeData.model_fields.items()
+    if get_origin(field.annotation) is list
+}
+
+
+class ValidateRequest(BaseModel):
+    """Either a full ``document``, or a ``document_id`` plus a ``path``/``value`` patch."""
+    document: dict | None = None
+    document_id: str | None = None
+    path: str | None = None
+    value: Any = None
+    
+    @model_validator(mode="after")
+    def document_or_patch(self):
+        if self.document is None and not (self.document_id and self.path):
+            raise ValueError("Send either a document, or a document_id with a path to patch")
+        return self
+
+
+def remember_document(document_id: str, data: ResumeData) -> None:
+    _validated_documents[document_id] = data
+    _validated_documents.move_to_end(document_id)
+    while len(_validated_documents) > VALIDATION_CACHE_SIZE:
+        _validated_documents.popitem(last=False)
+
+
+def apply_patch(data: ResumeData, path: str, value) -> ResumeData:
+    """Validate one field or list entry and return a patched copy of data.
+    
+    Raises RequestValidationError with locations relative to the document root.
+    """
+    match = PATCH_PATH.fullmatch(path)
+    if match is None or match.group(1) not in ResumeData.model_fields:
+        raise HTTPException(status_code=400, detail=f"Unknown path '{path}'")
+    field, index = match.group(1), match.group(2)
+    
+    if index is None:
+        patched = data.model_copy()
+        try:
+            ResumeData.__pydantic_validator__.validate_assignment(patched, field, value)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        return patched
+    
+    if field not in SECTION_ITEMS:
+        raise HTTPException(status_code=400, detail=f"'{field}' is not a list section")
+    items = list(getattr(data, field))
+    index = int(index)
+    if index > len(items):
+        raise HTTPException(status_code=400, detail=f"Index {index} is past the end of '{field}'")
+    try:
+        item = SECTION_ITEMS[field].validate_python(value)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": (field, index, *error["loc"])} for error in e.errors()])
+    # index == len(items) appends a new entry
+    items[index:index + 1] = [item]
+    return data.model_copy(update={field: items})
+
+
+@app.post("/validate", dependencies=[Depends(verify_api_key)])
+@limiter.limit("600/minute")
+async def validate_resume(request: Request, request_data: ValidateRequest):
+    """Validate a resume without converting or rendering it.
+    
+    Posting a ``document`` validates it in full and returns a ``document_id``.
+    Later requests can send that id with a ``path`` such as ``phone`` or
+    ``experience[3]`` and the new ``value``; only that piece is revalidated
+    against the stored document. Unknown ids return 404 so the client can
+    resend the full document.
+    
+    Errors come back as 422 in the same format as every other endpoint. A
+    rejected patch leaves the stored document unchanged.
+    """
+    mark_validated(request)
+    if request_data.document is not None:
+        document_id = uuid.uuid4().hex
+        try:
+            data = ResumeData.model_validate(request_data.document)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+    else:
+        document_id = request_data.document_id
+        data = _validated_documents.get(document_id)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired document_id, send the full document")
+        data = apply_patch(data, request_data.path, request_data.value)
+    
+    remember_document(document_id, data)
+    return {"valid": True, "document_id": document_id}
+
+
+
+# --- Batch Rendering ---
+
+# Upper bound on resumes per batch request
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "100"))
+# Renders running at once across all batch requests. Each render also takes
+# a RENDER_CONCURRENCY slot, so batches can't starve interactive requests of
+# more than this many slots.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "2"))
+_batch_slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+
+class BatchItem(BaseModel):
+    resume: ResumeData | None = None
+    yaml_content: str | None = None
+    
+    @field_validator("yaml_content")
+    @classmethod
+    def valid_yaml(cls, v: str | None) -> str | None:
+        if v is None:
+            return v
+        if not v.strip():
+            raise ValueError("YAML content cannot be empty")
+        try:
+            parsed = load_yaml(v)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}")
+        if not isinstance(parsed, dict) or not isinstance(parsed.get("cv"), dict):
+            raise ValueError("YAML must contain a 'cv' section")
+        # The same checks as resumes sent as ResumeData, and as the CLI's
+        try:
+            ResumeData.model_validate(rendercv_to_resume_data(parsed))
+        except ValidationError as e:
+            raise ValueError("; ".join(friendly_errors(e.errors())))
+        return v
+    
+    @model_validator(mode="after")
+    def exactly_one_source(self):
+        if (self.resume is None) == (self.yaml_content is None):
+            raise ValueError("Provide either 'resume' or 'yaml_content' for each item")
+        return self
+
+
+class BatchRequest(BaseModel):
+    items: list[BatchItem]
+    
+    @field_validator("items")
+    @classmethod
+    def batch_size(cls, v: list[BatchItem]) -> list[BatchItem]:
+        if not v:
+            raise ValueError("Batch must contain at least one resume")
+        if len(v) > MAX_BATCH_SIZE:
+            raise ValueError(f"Batch can contain at most {MAX_BATCH_SIZE} resumes")
+        return v
+
+
+async def render_batch_item(index: int, item: BatchItem) -> dict:
+    """Render one batch item, capturing failures instead of raising."""
+    if item.resume is not None:
+        document = resume_to_yaml(item.resume)
+        filename = file_stem(item.resume.name) + ".pdf"
+    else:
+        document = item.yaml_content
+        filename = f"resume_{index + 1}.pdf"
+    
+    try:
+        async with _batch_slots:
+            key = await asyncio.to_thread(cache_key, document)
+            pdf_bytes, _ = await cached_render_pdf(key, document)
+    except HTTPException as e:
+        return {"index": index, "filename": filename, "status": "error", "error": e.detail}
+    except Exception:
+        # One broken item mustn't take down the rest of the batch
+        logger.exception(f"Batch item {index} failed")
+        return {"index": index, "filename": filename, "status": "error", "error": "Rendering failed unexpectedly"}
+    return {"index": index, "filename": filename, "status": "ok", "pdf": pdf_bytes}
+
+
+@app.post("/generate/batch", dependencies=[Depends(verify_api_key)])
+@limiter.limit("2/minute")
+async def generate_batch(request: Request, batch: BatchRequest, format: str = "ndjson"):
+    """Render many resumes in parallel.
+    
+    Every item is validated before any rendering starts. `format=ndjson`
+    streams one JSON line per resume as it finishes (PDF base64-encoded);
+    `format=zip` returns all PDFs plus an errors.json for failed items.
+    """
+    mark_validated(request)
+    if format not in ("ndjson", "zip"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'zip'")
+    
+    tasks = [
+        asyncio.create_task(render_batch_item(i, item))
+        for i, item in enumerate(batch.items)
+    ]
+    
+    if format == "zip":
+        results = await asyncio.gather(*tasks)
+        files = [(r["filename"], r["pdf"]) for r in results if r["status"] == "ok"]
+        errors = [
+            {k: r[k] for k in ("index", "filename", "error")}
+            for r in results if r["status"] == "error"
+        ]
+        if errors:
+            files.append(("errors.json", json.dumps(errors, indent=2).encode()))
+        return Response(
+            content=zip_files(files),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="resumes.zip"'}
+        )
+    
+    async def ndjson_lines():
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result["status"] == "ok":
+                    result["pdf"] = base64.b64encode(result["pdf"]).decode()
+                yield json.dumps(result) + "\n"
+        finally:
+            # Client went away mid-stream: don't keep rendering for nobody
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+# --- Live Preview ---
+
+PREVIEW_FORMATS = ("png", "pdf")
+# Largest revision accepted over the preview socket, as for HTTP uploads
+PREVIEW_MAX_MESSAGE_SIZE = 2 * 1024 * 1024
+# New preview connections per client address
+PREVIEW_CONNECTION_LIMIT = parse_limit("10/minute")
+PREVIEW_SUBPROTOCOL = "resume-preview"
+# Subprotocol carrying the base64url-encoded API key, for browsers
+PREVIEW_KEY_PREFIX = "key."
+
+
+class PreviewRevision(BatchItem):
+    revision: int
+
+
+async def render_preview(websocket: WebSocket, document: str | dict, format: str) -> dict | list[bytes]:
+    """PNG pages or the PDF of a document, or an error message to send back.
+    
+    Renders go through admission control like the HTTP routes; PDFs also
+    use the PDF cache and share renders in flight.
+    """
+    try:
+        if format == "pdf":
+            key = await asyncio.to_thread(cache_key, document)
+            pdf_bytes = get_cache().get(key)
+            if pdf_bytes is not None:
+                return [pdf_bytes]
+            if not _pdf_flights.in_flight(key):
+                check_admission(websocket)
+            flight = await shared_pdf_render(key, document)
+            try:
+                return [flight.result.pdf.read_bytes()]
+            finally:
+                flight.release()
+        check_admission(websocket)
+        result = await render(document, (format,))
+        try:
+            return [path.read_bytes() for path in result.png]
+        finally:
+            result.cleanup()
+    except HTTPException as e:
+        error = {"type": "error", "detail": e.detail}
+        if e.headers and "Retry-After" in e.headers:
+            error["retry_after"] = int(e.headers["Retry-After"])
+        return error
+    except Exception:
+        # Raising would end the session's runner; later revisions may render fine
+        logger.exception("Preview render failed")
+        return {"type": "error", "detail": "Rendering failed unexpectedly"}
+
+
+def preview_api_key(websocket: WebSocket) -> str | None:
+    """API key from the X-API-Key header or a ``key.<base64url>`` subprotocol."""
+    for protocol in websocket.scope.get("subprotocols", []):
+        if protocol.startswith(PREVIEW_KEY_PREFIX):
+            encoded = protocol.removeprefix(PREVIEW_KEY_PREFIX)
+            try:
+                return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode()
+            except ValueError:
+                return None
+    return websocket.headers.get("x-api-key")
+
+
+def revision_number(message: str) -> int | None:
+    """Best-effort revision of a message that failed validation."""
+    try:
+        revision = json.loads(message).get("revision")
+    except (ValueError, AttributeError):
+        return None
+    return revision if isinstance(revision, int) else None
+
+
+@app.websocket("/preview")
+async def preview(websocket: WebSocket, format: str = "png"):
+    """Live preview channel for an editor; see openPreview in web/lib/api.ts for the protocol."""
+    origin = websocket.headers.get("origin")
+    if preview_api_key(websocket) != API_SECRET:
+        await websocket.close(code=1008, reason="Could not validate credentials")
+        return
+    # Browsers don't apply CORS to WebSockets, so check the origin here
+    if origin and origin not in allowed_origins:
+        await websocket.close(code=1008, reason="Origin not allowed")
+        return
+    if format not in PREVIEW_FORMATS:
+        await websocket.close(code=1008, reason=f"format must be one of: {', '.join(PREVIEW_FORMATS)}")
+        return
+    if limiter.enabled and not limiter.limiter.hit(PREVIEW_CONNECTION_LIMIT, "preview", get_remote_address(websocket)):
+        RATE_LIMITED.inc(route=route_template(websocket))
+        await websocket.close(code=1008, reason="Rate limit exceeded")
+        return
+    if PREVIEW_SESSIONS.value() >= PREVIEW_MAX_SESSIONS:
+        # 1013: try again later
+        await websocket.close(code=1013, reason="Too many preview sessions")
+        return
+    
+    async def publish(revision: int, outcome):
+        if isinstance(outcome, dict):
+            await websocket.send_json({**outcome, "revision": revision})
+            return
+        await websocket.send_json(
+            {"type": "rendered", "revision": revision, "format": format, "pages": len(outcome)}
+        )
+        for content in outcome:
+            await websocket.send_bytes(content)
+    
+    session = PreviewSession(lambda document: render_preview(websocket, document, format), publish)
+    runner = asyncio.create_task(session.run())
+    # Counted before accepting, so concurrent connections can't all pass the cap
+    PREVIEW_SESSIONS.inc()
+    try:
+        offered = websocket.scope.get("subprotocols", [])
+        await websocket.accept(subprotocol=PREVIEW_SUBPROTOCOL if PREVIEW_SUBPROTOCOL in offered else None)
+        while True:
+            message = await websocket.receive_text()
+            if len(message) > PREVIEW_MAX_MESSAGE_SIZE:
+                await websocket.send_json(
+                    {"type": "invalid", "revision": None, "errors": ["Revision too large. Maximum size is 2MB."]}
+                )
+                continue
+            try:
+                item = PreviewRevision.model_validate_json(message)
+            except ValidationError as e:
+                await websocket.send_json(
+                    {"type": "invalid", "revision": revision_number(message), "errors": friendly_errors(e.errors())}
+                )
+                continue
+            document = resume_to_yaml(item.resume) if item.resume is not None else item.yaml_content
+            session.submit(item.revision, document)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        runner.cancel()
+        session.close()
+        PREVIEW_SESSIONS.dec()
+
+
+# --- Render Jobs ---
+
+class JobRequest(BatchItem):
+    formats: list[str] = ["pdf"]
+    priority: int = Field(default=0, ge=0, le=10)
+    callback_url: str | None = None
+    
+    @field_validator("formats")
+    @classmethod
+    def valid_formats(cls, v: list[str]) -> list[str]:
+        if not v:
+            raise ValueError("Request at least one format")
+        unknown = [f for f in v if f not in FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown format(s): {', '.join(unknown)}. Use any of: {', '.join(FORMATS)}")
+        return list(dict.fromkeys(v))
+    
+    @field_validator("callback_url")
+    @classmethod
+    def valid_callback_url(cls, v: str | None) -> str | None:
+        return check_callback_url(v) if v else None
+
+
+@app.post("/jobs", status_code=202, dependencies=[Depends(verify_api_key)])
+@limiter.limit("5/minute")
+async def submit_job(request: Request, job_request: JobRequest):
+    """Queue a render and return immediately with a job id to poll.
+    
+    Higher `priority` jobs run first. If `callback_url` is set, the job
+    status is POSTed there once the job finishes.
+    """
+    mark_validated(request)
+    if job_request.resume is not None:
+        yaml_content = dump_yaml(resume_to_yaml(job_request.resume))
+        stem = file_stem(job_request.resume.name)
+    else:
+        yaml_content = job_request.yaml_content
+        stem = "resume"
+    
+    job = await get_job_queue().submit(
+        yaml_content,
+        job_request.formats,
+        stem,
+        priority=job_request.priority,
+        callback_url=job_request.callback_url,
+    )
+    return {"job_id": job["id"], "status": job["status"], "status_url": f"/jobs/{job['id']}"}
+
+
+@app.get("/jobs/{job_id}", dependencies=[Depends(verify_api_key)])
+async def get_job(job_id: str):
+    """Job status; `artifacts` lists downloadable files once it is done."""
+    job = await get_job_queue().describe(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/jobs/{job_id}/artifacts/{name}", dependencies=[Depends(verify_api_key)])
+async def get_job_artifact(job_id: str, name: str):
+    """Download one artifact of a finished job."""
+    path = await get_job_queue().artifact(job_id, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}"'}
     )
@@ -0,0 +1,178 @@
+"""In-process counters, gauges and histograms exposed in Prometheus text format.
+
+Metrics live in this process only; with several uvicorn workers, each one
+is scraped (or reported) separately.
+"""
+
+import bisect
+import threading
+
+# Seconds; covers everything from sub-millisecond validation to slow renders
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Bytes
+SIZE_BUCKETS = (10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000)
+
+_registry: list = []
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def collect(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, or is read from ``function`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, function=None):
+        super().__init__(name, help)
+        self.function = function
+        self._value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def value(self) -> float:
+        return self.function() if self.function else self._value
+
+    def _samples(self) -> list[str]:
+        return [f"{self.name} {_format_value(self.value())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _format_labels(self.labels, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+# --- Application metrics ---
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route, method and status code.", ("route", "method", "status")
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time from request arrival to the last byte sent.", ("route",)
+)
+STAGE_SECONDS = Histogram(
+    "render_stage_duration_seconds",
+    "Time spent per request stage (the spans reported in Server-Timing, plus response_write).",
+    ("stage",),
+)
+RENDERS_IN_FLIGHT = Gauge("renders_in_flight", "Renders currently running.")
+RENDER_QUEUE_DEPTH = Gauge("render_queue_depth", "Renders waiting for a RENDER_CONCURRENCY slot.")
+RENDERS_CANCELLED = Counter(
+    "renders_cancelled_total", "Renders abandoned by their caller, while queued or running.", ("stage",)
+)
+RENDERS_COALESCED = Counter(
+    "renders_coalesced_total", "Requests that shared a render already in flight for the same document."
+)
+RENDER_LIMITS_EXCEEDED = Counter(
+    "render_limits_exceeded_total", "Renders stopped by the timeout, CPU or memory limit.", ("limit",)
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total", "Renders turned away with 503 because the queue was too long.", ("route",)
+)
+CLIENT_DISCONNECTS = Counter(
+    "client_disconnects_total", "Requests whose client went away before the render finished.", ("route",)
+)
+PDF_BYTES = Histogram("rendered_pdf_size_bytes", "Size of rendered PDFs.", buckets=SIZE_BUCKETS)
+RATE_LIMITED = Counter("rate_limit_rejections_total", "Requests rejected by the rate limiter.", ("route",))
+PREVIEW_SESSIONS = Gauge("preview_sessions", "Open live-preview WebSocket sessions.")
+PREVIEW_RENDERS_SUPERSEDED = Counter(
+    "preview_renders_superseded_total", "Preview renders cancelled because a newer revision arrived."
+)
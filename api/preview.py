@@ -0,0 +1,83 @@
+"""Coalescing of live-preview revisions sent over one WebSocket session."""
+
+import asyncio
+import os
+import time
+
+from api.metrics import PREVIEW_RENDERS_SUPERSEDED
+
+# Render once the editor has been quiet this long...
+PREVIEW_DEBOUNCE_MS = int(os.getenv("PREVIEW_DEBOUNCE_MS", "300"))
+# ...or at the latest this long after the first unrendered revision
+PREVIEW_MAX_DELAY_MS = int(os.getenv("PREVIEW_MAX_DELAY_MS", "1500"))
+# Renders of one session start at least this far apart
+PREVIEW_MIN_INTERVAL_MS = int(os.getenv("PREVIEW_MIN_INTERVAL_MS", "1000"))
+# Open sessions across the server; further connections are turned away
+PREVIEW_MAX_SESSIONS = int(os.getenv("PREVIEW_MAX_SESSIONS", "50"))
+
+
+class PreviewSession:
+    """Render only the newest revision of a document being edited.
+
+    ``submit`` stores a revision and cancels the render of an older one if
+    it is still running. ``run`` waits for a pause in submissions, renders
+    the newest revision with ``render`` and hands the result to ``publish``.
+    Revisions that arrive while waiting replace each other, so a burst of
+    edits costs one render. Renders start at least ``min_interval`` seconds
+    apart, however fast revisions arrive.
+    """
+
+    def __init__(self, render, publish, debounce: float = PREVIEW_DEBOUNCE_MS / 1000,
+                 max_delay: float = PREVIEW_MAX_DELAY_MS / 1000,
+                 min_interval: float = PREVIEW_MIN_INTERVAL_MS / 1000):
+        self._render = render
+        self._publish = publish
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.min_interval = min_interval
+        self._last_render = float("-inf")
+        self._pending: tuple[int, object] | None = None
+        self._arrived = asyncio.Event()
+        self._rendering: asyncio.Task | None = None
+
+    def submit(self, revision: int, document) -> None:
+        self._pending = (revision, document)
+        if self._rendering is not None and not self._rendering.done():
+            self._rendering.cancel()
+        self._arrived.set()
+
+    async def _settle(self) -> None:
+        """Wait until no revision has arrived for ``debounce`` seconds."""
+        deadline = time.monotonic() + self.max_delay
+        while True:
+            self._arrived.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._arrived.wait(), min(self.debounce, remaining))
+            except TimeoutError:
+                return
+
+    async def run(self) -> None:
+        while True:
+            await self._arrived.wait()
+            await self._settle()
+            # Revisions arriving meanwhile still replace the pending one
+            await asyncio.sleep(self._last_render + self.min_interval - time.monotonic())
+            if self._pending is None:
+                continue
+            revision, document = self._pending
+            self._pending = None
+            self._last_render = time.monotonic()
+            self._rendering = asyncio.create_task(self._render(document))
+            # wait() rather than await, so a cancelled render doesn't cancel us
+            await asyncio.wait({self._rendering})
+            if self._rendering.cancelled():
+                PREVIEW_RENDERS_SUPERSEDED.inc()
+                continue
+            await self._publish(revision, self._rendering.result())
+
+    def close(self) -> None:
+        if self._rendering is not None:
+            self._rendering.cancel()
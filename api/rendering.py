@@ -0,0 +1,582 @@
+"""Rendering engines that turn rendercv documents into PDF and other artifacts.
+
+A document is either rendercv YAML text or the equivalent dict (as built by
+``resume_to_yaml``). Dicts are validated by rendercv directly, skipping the
+YAML emit and parse steps.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from api.admission import AdmissionController, document_theme
+from api.cancellation import CANCEL_POLL_SECONDS, RenderCancelled, cancel_requested, cancel_scope, check_cancelled
+from api.limits import CpuTimeExceeded, RenderLimitExceeded, limit_process
+from api.metrics import PDF_BYTES, RENDER_LIMITS_EXCEEDED, RENDER_QUEUE_DEPTH, RENDERS_CANCELLED, RENDERS_IN_FLIGHT
+from api.scratch import get_scratch_pool
+from api.serialization import dump_yaml
+from api.timing import span
+from api.typst_compilers import TYPST_PACKAGE_CACHE_DIR, TypstCompilerCache
+from api.validation import VALID_THEMES
+from api.worker_pool import RenderWorkerPool
+
+logger = logging.getLogger(__name__)
+
+# "inprocess" imports rendercv once and renders inside the API process.
+# "subprocess" starts a fresh `python -m rendercv render` per request, which is
+# slower but keeps a crashing or misbehaving render isolated from the server.
+# "pool" keeps that isolation but reuses pre-warmed worker processes.
+RENDER_ENGINE = os.getenv("RENDER_ENGINE", "inprocess").strip().lower()
+
+# Worker pool sizing (only used by the "pool" engine)
+RENDER_POOL_SIZE = int(os.getenv("RENDER_POOL_SIZE", "1"))
+RENDER_WORKER_MAX_JOBS = int(os.getenv("RENDER_WORKER_MAX_JOBS", "100"))
+RENDER_WORKER_MAX_RSS_MB = float(os.getenv("RENDER_WORKER_MAX_RSS_MB", "300"))
+
+# Maximum renders running at once; further requests wait for a slot
+RENDER_CONCURRENCY = int(os.getenv("RENDER_CONCURRENCY", "2"))
+
+# Per-render limits; 0 disables a limit. A render running longer than the
+# timeout is stopped and answered with 504. CPU seconds (504) and address
+# space (413) are rlimits on the rendercv process, so they only apply to
+# the "subprocess" and "pool" engines.
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "60"))
+RENDER_CPU_SECONDS = int(os.getenv("RENDER_CPU_SECONDS", "60"))
+RENDER_MEMORY_MB = int(os.getenv("RENDER_MEMORY_MB", "0"))
+
+# Render a tiny resume per theme at startup before reporting ready (GET /ready)
+RENDER_WARMUP = os.getenv("RENDER_WARMUP", "true").strip().lower() in ("1", "true", "yes")
+# Comma-separated themes to warm; empty means all of VALID_THEMES
+RENDER_WARMUP_THEMES = tuple(
+    theme.strip() for theme in os.getenv("RENDER_WARMUP_THEMES", "").split(",") if theme.strip()
+) or VALID_THEMES
+
+
+# Artifacts rendercv can produce. Typst is the intermediate source for PDF
+# and PNG; Markdown is the intermediate source for HTML.
+FORMATS = ("pdf", "png", "typst", "markdown", "html")
+
+# File names inside a render's output directory, pinned so the YAML's own
+# settings.render_command paths can't write elsewhere.
+OUTPUT_FILES = {
+    "typst": "resume.typ",
+    "pdf": "resume.pdf",
+    "png": "resume.png",
+    "markdown": "resume.md",
+    "html": "resume.html",
+}
+
+
+@dataclass
+class RenderResult:
+    """Paths of the artifacts of one render, inside ``directory``.
+
+    Artifacts stay on disk so they can be streamed instead of held in memory.
+    Formats that weren't requested stay empty. Call ``cleanup`` once the
+    files have been sent or copied elsewhere.
+    """
+
+    directory: Path | None = None
+    pdf: Path | None = None
+    typst: Path | None = None
+    markdown: Path | None = None
+    html: Path | None = None
+    png: list[Path] = field(default_factory=list)
+
+    def files(self, stem: str) -> list[tuple[str, Path]]:
+        """Name each artifact after ``stem``, e.g. ``Jane_Doe_CV.pdf``."""
+        files = []
+        for fmt, suffix in (("pdf", "pdf"), ("typst", "typ"), ("markdown", "md"), ("html", "html")):
+            path = getattr(self, fmt)
+            if path is not None:
+                files.append((f"{stem}.{suffix}", path))
+        for page, path in enumerate(self.png, start=1):
+            files.append((f"{stem}_{page}.png", path))
+        return files
+
+    def cleanup(self) -> None:
+        """Hand the directory back to the scratch pool (or delete it)."""
+        if self.directory is not None:
+            get_scratch_pool().release(self.directory)
+
+
+def check_formats(formats) -> tuple[str, ...]:
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown or not formats:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format(s): {', '.join(unknown) or 'none given'}. Use any of: {', '.join(FORMATS)}"
+        )
+    return tuple(dict.fromkeys(formats))
+
+
+def collect_outputs(output_dir: Path, formats) -> RenderResult:
+    """Locate the requested artifacts in a render's output directory."""
+    result = RenderResult(directory=output_dir)
+    for fmt in formats:
+        if fmt == "png":
+            # One file per page: resume_1.png, resume_2.png, ...
+            result.png = sorted(
+                output_dir.glob("resume_*.png"),
+                key=lambda path: int(path.stem.rsplit("_", 1)[1]),
+            )
+            missing = not result.png
+        else:
+            path = output_dir / OUTPUT_FILES[fmt]
+            missing = not path.exists()
+            if not missing:
+                setattr(result, fmt, path)
+        if missing:
+            found = [p.name for p in output_dir.iterdir()] if output_dir.exists() else []
+            raise HTTPException(
+                status_code=500,
+                detail=f"No {fmt.upper()} was generated. Files in output: {found}"
+            )
+    return result
+
+
+def warm_up_themes(engine, themes) -> dict:
+    """Render a tiny PDF per theme with engine and time each render.
+
+    Failures are logged and reported rather than raised; warm-up is best
+    effort and real jobs report their own errors.
+    """
+    timings = {}
+    for theme in themes:
+        start = time.perf_counter()
+        error = None
+        with tempfile.TemporaryDirectory(dir=get_scratch_pool().root) as tmpdir:
+            try:
+                engine.render({"cv": {"name": "Warm Up"}, "design": {"theme": theme}}, ("pdf",), Path(tmpdir))
+            except HTTPException as e:
+                error = str(e.detail)
+                logger.warning(f"Warm-up render for theme '{theme}' failed: {error}")
+        timings[theme] = {"seconds": round(time.perf_counter() - start, 3), "error": error}
+    return timings
+
+
+def communicate(process: subprocess.Popen) -> tuple[str, str]:
+    """Wait for process to exit, killing its process group if the render is cancelled.
+
+    process must lead its own process group (``process_group=0``), so
+    anything rendercv started dies with it.
+    """
+    while True:
+        try:
+            return process.communicate(timeout=CANCEL_POLL_SECONDS)
+        except subprocess.TimeoutExpired:
+            if cancel_requested():
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                process.communicate()
+                raise RenderCancelled()
+
+
+def check_exit(returncode: int, stderr: str) -> None:
+    """Raise RenderLimitExceeded if rendercv died from hitting an rlimit."""
+    # Not SIGKILL: the OOM killer and cancellation (killpg) send that too
+    if returncode == -signal.SIGXCPU and RENDER_CPU_SECONDS:
+        raise RenderLimitExceeded.cpu(RENDER_CPU_SECONDS)
+    # Python raises MemoryError, Rust (Typst) aborts with this message
+    if RENDER_MEMORY_MB and ("MemoryError" in stderr or "memory allocation of" in stderr):
+        raise RenderLimitExceeded.memory(RENDER_MEMORY_MB)
+
+
+class SubprocessEngine:
+    """Render by running the rendercv CLI in a child interpreter."""
+
+    name = "subprocess"
+
+    def render(self, document: str | dict, formats, output_dir: Path) -> RenderResult:
+        # The CLI only reads files, so dicts have to go through YAML here
+        yaml_content = document if isinstance(document, str) else dump_yaml(document)
+        with tempfile.TemporaryDirectory(dir=get_scratch_pool().root) as tmpdir:
+            yaml_path = Path(tmpdir) / "resume.yaml"
+            yaml_path.write_text(yaml_content)
+
+            command = [sys.executable, "-m", "rendercv", "render", str(yaml_path)]
+            for fmt, file_name in OUTPUT_FILES.items():
+                command += [f"--{fmt}-path", str(output_dir / file_name)]
+            # Only produce what the caller asked for
+            if not {"typst", "pdf", "png"} & set(formats):
+                command.append("--dont-generate-typst")
+            if not {"markdown", "html"} & set(formats):
+                command.append("--dont-generate-markdown")
+            for fmt in ("pdf", "png", "html"):
+                if fmt not in formats:
+                    command.append(f"--dont-generate-{fmt}")
+
+            # Run rendercv using the same Python interpreter. Interpreter
+            # startup and every render step are inside this one span.
+            with span("subprocess"):
+                process = subprocess.Popen(
+                    command,
+                    cwd=tmpdir,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    process_group=0,
+                )
+                try:
+                    # Applied right after start; interpreter startup is well
+                    # within any sensible limit
+                    limit_process(process.pid, RENDER_CPU_SECONDS, RENDER_MEMORY_MB)
+                except ProcessLookupError:
+                    pass
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not apply render resource limits: {e}")
+                stdout, stderr = communicate(process)
+
+            if process.returncode != 0:
+                check_exit(process.returncode, stderr)
+                error_msg = stderr or stdout or "Unknown error"
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"rendercv failed: {error_msg}"
+                )
+
+            if not any(output_dir.iterdir()):
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"No output was created. stdout: {stdout}, stderr: {stderr}"
+                )
+
+            return collect_outputs(output_dir, formats)
+
+    def warm_up(self, themes=VALID_THEMES) -> dict:
+        """Fills the Typst package cache and the OS page cache for rendercv."""
+        return warm_up_themes(self, themes)
+
+    def stats(self) -> dict:
+        return {"engine": self.name}
+
+
+class InProcessEngine:
+    """Render through rendercv's Python API without leaving the process.
+
+    rendercv, pydantic models and Jinja templates are imported once when the
+    engine is created. Typst compilers (font book, package imports) are kept
+    per theme and reused by later renders of that theme.
+    """
+
+    name = "inprocess"
+
+    def __init__(self):
+        import ruamel.yaml
+        from rendercv.exception import RenderCVUserError, RenderCVUserValidationError
+        from rendercv.renderer.html import generate_html
+        from rendercv.renderer.markdown import generate_markdown
+        from rendercv.renderer.path_resolver import resolve_rendercv_file_path
+        from rendercv.renderer.pdf_png import copy_photo_next_to_typst_file
+        from rendercv.renderer.typst import generate_typst
+        from rendercv.schema.rendercv_model_builder import (
+            build_rendercv_dictionary_and_model,
+            build_rendercv_model_from_commented_map,
+        )
+
+        self._build_model = build_rendercv_dictionary_and_model
+        self._build_model_from_dict = build_rendercv_model_from_commented_map
+        self._generate_typst = generate_typst
+        self._resolve_path = resolve_rendercv_file_path
+        self._copy_photo = copy_photo_next_to_typst_file
+        self.compilers = TypstCompilerCache(TYPST_PACKAGE_CACHE_DIR or None)
+        self._generate_markdown = generate_markdown
+        self._generate_html = generate_html
+        self._yaml_error = ruamel.yaml.YAMLError
+        self._user_error = RenderCVUserError
+        self._validation_error = RenderCVUserValidationError
+
+    def _model(self, document: str | dict, output_dir: Path):
+        paths = {f"{fmt}_path": output_dir / name for fmt, name in OUTPUT_FILES.items()}
+        if isinstance(document, str):
+            return self._build_model(document, **paths)[1]
+        # Same as what build_rendercv_dictionary does for YAML input, without
+        # modifying the caller's dict
+        settings = document.get("settings") or {}
+        render_command = {**(settings.get("render_command") or {}), **paths}
+        return self._build_model_from_dict(
+            {**document, "settings": {**settings, "render_command": render_command}}
+        )
+
+    def _compile(self, model, typst_path: Path, formats) -> None:
+        """Compile Typst source to PDF/PNG like rendercv's generate_pdf/png,
+        but with a cached compiler for the theme instead of a fresh one."""
+        render_command = model.settings.render_command
+        self._copy_photo(model, typst_path)
+        with self.compilers.compiler(model.design.theme) as compiler:
+            if "pdf" in formats:
+                pdf_path = self._resolve_path(model, render_command.pdf_path)
+                with span("pdf_compile"):
+                    compiler.compile(input=typst_path, output=pdf_path, format="pdf", root=typst_path.parent)
+            if "png" in formats:
+                check_cancelled()
+                png_path = self._resolve_path(model, render_command.png_path)
+                with span("png_compile"):
+                    pages = compiler.compile(input=typst_path, format="png", root=typst_path.parent)
+                if not isinstance(pages, list):
+                    pages = [pages]
+                for page, content in enumerate(pages, start=1):
+                    (png_path.parent / f"{png_path.stem}_{page}.png").write_bytes(content)
+
+    def render(self, document: str | dict, formats, output_dir: Path) -> RenderResult:
+        try:
+            with span("rendercv_model"):
+                model = self._model(document, output_dir)
+            # Compiles can't be interrupted, so a cancelled render stops
+            # at the next step instead
+            check_cancelled()
+            if {"typst", "pdf", "png"} & set(formats):
+                with span("typst_source"):
+                    typst_path = self._generate_typst(model)
+                if {"pdf", "png"} & set(formats):
+                    check_cancelled()
+                    self._compile(model, typst_path, formats)
+            if {"markdown", "html"} & set(formats):
+                with span("markdown"):
+                    markdown_path = self._generate_markdown(model)
+                if "html" in formats:
+                    with span("html"):
+                        self._generate_html(model, markdown_path)
+        except self._validation_error as e:
+            details = "; ".join(
+                f"{'.'.join(err.location)}: {err.message}" for err in e.validation_errors
+            )
+            raise HTTPException(status_code=500, detail=f"rendercv failed: {details}")
+        except self._yaml_error as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"rendercv failed: This is not a valid YAML file! {e}"
+            )
+        except self._user_error as e:
+            raise HTTPException(status_code=500, detail=f"rendercv failed: {e.message}")
+        except (RenderCancelled, CpuTimeExceeded, MemoryError):
+            raise
+        except Exception as e:
+            logger.exception("In-process render failed")
+            raise HTTPException(status_code=500, detail=f"rendercv failed: {e}")
+
+        return collect_outputs(output_dir, formats)
+
+    def warm_up(self, themes=VALID_THEMES) -> dict:
+        """Render a tiny PDF per theme so its compiler is ready for real jobs."""
+        return warm_up_themes(self, themes)
+
+    def stats(self) -> dict:
+        return {"engine": self.name, "typst": self.compilers.stats()}
+
+
+class PoolEngine:
+    """Render in a pool of long-lived worker processes (see RenderWorkerPool)."""
+
+    name = "pool"
+
+    def __init__(self):
+        self.pool = RenderWorkerPool(
+            size=RENDER_POOL_SIZE,
+            max_jobs=RENDER_WORKER_MAX_JOBS,
+            max_rss_mb=RENDER_WORKER_MAX_RSS_MB,
+            warmup_themes=RENDER_WARMUP_THEMES if RENDER_WARMUP else (),
+            cpu_seconds=RENDER_CPU_SECONDS,
+            memory_mb=RENDER_MEMORY_MB,
+        )
+
+    def render(self, document: str | dict, formats, output_dir: Path) -> RenderResult:
+        return self.pool.render(document, formats, output_dir)
+
+    def warm_up(self, themes=VALID_THEMES) -> dict:
+        """Wait for every worker to finish its own warm-up.
+
+        Workers warm up as soon as they start, so ``themes`` is fixed when
+        the pool is created. Reports the slowest worker for each theme.
+        """
+        timings = {}
+        for worker_timings in self.pool.wait_ready():
+            for theme, timing in worker_timings.items():
+                if theme not in timings or timing["seconds"] > timings[theme]["seconds"]:
+                    timings[theme] = timing
+        return timings
+
+    def stats(self) -> dict:
+        return {"engine": self.name, **self.pool.stats()}
+
+    def close(self):
+        self.pool.close()
+
+
+ENGINES = {
+    SubprocessEngine.name: SubprocessEngine,
+    InProcessEngine.name: InProcessEngine,
+    PoolEngine.name: PoolEngine,
+}
+
+_engine = None
+
+
+def get_engine():
+    """Return the configured engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        if RENDER_ENGINE not in ENGINES:
+            raise RuntimeError(
+                f"Unknown RENDER_ENGINE '{RENDER_ENGINE}'. Use one of: {', '.join(ENGINES)}"
+            )
+        _engine = ENGINES[RENDER_ENGINE]()
+        logger.info(f"Using '{_engine.name}' render engine")
+        # Only when set explicitly: the CPU default is meant for the other engines
+        if _engine.name == "inprocess" and {"RENDER_CPU_SECONDS", "RENDER_MEMORY_MB"} & os.environ.keys():
+            logger.warning(
+                "RENDER_CPU_SECONDS and RENDER_MEMORY_MB are not enforced by the 'inprocess' engine; "
+                "only RENDER_TIMEOUT_SECONDS applies, and a timed-out render keeps its slot until its "
+                "next cancellation check. Use RENDER_ENGINE=pool or subprocess to enforce them."
+            )
+    return _engine
+
+
+_render_slots = asyncio.Semaphore(RENDER_CONCURRENCY)
+
+_admission: AdmissionController | None = None
+
+
+def get_admission() -> AdmissionController:
+    """Return the render time estimates and queue accounting, creating them on first use."""
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController(RENDER_CONCURRENCY)
+    return _admission
+
+
+def render_sync(document: str | dict, formats=("pdf",)) -> RenderResult:
+    """Render into an empty scratch directory owned by the returned result."""
+    formats = check_formats(formats)
+    scratch = get_scratch_pool()
+    output_dir = scratch.acquire()
+    try:
+        start = time.perf_counter()
+        with span("render"):
+            result = get_engine().render(document, formats, output_dir)
+    except BaseException:
+        scratch.release(output_dir)
+        raise
+    get_admission().observe(document_theme(document), time.perf_counter() - start)
+    if result.pdf is not None:
+        PDF_BYTES.observe(result.pdf.stat().st_size)
+    return result
+
+
+async def render(document: str | dict, formats=("pdf",)) -> RenderResult:
+    """Render the requested formats without blocking the event loop.
+
+    The engine runs in a worker thread (engine creation included, since the
+    first one imports rendercv), and at most RENDER_CONCURRENCY renders run
+    at the same time. The caller owns the result and must ``cleanup()`` it.
+    If the caller is cancelled, a queued render is dropped and a running one
+    is stopped as soon as the engine allows; its output is discarded.
+    """
+    formats = check_formats(formats)
+    admission = get_admission()
+    pending = admission.start(document_theme(document))
+    RENDER_QUEUE_DEPTH.inc()
+    try:
+        with span("render_queue"):
+            await _render_slots.acquire()
+    except asyncio.CancelledError:
+        RENDERS_CANCELLED.inc(stage="queued")
+        admission.finish(pending)
+        raise
+    finally:
+        RENDER_QUEUE_DEPTH.dec()
+    RENDERS_IN_FLIGHT.inc()
+    with cancel_scope() as cancel:
+        future = asyncio.ensure_future(asyncio.to_thread(render_sync, document, formats))
+    # The slot is held until the thread is done, even if the caller gives up
+    future.add_done_callback(_render_finished)
+    future.add_done_callback(lambda _: admission.finish(pending))
+    try:
+        async with asyncio.timeout(RENDER_TIMEOUT_SECONDS or None):
+            return await asyncio.shield(future)
+    except (asyncio.CancelledError, TimeoutError) as e:
+        # Ask the engine to stop (killing its rendercv process where there
+        # is one) and discard whatever it still produces
+        cancel.set()
+        future.add_done_callback(_discard_result)
+        if isinstance(e, TimeoutError):
+            RENDER_LIMITS_EXCEEDED.inc(limit="timeout")
+            raise RenderLimitExceeded.timeout(RENDER_TIMEOUT_SECONDS) from None
+        RENDERS_CANCELLED.inc(stage="running")
+        raise
+    except RenderLimitExceeded as e:
+        RENDER_LIMITS_EXCEEDED.inc(limit=e.limit)
+        raise
+
+
+def _render_finished(future: asyncio.Future) -> None:
+    RENDERS_IN_FLIGHT.dec()
+    _render_slots.release()
+
+
+def _discard_result(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().cleanup()
+
+
+# Warm-up progress, reported by GET /ready
+_warmup: dict = {"status": "pending"}
+
+
+def warm_up_engine(themes=RENDER_WARMUP_THEMES) -> dict:
+    """Create the engine and render a tiny resume per theme with it.
+
+    Runs once at startup; the instance reports ready when this returns.
+    """
+    global _warmup
+    _warmup = {"status": "warming_up"}
+    start = time.perf_counter()
+    try:
+        engine = get_engine()
+        timings = engine.warm_up(themes)
+    except Exception as e:
+        logger.exception("Render warm-up failed")
+        _warmup = {"status": "failed", "error": str(e)}
+    else:
+        _warmup = {
+            "status": "ready",
+            "engine": engine.name,
+            "seconds": round(time.perf_counter() - start, 3),
+            "themes": timings,
+        }
+        logger.info(f"Render warm-up finished in {_warmup['seconds']}s")
+    return _warmup
+
+
+def skip_warm_up() -> None:
+    """Report ready straight away (RENDER_WARMUP=false)."""
+    global _warmup
+    _warmup = {"status": "ready", "skipped": True}
+
+
+def warmup_status() -> dict:
+    return dict(_warmup)
+
+
+def engine_stats() -> dict:
+    """Stats of the engine if it has been created, without creating it."""
+    return _engine.stats() if _engine is not None else {}
+
+
+def shutdown_engine():
+    """Release engine resources (worker processes) on application shutdown."""
+    global _engine
+    if _engine is not None and hasattr(_engine, "close"):
+        _engine.close()
+    _engine = None
@@ -0,0 +1,127 @@
+"""Scratch directories for render output, kept in RAM and reused between jobs."""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# "auto" uses /dev/shm (RAM-backed) when it is writable and falls back to the
+# system temp directory; any other value is used as the scratch root.
+RENDER_SCRATCH_DIR = os.getenv("RENDER_SCRATCH_DIR", "auto")
+# Emptied directories kept around for the next render
+RENDER_SCRATCH_KEEP = int(os.getenv("RENDER_SCRATCH_KEEP", "8"))
+
+SHM_DIR = Path("/dev/shm")
+
+
+def scratch_root() -> Path:
+    """Directory under which render scratch space is created."""
+    if RENDER_SCRATCH_DIR != "auto":
+        root = Path(RENDER_SCRATCH_DIR)
+        root.mkdir(parents=True, exist_ok=True)
+        return root
+    if SHM_DIR.is_dir() and os.access(SHM_DIR, os.W_OK | os.X_OK):
+        return SHM_DIR
+    return Path(tempfile.gettempdir())
+
+
+def clear_directory(path: Path) -> None:
+    """Remove everything inside path, keeping path itself."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+class ScratchPool:
+    """Hands out empty directories and takes them back for reuse.
+
+    Released directories are wiped and kept (up to ``keep``) instead of
+    being deleted, so steady-state renders don't create or remove
+    directories at all. Directories the pool didn't create are deleted on
+    release.
+    """
+
+    def __init__(self, root: Path, keep: int = 8):
+        self.root = root
+        self.keep = keep
+        self._free: list[Path] = []
+        self._owned: set[Path] = set()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+
+    def acquire(self) -> Path:
+        with self._lock:
+            if self._free:
+                self._reused += 1
+                return self._free.pop()
+        path = Path(tempfile.mkdtemp(prefix="render-", dir=self.root))
+        with self._lock:
+            self._owned.add(path)
+            self._created += 1
+        return path
+
+    def release(self, path: Path) -> None:
+        with self._lock:
+            owned = path in self._owned
+            reuse = owned and len(self._free) < self.keep
+            if owned and not reuse:
+                self._owned.discard(path)
+        if reuse:
+            try:
+                clear_directory(path)
+            except OSError as e:
+                logger.warning(f"Could not clear scratch directory {path}: {e}")
+                reuse = False
+                with self._lock:
+                    self._owned.discard(path)
+        if reuse:
+            with self._lock:
+                self._free.append(path)
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def close(self) -> None:
+        with self._lock:
+            owned, self._owned, self._free = self._owned, set(), []
+        for path in owned:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self) -> dict:
+        return {
+            "root": str(self.root),
+            "free": len(self._free),
+            "in_use": len(self._owned) - len(self._free),
+            "created": self._created,
+            "reused": self._reused,
+        }
+
+
+_scratch: ScratchPool | None = None
+
+
+def get_scratch_pool() -> ScratchPool:
+    """Return the process-wide scratch pool, creating it on first use."""
+    global _scratch
+    if _scratch is None:
+        _scratch = ScratchPool(scratch_root(), RENDER_SCRATCH_KEEP)
+        logger.info(f"Rendering into scratch space under {_scratch.root}")
+    return _scratch
+
+
+def shutdown_scratch() -> None:
+    """Delete the scratch directories on application shutdown."""
+    global _scratch
+    if _scratch is not None:
+        _scratch.close()
+    _scratch = None
@@ -0,0 +1,56 @@
+"""YAML emit/parse helpers, using libyaml's C implementation when available."""
+
+import yaml
+
+from api.timing import timed
+
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:
+    # PyYAML built without libyaml
+    from yaml import SafeDumper, SafeLoader
+
+
+@timed("yaml_dump")
+def dump_yaml(data) -> str:
+    """Serialize data as block-style YAML, keeping key order and unicode."""
+    return yaml.dump(data, Dumper=SafeDumper, default_flow_style=False, allow_unicode=True, sort_keys=False)
+
+
+def load_yaml(text: str):
+    """Parse YAML text into plain Python objects."""
+    return yaml.load(text, Loader=SafeLoader)
+
+
+def load_yaml_without_aliases(text: str):
+    """Parse YAML text like load_yaml, raising yaml.YAMLError if it uses aliases.
+
+    Expanding aliases can turn a few hundred bytes into gigabytes (a "billion
+    laughs" document), so this is for parsing untrusted text outside the
+    render's limits.
+    """
+    loader = SafeLoader(text)
+    try:
+        node = loader.get_single_node()
+        if node is not None and _shares_nodes(node):
+            raise yaml.YAMLError("YAML aliases are not allowed here")
+        return loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+
+
+def _shares_nodes(root) -> bool:
+    """Whether a composed node graph reaches any node twice, as aliases do."""
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            return True
+        seen.add(id(node))
+        if isinstance(node, yaml.MappingNode):
+            for key, value in node.value:
+                stack += (key, value)
+        elif isinstance(node, yaml.SequenceNode):
+            stack += node.value
+    return False
@@ -0,0 +1,112 @@
+"""Coalescing of identical renders that are in flight at the same time.
+
+Within a process, concurrent requests for the same key wait on one shared
+task. Across uvicorn workers, a lock file next to the shared disk cache lets
+one process render while the others wait and then read the cached result.
+"""
+
+import asyncio
+import fcntl
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from api.cancellation import CANCEL_POLL_SECONDS
+from api.metrics import RENDERS_COALESCED
+
+
+class Flight:
+    """One shared render and the requests holding on to its result.
+
+    Each holder calls ``release`` once it no longer needs the result. The
+    result is cleaned up after the last release; if every holder gives up
+    before the render finishes, the render is cancelled.
+    """
+
+    def __init__(self, task: asyncio.Future, cleanup: Callable | None):
+        self.task = task
+        self.holders = 0
+        self._cleanup = cleanup
+
+    @property
+    def result(self):
+        return self.task.result()
+
+    def release(self) -> None:
+        self.holders -= 1
+        if self.holders > 0:
+            return
+        if not self.task.done():
+            self.task.cancel()
+        elif self._cleanup is not None and not self.task.cancelled() and self.task.exception() is None:
+            self._cleanup(self.task.result())
+
+
+class SingleFlight:
+    """Share one call of an async function between concurrent callers with the same key."""
+
+    def __init__(self, cleanup: Callable | None = None):
+        self.cleanup = cleanup
+        self._flights: dict[str, Flight] = {}
+
+    def in_flight(self, key: str) -> bool:
+        flight = self._flights.get(key)
+        return flight is not None and not flight.task.done()
+
+    async def join(self, key: str, start: Callable[[], Awaitable]) -> Flight:
+        """Wait for the flight for key, starting it with ``start()`` if there is none.
+
+        The returned flight holds the result until ``release`` is called.
+        """
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done():
+            flight = Flight(asyncio.ensure_future(start()), self.cleanup)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            RENDERS_COALESCED.inc()
+        flight.holders += 1
+        try:
+            await asyncio.shield(flight.task)
+        except BaseException:
+            flight.release()
+            if flight.holders == 0:
+                # Abandoned: the next request for key starts a new render
+                self._forget(key, flight)
+            raise
+        return flight
+
+    def _forget(self, key: str, flight: Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        return {"in_flight": sum(not flight.task.done() for flight in self._flights.values())}
+
+
+@asynccontextmanager
+async def file_lock(path: Path):
+    """Hold an exclusive lock on path, shared between processes on this host.
+
+    Waiting polls instead of blocking a thread, so it can be cancelled. The
+    file is removed before the lock is released; a process still waiting on
+    the old file gets the lock afterwards and finds the result cached.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                await asyncio.sleep(CANCEL_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,82 @@
+"""Named timing spans collected per request.
+
+Code on the request path wraps its work in ``span("name")``. Durations go
+into the ``render_stage_duration_seconds`` histogram and, while a request is
+being handled, into that request's spans, which the API reports in the
+``Server-Timing`` response header and the access log. Recording a span costs two
+``perf_counter`` calls and a dict update.
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from api.metrics import STAGE_SECONDS
+
+# Send a Server-Timing header with every response
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").strip().lower() in ("1", "true", "yes")
+
+# name -> seconds of the request being handled. Spans with the same name
+# (e.g. one render per batch item) are summed.
+_spans: ContextVar[dict[str, float] | None] = ContextVar("timing_spans", default=None)
+
+
+def start_request() -> dict[str, float]:
+    """Start collecting spans for the current request and return them.
+
+    Threads started with ``asyncio.to_thread`` inherit the collection.
+    """
+    spans: dict[str, float] = {}
+    _spans.set(spans)
+    return spans
+
+
+def record(name: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, stage=name)
+    spans = _spans.get()
+    if spans is not None:
+        spans[name] = spans.get(name, 0.0) + seconds
+
+
+def record_all(spans: dict[str, float]) -> None:
+    """Record spans measured elsewhere, e.g. in a render worker process."""
+    for name, seconds in spans.items():
+        record(name, seconds)
+
+
+@contextmanager
+def span(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator recording every call of a function as a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect():
+    """Collect spans into a fresh dict, separate from any request's spans."""
+    spans: dict[str, float] = {}
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def server_timing(spans: dict[str, float]) -> str:
+    """Format spans as a Server-Timing header value, in milliseconds."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in spans.items())
@@ -0,0 +1,69 @@
+"""Long-lived Typst compilers, kept per theme and reused across renders."""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Where Typst keeps downloaded packages (rendercv's theme package). Empty
+# uses Typst's default, ~/.cache/typst/packages.
+TYPST_PACKAGE_CACHE_DIR = os.getenv("TYPST_PACKAGE_CACHE_DIR", "")
+
+
+class TypstCompilerCache:
+    """Free lists of ``typst.Compiler`` instances keyed by theme.
+
+    Creating a compiler scans every font folder to build the font book, and
+    its first compile parses the theme's package imports. Reusing the same
+    compiler for later renders of that theme skips both, leaving only the
+    resume-specific content to compile. A compiler is used by one render
+    at a time; concurrent renders of the same theme each get their own.
+    """
+
+    def __init__(self, package_cache_path: str | None = None):
+        self.package_cache_path = package_cache_path
+        self._free: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+
+    def _create(self):
+        import rendercv_fonts
+        import typst
+
+        options = {}
+        if self.package_cache_path:
+            options["package_cache_path"] = self.package_cache_path
+        # Same font folders rendercv's own get_typst_compiler uses
+        return typst.Compiler(
+            font_paths=[*rendercv_fonts.paths_to_font_folders, Path.cwd() / "fonts"],
+            **options,
+        )
+
+    @contextmanager
+    def compiler(self, theme: str):
+        """Borrow a compiler for theme, creating one if none is free."""
+        with self._lock:
+            free = self._free.setdefault(theme, [])
+            compiler = free.pop() if free else None
+            if compiler is None:
+                self._created += 1
+            else:
+                self._reused += 1
+        if compiler is None:
+            compiler = self._create()
+        try:
+            yield compiler
+        finally:
+            with self._lock:
+                self._free[theme].append(compiler)
+
+    def stats(self) -> dict:
+        return {
+            "themes": sorted(self._free),
+            "compilers_created": self._created,
+            "compilers_reused": self._reused,
+        }
@@ -0,0 +1,101 @@
+"""Reusable field types for the resume models.
+
+Patterns are compiled once at import and membership checks use frozensets,
+so validating a resume with many entries does no per-call setup work.
+"""
+
+import re
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+# Ordered for error messages; the frozensets below are used for lookups
+VALID_NETWORKS = (
+    "LinkedIn", "GitHub", "GitLab", "IMDB", "Instagram", "ORCID",
+    "Mastodon", "StackOverflow", "ResearchGate", "YouTube",
+    "Google Scholar", "Telegram", "WhatsApp", "Leetcode", "X", "Bluesky",
+)
+VALID_THEMES = ("classic", "engineeringclassic", "engineeringresumes", "moderncv", "sb2nov")
+
+_NETWORKS = frozenset(VALID_NETWORKS)
+_THEMES = frozenset(VALID_THEMES)
+
+# YYYY, YYYY-MM or YYYY-MM-DD
+DATE_PATTERN = re.compile(r"\d{4}(-\d{2})?(-\d{2})?")
+PHONE_PATTERN = re.compile(r"\+\d{10,15}")
+# StackOverflow usernames are "user_id/username"
+STACKOVERFLOW_PATTERN = re.compile(r"\d+/[\w-]+")
+
+_PHONE_PUNCTUATION = str.maketrans("", "", " -()")
+
+
+def required_str(message: str = "This field cannot be empty"):
+    """A string that must not be blank; surrounding whitespace is stripped."""
+    def check(v: str) -> str:
+        v = v.strip()
+        if not v:
+            raise ValueError(message)
+        return v
+    return Annotated[str, AfterValidator(check)]
+
+
+def _check_date(v: str) -> str:
+    if v.lower() == "present":
+        return "present"
+    if not DATE_PATTERN.fullmatch(v):
+        raise ValueError(f"Date '{v}' should be in YYYY-MM format (e.g., 2020-01) or 'present'")
+    return v
+
+
+def _check_optional_date(v: str | None) -> str | None:
+    if not v:
+        return None
+    if v.lower() == "present":
+        return "present"
+    if not DATE_PATTERN.fullmatch(v):
+        raise ValueError(f"Date '{v}' should be in YYYY-MM format (e.g., 2020-01)")
+    return v
+
+
+def _check_phone(v: str | None) -> str | None:
+    if not v:
+        return None
+    # Must start with + and contain only digits after
+    cleaned = v.translate(_PHONE_PUNCTUATION)
+    if not PHONE_PATTERN.fullmatch(cleaned):
+        raise ValueError(
+            "Phone number should be in international format starting with + "
+            "(e.g., +14155551234). Remove spaces, dashes, and parentheses."
+        )
+    return cleaned
+
+
+def _check_network(v: str) -> str:
+    if v not in _NETWORKS:
+        raise ValueError(
+            f"'{v}' is not a valid social network. "
+            f"Use one of: {', '.join(VALID_NETWORKS)}"
+        )
+    return v
+
+
+def _check_theme(v: str) -> str:
+    if v not in _THEMES:
+        raise ValueError(f"Theme must be one of: {', '.join(VALID_THEMES)}")
+    return v
+
+
+def check_stackoverflow_username(username: str) -> None:
+    if not STACKOVERFLOW_PATTERN.fullmatch(username):
+        raise ValueError(
+            f"StackOverflow username should be in format 'user_id/username' "
+            f"(e.g., '12345678/john-doe'), got '{username}'"
+        )
+
+
+RequiredStr = required_str()
+DateStr = Annotated[str, AfterValidator(_check_date)]
+OptionalDateStr = Annotated[str | None, AfterValidator(_check_optional_date)]
+PhoneStr = Annotated[str | None, AfterValidator(_check_phone)]
+NetworkStr = Annotated[str, AfterValidator(_check_network)]
+ThemeStr = Annotated[str, AfterValidator(_check_theme)]
@@ -0,0 +1,256 @@
+"""Pool of long-lived, pre-warmed rendercv worker processes."""
+
+import logging
+import multiprocessing
+import queue
+import resource
+import signal
+import threading
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from api.cancellation import CANCEL_POLL_SECONDS, RenderCancelled, cancel_requested, check_cancelled
+from api.limits import (
+    CpuTimeExceeded, RenderLimitExceeded, clear_cpu_limit, handle_cpu_limit, limit_cpu_from_now, limit_memory,
+)
+from api.timing import collect, record_all, span
+
+logger = logging.getLogger(__name__)
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker_main(conn, warmup_themes=(), cpu_seconds=0, memory_mb=0):
+    """Worker loop: warm up, then receive a job, render it, send the result back.
+
+    Each job may use ``cpu_seconds`` of CPU time; the worker's address space
+    is capped at ``memory_mb`` once warm-up is done. A job that runs out of
+    memory retires the worker, whose heap may be left in a bad state.
+    """
+    from api.rendering import InProcessEngine
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    engine = InProcessEngine()
+    # Load rendercv, the theme templates and the fonts before the first job
+    try:
+        timings = engine.warm_up(warmup_themes)
+    except Exception:
+        # Warm-up is best effort; real jobs will report their own errors.
+        timings = {}
+    conn.send(("ready", timings))
+    limit_memory(memory_mb)
+    handle_cpu_limit()
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        job, formats, output_dir = message
+        # Spans can't cross the pipe on their own; send them with the reply
+        peak_rss_mb = None
+        with collect() as spans:
+            try:
+                if cpu_seconds:
+                    limit_cpu_from_now(cpu_seconds)
+                reply = ("ok", engine.render(job, formats, Path(output_dir)))
+            except CpuTimeExceeded:
+                reply = ("limit", "cpu", cpu_seconds)
+            except MemoryError:
+                reply = ("limit", "memory", memory_mb)
+                # Reported as over any RSS limit so the pool recycles us
+                peak_rss_mb = float("inf")
+            except HTTPException as e:
+                reply = ("error", e.status_code, e.detail)
+            except Exception as e:
+                reply = ("error", 500, f"rendercv failed: {e}")
+            finally:
+                if cpu_seconds:
+                    clear_cpu_limit()
+        conn.send((*reply, spans, peak_rss_mb or _peak_rss_mb()))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, ctx, warmup_themes=(), cpu_seconds=0, memory_mb=0):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, warmup_themes, cpu_seconds, memory_mb), daemon=True
+        )
+        self.process.start()
+        # Close our copy so recv() raises EOFError if the worker dies
+        child_conn.close()
+        self.jobs = 0
+        self.warmup: dict | None = None
+
+    def wait_ready(self) -> dict:
+        """Block until the worker has warmed up; returns its warm-up timings."""
+        if self.warmup is None:
+            _, self.warmup = self.conn.recv()
+        return self.warmup
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class RenderWorkerPool:
+    """Fixed-size pool of rendercv processes fed over pipes.
+
+    Workers are recycled after ``max_jobs`` renders or once their peak RSS
+    passes ``max_rss_mb``, so leaks in rendercv/Typst can't grow unbounded.
+    Each job may use ``cpu_seconds`` of CPU time and ``memory_mb`` of address
+    space (0 for no limit). ``render`` blocks the calling thread until a
+    worker is free.
+    """
+
+    def __init__(self, size: int = 1, max_jobs: int = 100, max_rss_mb: float = 300,
+                 warmup_themes=(), cpu_seconds: int = 0, memory_mb: int = 0):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.warmup_themes = tuple(warmup_themes)
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._busy = 0
+        self._jobs_completed = 0
+        self._recycled = 0
+        self._closed = False
+        for _ in range(size):
+            self._idle.put(self._start_worker())
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "busy": self._busy,
+            "idle": self._idle.qsize(),
+            "queue_depth": self._waiting,
+            "jobs_completed": self._jobs_completed,
+            "workers_recycled": self._recycled,
+        }
+
+    def render(self, job: str | dict, formats, output_dir: Path):
+        """Render a rendercv document (YAML text or dict) into output_dir.
+
+        Artifacts are written to disk by the worker; only their paths come
+        back over the pipe.
+        """
+        if self._closed:
+            raise HTTPException(status_code=503, detail="Render pool is shut down")
+
+        with self._lock:
+            self._waiting += 1
+        try:
+            with span("pool_wait"):
+                worker = self._next_idle()
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            self._busy += 1
+
+        try:
+            try:
+                worker.wait_ready()
+                worker.conn.send((job, tuple(formats), str(output_dir)))
+                while not worker.conn.poll(CANCEL_POLL_SECONDS):
+                    if cancel_requested():
+                        # The worker is mid-render; killing it is the only way to stop it
+                        logger.info("Render cancelled; replacing its worker")
+                        worker = self._replace(worker, kill=True)
+                        raise RenderCancelled()
+                status, *payload, spans, rss_mb = worker.conn.recv()
+            except (EOFError, OSError):
+                logger.error("Render worker died mid-job; replacing it")
+                worker = self._replace(worker)
+                raise HTTPException(status_code=500, detail="rendercv failed: render worker crashed")
+
+            record_all(spans)
+            worker.jobs += 1
+            with self._lock:
+                self._jobs_completed += 1
+            if worker.jobs >= self.max_jobs or rss_mb > self.max_rss_mb:
+                logger.info(
+                    f"Recycling render worker after {worker.jobs} jobs ({rss_mb:.0f} MB peak RSS)"
+                )
+                worker = self._replace(worker)
+
+            if status == "limit":
+                limit, value = payload
+                raise getattr(RenderLimitExceeded, limit)(value)
+            if status == "error":
+                status_code, detail = payload
+                raise HTTPException(status_code=status_code, detail=detail)
+            return payload[0]
+        finally:
+            with self._lock:
+                self._busy -= 1
+            if self._closed:
+                worker.stop()
+            else:
+                self._idle.put(worker)
+
+    def _next_idle(self) -> _Worker:
+        """Wait for an idle worker, giving up if the render is cancelled."""
+        while True:
+            try:
+                return self._idle.get(timeout=CANCEL_POLL_SECONDS)
+            except queue.Empty:
+                check_cancelled()
+
+    def wait_ready(self) -> list[dict]:
+        """Wait until every worker has warmed up; returns each one's timings."""
+        workers = [self._idle.get() for _ in range(self.size)]
+        timings = []
+        try:
+            for index, worker in enumerate(workers):
+                try:
+                    timings.append(worker.wait_ready())
+                except (EOFError, OSError):
+                    logger.error("Render worker died during warm-up; replacing it")
+                    workers[index] = self._replace(worker)
+            return timings
+        finally:
+            for worker in workers:
+                self._idle.put(worker)
+
+    def _replace(self, worker: _Worker, kill: bool = False) -> _Worker:
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+        with self._lock:
+            self._recycled += 1
+        return self._start_worker()
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(self._ctx, self.warmup_themes, self.cpu_seconds, self.memory_mb)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                break
@@ -0,0 +1,48 @@
+"""Measure ResumeData validation throughput.
+
+Usage:
+    python benchmarks/validation.py [--iterations 2000] [--file examples/complete_resume.yaml]
+
+The rendercv YAML is converted to the API payload once; only validation
+itself is timed.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.main import ResumeData, rendercv_to_resume_data  # noqa: E402
+
+DEFAULT_FILE = Path(__file__).resolve().parent.parent / "examples" / "complete_resume.yaml"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", "-n", type=int, default=2000)
+    parser.add_argument("--file", type=Path, default=DEFAULT_FILE)
+    args = parser.parse_args()
+
+    payload = rendercv_to_resume_data(yaml.safe_load(args.file.read_text(encoding="utf-8")))
+    entries = sum(len(payload.get(section, [])) for section in ("experience", "education", "projects", "skills"))
+
+    # Warm up pydantic's validator before timing
+    for _ in range(50):
+        ResumeData.model_validate(payload)
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        ResumeData.model_validate(payload)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.file.name}: {entries} entries")
+    print(f"{args.iterations} validations in {elapsed:.3f}s")
+    print(f"{args.iterations / elapsed:,.0f} resumes/s ({elapsed / args.iterations * 1e6:.1f} us/resume)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare pure-Python and libyaml emit/parse times for resume_to_yaml output.
+
+Usage:
+    python benchmarks/yaml_serialization.py [--iterations 200]
+
+Resumes are generated with 1, 10 and 100 entries in every section.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.main import ResumeData, resume_to_yaml  # noqa: E402
+
+DUMP_OPTIONS = {"default_flow_style": False, "allow_unicode": True, "sort_keys": False}
+
+
+def make_resume(entries: int) -> ResumeData:
+    highlights = ["Shipped **feature** used by 10k users", "Cut p95 latency by 40%"]
+    return ResumeData(
+        name="Jane Doe",
+        email="jane@example.com",
+        summary="Engineer who likes fast software.",
+        experience=[
+            {"company": f"Company {i}", "position": "Engineer", "start_date": "2020-01", "highlights": highlights}
+            for i in range(entries)
+        ],
+        education=[
+            {"institution": f"University {i}", "area": "Computer Science", "degree": "BS", "end_date": "2019-06"}
+            for i in range(entries)
+        ],
+        projects=[
+            {"name": f"Project {i}", "summary": "Side project", "highlights": highlights}
+            for i in range(entries)
+        ],
+        skills=[{"label": f"Skill {i}", "details": "Python, Go, SQL"} for i in range(entries)],
+    )
+
+
+def best_of(func, iterations: int) -> float:
+    """Mean seconds per call over the fastest of three runs."""
+    runs = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        runs.append((time.perf_counter() - start) / iterations)
+    return min(runs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", "-n", type=int, default=200)
+    args = parser.parse_args()
+
+    if not yaml.__with_libyaml__:
+        sys.exit("PyYAML was built without libyaml; nothing to compare")
+
+    print(f"{'entries':>7}  {'emit py':>10}  {'emit C':>10}  {'parse py':>10}  {'parse C':>10}")
+    for entries in (1, 10, 100):
+        data = resume_to_yaml(make_resume(entries))
+        text = yaml.dump(data, Dumper=yaml.SafeDumper, **DUMP_OPTIONS)
+        assert yaml.dump(data, Dumper=yaml.CSafeDumper, **DUMP_OPTIONS) == text
+        iterations = max(1, args.iterations // entries)
+        timings = [
+            best_of(lambda: yaml.dump(data, Dumper=yaml.SafeDumper, **DUMP_OPTIONS), iterations),
+            best_of(lambda: yaml.dump(data, Dumper=yaml.CSafeDumper, **DUMP_OPTIONS), iterations),
+            best_of(lambda: yaml.load(text, Loader=yaml.SafeLoader), iterations),
+            best_of(lambda: yaml.load(text, Loader=yaml.CSafeLoader), iterations),
+        ]
+        print(f"{entries:>7}  " + "  ".join(f"{t * 1000:>8.2f}ms" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,186 @@
-def main():
-    print("Hello from resume-generator!")
+"""Offline bulk renderer for resume YAML files.
+
+Usage:
+    python main.py examples/ --output-dir rendered --jobs 4
+    python main.py --manifest resumes.txt --output-dir rendered
+
+Each file is validated against ResumeData, then rendered with rendercv in
+a process pool. PDFs keep the input's path relative to the deepest
+directory shared by all inputs, so files with the same name in different
+directories don't overwrite each other. Files whose content hash matches
+the last successful render are skipped unless --force is given.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+import yaml
+
+MANIFEST_NAME = ".render-manifest.json"
+
+_engine = None
+_scratch_dir: Path | None = None
+
+
+def _init_worker(scratch_parent: str):
+    global _engine, _scratch_dir
+    from api.rendering import InProcessEngine
+    _engine = InProcessEngine()
+    # One scratch directory per worker, emptied before each job
+    _scratch_dir = Path(tempfile.mkdtemp(prefix="worker-", dir=scratch_parent))
+
+
+def _render_file(document: str | dict, pdf_path: str) -> float:
+    """Render one resume in a pool worker and return how long it took."""
+    from fastapi import HTTPException
+    from api.scratch import clear_directory
+
+    start = time.perf_counter()
+    clear_directory(_scratch_dir)
+    try:
+        result = _engine.render(document, ("pdf",), _scratch_dir)
+    except HTTPException as e:
+        # HTTPException doesn't survive pickling back to the parent
+        raise RuntimeError(e.detail) from None
+    shutil.move(result.pdf, pdf_path)
+    return time.perf_counter() - start
+
+
+def find_inputs(paths: list[str], manifest: str | None) -> list[Path]:
+    """Collect YAML files from directories, file paths and a manifest."""
+    inputs: list[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            inputs.extend(sorted([*path.glob("*.yaml"), *path.glob("*.yml")]))
+        else:
+            inputs.append(path)
+    if manifest:
+        base = Path(manifest).parent
+        for line in Path(manifest).read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                inputs.append(base / line)
+    # Keep order, drop duplicates
+    return list(dict.fromkeys(inputs))
+
+
+def output_paths(inputs: list[Path], output_dir: Path) -> dict[Path, Path]:
+    """Map each input to its PDF, keeping its path below the inputs' common directory."""
+    if not inputs:
+        return {}
+    resolved = {path: path.resolve() for path in inputs}
+    common = Path(os.path.commonpath([path.parent for path in resolved.values()]))
+    return {path: output_dir / full.relative_to(common).with_suffix(".pdf") for path, full in resolved.items()}
+
+
+def load_resume(path: Path) -> str | dict:
+    """Validate a resume file and return the rendercv document to render.
+
+    Files may be rendercv YAML (a top-level `cv` key), returned as text, or
+    ResumeData documents as sent to the API, returned as a rendercv dict.
+    Raises ValueError if validation fails.
+    """
+    from pydantic import ValidationError
+    from api.main import ResumeData, rendercv_to_resume_data, resume_to_yaml
+    from api.serialization import load_yaml
+
+    content = path.read_text(encoding="utf-8")
+    document = load_yaml(content)
+    if not isinstance(document, dict):
+        raise ValueError("not a YAML mapping")
+
+    try:
+        if "cv" in document:
+            ResumeData.model_validate(rendercv_to_resume_data(document))
+            return content
+        data = ResumeData.model_validate(document)
+    except ValidationError as e:
+        messages = [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]
+        raise ValueError("; ".join(messages))
+    return resume_to_yaml(data)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Render resume YAML files to PDF without the API.")
+    parser.add_argument("paths", nargs="*", help="YAML files or directories of YAML files")
+    parser.add_argument("--manifest", help="file listing one YAML path per line")
+    parser.add_argument("--output-dir", "-o", default="rendered", help="where PDFs are written")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="render processes")
+    parser.add_argument("--force", action="store_true", help="re-render files that are up to date")
+    args = parser.parse_args(argv)
+
+    inputs = find_inputs(args.paths, args.manifest)
+    if not inputs:
+        parser.error("no input files given")
+
+    from api.cache import content_key
+    from api.scratch import scratch_root
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    rendered = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    pdf_paths = output_paths(inputs, output_dir)
+
+    invalid = skipped = failures = 0
+    pending: dict[Path, tuple[str | dict, str, Path]] = {}
+    for path in inputs:
+        try:
+            document = load_resume(path)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"INVALID  {path}: {e}")
+            invalid += 1
+            continue
+        pdf_path = pdf_paths[path]
+        # Content only, so unchanged files aren't rendered again every day
+        key = content_key(document)
+        if not args.force and rendered.get(str(path)) == key and pdf_path.exists():
+            print(f"UP-TO-DATE  {path}")
+            skipped += 1
+            continue
+        pdf_path.parent.mkdir(parents=True, exist_ok=True)
+        pending[path] = (document, key, pdf_path)
+
+    start = time.perf_counter()
+    if pending:
+        jobs = max(1, min(args.jobs, len(pending)))
+        with tempfile.TemporaryDirectory(prefix="render-cli-", dir=scratch_root()) as scratch_parent, \
+                ProcessPoolExecutor(jobs, mp_context=get_context("spawn"), initializer=_init_worker,
+                                    initargs=(scratch_parent,)) as pool:
+            futures = {
+                pool.submit(_render_file, document, str(pdf_path)): path
+                for path, (document, _, pdf_path) in pending.items()
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    print(f"FAILED   {path}: {e}")
+                    failures += 1
+                    rendered.pop(str(path), None)
+                    continue
+                print(f"OK  {seconds * 1000:8.0f} ms  {path} -> {pending[path][2]}")
+                rendered[str(path)] = pending[path][1]
+        manifest_path.write_text(json.dumps(rendered, indent=2))
+
+    elapsed = time.perf_counter() - start
+    done = len(pending) - failures
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(
+        f"\nRendered {done}/{len(pending)} file(s) in {elapsed:.2f}s "
+        f"({rate:.2f} resumes/s), {skipped} up to date, {invalid} invalid"
+    )
+    return 1 if failures or invalid else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
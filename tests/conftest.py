@@ -0,0 +1,117 @@
+"""Shared fixtures: a fake render engine and isolated render state."""
+
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from api import cache, rendering, scratch, timing
+from api.cache import MemoryCache
+from api.cancellation import RenderCancelled, cancel_requested
+from api.main import limiter
+from api.rendering import RenderResult
+from api.scratch import ScratchPool
+
+
+class FakeEngine:
+    """Render engine that writes placeholder artifacts instead of running rendercv.
+
+    Every rendered document is recorded in ``documents``. A render takes up
+    to ``delay`` seconds, ending early once ``release`` is set and, unless
+    ``cancellable`` is off, raising RenderCancelled when its render is
+    cancelled. Documents containing ``fail_on`` fail like a broken rendercv
+    run.
+    """
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0, fail_on: str = "Broken", cancellable: bool = True):
+        self.delay = delay
+        self.cancellable = cancellable
+        self.fail_on = fail_on
+        self.documents = []
+        self.output_dir = None
+        self.cancelled = False
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        return len(self.documents)
+
+    def render(self, document, formats, output_dir):
+        with self._lock:
+            self.documents.append(document)
+        self.output_dir = output_dir
+        self.started.set()
+        self._wait()
+        content = str(document)
+        if self.fail_on in content:
+            raise HTTPException(status_code=500, detail="rendercv failed: boom")
+
+        result = RenderResult(directory=output_dir)
+        if "pdf" in formats:
+            # A span of its own, like InProcessEngine
+            with timing.span("pdf_compile"):
+                result.pdf = output_dir / "resume.pdf"
+                result.pdf.write_bytes(b"%PDF-1.7 " + content.encode())
+        if "png" in formats:
+            for page in (1, 2):
+                path = output_dir / f"resume_{page}.png"
+                path.write_bytes(f"page {page}".encode())
+                result.png.append(path)
+        for fmt, name, text in (("typst", "resume.typ", "#cv"), ("markdown", "resume.md", "# CV"),
+                                ("html", "resume.html", "<h1>CV</h1>")):
+            if fmt in formats:
+                setattr(result, fmt, output_dir / name)
+                getattr(result, fmt).write_text(text)
+        self.finished.set()
+        return result
+
+    def _wait(self) -> None:
+        deadline = time.monotonic() + self.delay
+        while time.monotonic() < deadline and not self.release.is_set():
+            if self.cancellable and cancel_requested():
+                self.cancelled = True
+                raise RenderCancelled()
+            time.sleep(0.01)
+
+    def warm_up(self, themes):
+        return rendering.warm_up_themes(self, themes)
+
+    def stats(self):
+        return {"engine": self.name}
+
+
+@pytest.fixture(autouse=True)
+def scratch_pool(monkeypatch, tmp_path_factory):
+    """Render into a per-test directory instead of the shared scratch root."""
+    pool = ScratchPool(tmp_path_factory.mktemp("scratch"), keep=1)
+    monkeypatch.setattr(scratch, "_scratch", pool)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def make_engine(monkeypatch):
+    """Install a FakeEngine built with the given options.
+
+    The PDF cache starts empty and rate limits are off.
+    """
+
+    def make(**options) -> FakeEngine:
+        engine = FakeEngine(**options)
+        monkeypatch.setattr(rendering, "_engine", engine)
+        return engine
+
+    monkeypatch.setattr(cache, "_cache", MemoryCache(1024 * 1024))
+    monkeypatch.setattr(limiter, "enabled", False)
+    return make
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine()
@@ -0,0 +1,88 @@
+"""Tests for the structured access log."""
+
+import json
+import logging
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from api import access_log
+from api.main import app
+
+
+def access_entries(caplog) -> list[dict]:
+    return [r.access for r in caplog.records if r.name == access_log.ACCESS_LOGGER]
+
+
+class TestAccessLog:
+    """Tests for access log entries, sampling and header logging."""
+
+    @pytest.mark.asyncio
+    async def test_one_entry_per_request(self, caplog):
+        """Each request produces one entry with its route, status and spans."""
+        transport = ASGITransport(app=app)
+        with caplog.at_level(logging.INFO, logger=access_log.ACCESS_LOGGER):
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                await client.get("/jobs/missing")
+
+        entries = access_entries(caplog)
+        assert len(entries) == 1
+        assert entries[0]["route"] == "/jobs/{job_id}"
+        assert entries[0]["path"] == "/jobs/missing"
+        assert entries[0]["status"] == 404
+        assert entries[0]["sample_rate"] == 1.0
+        assert "duration_ms" in entries[0]
+
+    @pytest.mark.asyncio
+    async def test_sampled_out(self, monkeypatch, caplog):
+        """A sample rate of 0 drops successful requests."""
+        monkeypatch.setattr(access_log, "ACCESS_LOG_SAMPLE_RATE", 0.0)
+        transport = ASGITransport(app=app)
+        with caplog.at_level(logging.INFO, logger=access_log.ACCESS_LOGGER):
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                await client.get("/health")
+
+        assert access_entries(caplog) == []
+
+    def test_server_errors_always_logged(self, monkeypatch):
+        """5xx responses are logged whatever the sample rate."""
+        monkeypatch.setattr(access_log, "ACCESS_LOG_SAMPLE_RATE", 0.0)
+
+        assert access_log.sample(503) == 1.0
+        assert access_log.sample(200) is None
+
+    def test_entries_formatted_as_json(self):
+        """Access entries become one JSON object, other records stay plain text."""
+        formatter = access_log._Formatter(logging.BASIC_FORMAT)
+        entry = logging.LogRecord("api.access", logging.INFO, __file__, 1, "access", None, None)
+        entry.access = {"route": "/health", "status": 200}
+        plain = logging.LogRecord("api.main", logging.INFO, __file__, 1, "hello", None, None)
+
+        line = json.loads(formatter.format(entry))
+        assert line["route"] == "/health"
+        assert "time" in line
+        assert formatter.format(plain) == "INFO:api.main:hello"
+
+    @pytest.mark.asyncio
+    async def test_headers_not_logged_by_default(self, caplog):
+        """Request headers are only logged with LOG_REQUEST_HEADERS."""
+        transport = ASGITransport(app=app)
+        with caplog.at_level(logging.INFO):
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                await client.get("/health", headers={"X-API-Key": "secret"})
+
+        assert not any("headers" in r.getMessage() for r in caplog.records)
+
+    def test_api_key_redacted(self):
+        """Header logging never writes the API key."""
+        headers = access_log.redacted_headers({"x-api-key": "secret", "origin": "http://localhost"})
+
+        assert headers == {"x-api-key": "[redacted]", "origin": "http://localhost"}
+
+    def test_uvicorn_logs_queued(self):
+        """uvicorn's duplicate access log is off and its other logs use the queue."""
+        uvicorn_logger = logging.getLogger("uvicorn")
+
+        assert logging.getLogger("uvicorn.access").disabled
+        assert uvicorn_logger.handlers == []
+        assert uvicorn_logger.propagate
@@ -0,0 +1,101 @@
+"""Tests for render time estimates and load shedding."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import rendering
+from api.admission import AdmissionController, document_theme
+from api.main import app
+from api.metrics import ADMISSION_REJECTIONS
+
+YAML = "cv:\n  name: Jane Doe\ndesign:\n  theme: classic\n"
+
+
+@pytest.fixture
+def client(engine):
+    return TestClient(app, base_url="http://test")
+
+
+@pytest.fixture
+def busy(monkeypatch):
+    """An admission controller with 90s of renders queued on one slot."""
+    admission = AdmissionController(concurrency=1, max_wait=30, initial=2)
+    for _ in range(45):
+        admission.start("classic")
+    monkeypatch.setattr(rendering, "_admission", admission)
+    return admission
+
+
+class TestAdmissionController:
+    """Tests for the moving estimates and Retry-After calculation."""
+
+    def test_estimates_move_towards_measurements(self):
+        """Each measured render pulls its theme's estimate towards it."""
+        admission = AdmissionController(concurrency=2, initial=2, alpha=0.5)
+        admission.observe("classic", 1)
+        admission.observe("classic", 3)
+
+        assert admission.estimate("classic") == 2
+        assert admission.estimate("sb2nov") == pytest.approx(2.25)
+
+    def test_projected_wait_divides_by_concurrency(self):
+        """Pending work is shared between the render slots and drops as renders finish."""
+        admission = AdmissionController(concurrency=2, initial=3)
+        first = admission.start(None)
+        admission.start(None)
+
+        assert admission.projected_wait() == 3
+        admission.finish(first)
+        assert admission.projected_wait() == 1.5
+
+    def test_retry_after(self):
+        """Renders are admitted within budget and told how long to wait beyond it."""
+        admission = AdmissionController(concurrency=1, max_wait=10, initial=4)
+        admission.start(None)
+        admission.start(None)
+        assert admission.retry_after() is None
+
+        for _ in range(3):
+            admission.start(None)
+        assert admission.retry_after() == 10
+
+    def test_zero_max_wait_disables(self):
+        admission = AdmissionController(concurrency=1, max_wait=0, initial=100)
+        admission.start(None)
+
+        assert admission.retry_after() is None
+
+    def test_document_theme(self):
+        assert document_theme(YAML) == "classic"
+        assert document_theme({"design": {"theme": "sb2nov"}}) == "sb2nov"
+        assert document_theme("cv:\n  name: Jane\n") is None
+
+
+class TestLoadShedding:
+    """Tests for 503 responses while the render queue is too long."""
+
+    def test_render_rejected_with_retry_after(self, client, busy):
+        """/yaml/render answers 503 with Retry-After instead of queueing."""
+        rejected = ADMISSION_REJECTIONS.value(route="/yaml/render")
+
+        response = client.post("/yaml/render", json={"yaml_content": YAML})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "60"
+        assert ADMISSION_REJECTIONS.value(route="/yaml/render") == rejected + 1
+
+    def test_cheap_endpoints_still_served(self, client, busy):
+        """Endpoints that don't render keep working."""
+        assert client.get("/health").status_code == 200
+        assert client.post("/yaml", json={"name": "Jane Doe"}).status_code == 200
+
+    def test_renders_measured(self, client, monkeypatch):
+        """Successful renders update the estimate for their theme."""
+        admission = AdmissionController(concurrency=1, initial=100)
+        monkeypatch.setattr(rendering, "_admission", admission)
+
+        response = client.post("/yaml/render", json={"yaml_content": YAML})
+
+        assert response.status_code == 200
+        assert admission.estimate("classic") < 1
+        assert admission.projected_wait() == 0
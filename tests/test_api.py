@@ -1,7 +1,12 @@
 """Integration tests for API endpoints."""
 
+import asyncio
+import io
+import zipfile
+
 import pytest
 from httpx import AsyncClient, ASGITransport
+from api import rendering
 from api.main import app
 
 
@@ -65,6 +70,52 @@ class TestHealthEndpoint:
         assert response.json() == {"status": "healthy"}
 
 
+class TestReadyEndpoint:
+    """Tests for the readiness probe and startup warm-up."""
+
+    @pytest.mark.asyncio
+    async def test_not_ready_before_warm_up(self, monkeypatch):
+        """/ready is 503 until the warm-up has finished."""
+        monkeypatch.setattr(rendering, "_warmup", {"status": "warming_up"})
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+    @pytest.mark.asyncio
+    async def test_ready_after_warm_up_with_timings(self, make_engine, monkeypatch):
+        """After warm-up, /ready is 200 and reports per-theme timings."""
+        make_engine(fail_on="sb2nov")
+        monkeypatch.setattr(rendering, "_warmup", {"status": "pending"})
+        rendering.warm_up_engine(("classic", "sb2nov"))
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["engine"] == "fake"
+        assert list(data["themes"]) == ["classic", "sb2nov"]
+        assert data["themes"]["sb2nov"]["error"] == "rendercv failed: boom"
+
+    @pytest.mark.asyncio
+    async def test_failed_warm_up_not_ready(self, monkeypatch):
+        """If the engine can't even be created, the instance never reports ready."""
+        monkeypatch.setattr(rendering, "_engine", None)
+        monkeypatch.setattr(rendering, "RENDER_ENGINE", "bogus")
+        rendering.warm_up_engine(("classic",))
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/ready")
+
+        assert response.status_code == 503
+        assert "bogus" in response.json()["error"]
+
+
 class TestYamlEndpoint:
     """Tests for the YAML generation endpoint."""
 
@@ -216,3 +267,116 @@ class TestCORSConfiguration:
 
         # CORS preflight should succeed
         assert response.status_code == 200
+
+
+class TestRenderStatsEndpoint:
+    """Tests for the render engine stats endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_render_stats_reports_engine(self):
+        """Test that /render/stats names the active engine."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/render/stats")
+
+        assert response.status_code == 200
+        assert response.json()["engine"] in ["inprocess", "subprocess", "pool"]
+
+
+class TestRenderDoesNotBlock:
+    """Tests that renders run off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_health_served_during_render(self, make_engine, minimal_resume_data):
+        """Test that cheap endpoints answer while a render is in flight."""
+        engine = make_engine(delay=5)
+
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            render = asyncio.create_task(client.post("/generate", json=minimal_resume_data))
+            assert await asyncio.to_thread(engine.started.wait, 5)
+
+            health = await client.get("/health")
+            yaml_response = await client.post("/yaml", json=minimal_resume_data)
+            assert not render.done()
+
+            engine.release.set()
+            response = await render
+
+        assert health.status_code == 200
+        assert yaml_response.status_code == 200
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF-1.7")
+
+
+class TestBundleEndpoint:
+    """Tests for the multi-format bundle endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_bundle_contains_requested_formats(self, minimal_resume_data):
+        """Test that /generate/bundle zips only the requested formats."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/generate/bundle?formats=markdown,html",
+                json=minimal_resume_data,
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert "John_Doe_CV.zip" in response.headers["content-disposition"]
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == ["John_Doe_CV.html", "John_Doe_CV.md"]
+            assert b"John Doe" in archive.read("John_Doe_CV.md")
+
+    @pytest.mark.asyncio
+    async def test_bundle_unknown_format(self, minimal_resume_data):
+        """Test that an unknown format is rejected with 400."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/generate/bundle?formats=pdf,docx",
+                json=minimal_resume_data,
+            )
+
+        assert response.status_code == 400
+        assert "docx" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_name_cannot_escape_render_directory(self, engine):
+        """Test that path characters in the name don't reach file names."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/generate/bundle?formats=markdown", json={"name": "../a/b Doe"})
+
+        assert response.status_code == 200
+        assert 'filename="..ab_Doe_CV.zip"' in response.headers["content-disposition"]
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.namelist() == ["..ab_Doe_CV.md"]
+
+    @pytest.mark.asyncio
+    async def test_generate_with_formats_returns_zip(self, engine, minimal_resume_data):
+        """Test that /generate renders only the requested formats and zips them."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/generate?formats=pdf,typst", json=minimal_resume_data)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == ["John_Doe_CV.pdf", "John_Doe_CV.typ"]
+
+    @pytest.mark.asyncio
+    async def test_yaml_render_with_formats(self, engine):
+        """Test that /yaml/render accepts formats too, and renders nothing else."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/yaml/render?formats=markdown",
+                json={"yaml_content": "cv:\n  name: Jane Doe\n"},
+            )
+
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.namelist() == ["resume.md"]
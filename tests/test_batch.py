@@ -0,0 +1,141 @@
+"""Tests for the batch rendering endpoint."""
+
+import base64
+import io
+import json
+import zipfile
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from api import main
+from api.main import app
+
+
+async def post_batch(payload, **params):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/generate/batch", json=payload, params=params)
+
+
+class TestBatchValidation:
+    """Tests that the whole batch is validated before rendering."""
+
+    @pytest.mark.asyncio
+    async def test_invalid_item_rejects_batch(self, engine):
+        """Test that one invalid resume fails the batch with 422 and renders nothing."""
+        response = await post_batch({"items": [
+            {"resume": {"name": "Jane Doe"}},
+            {"resume": {"name": "John Doe", "email": "not-an-email"}},
+        ]})
+
+        assert response.status_code == 422
+        assert any("email" in e.lower() for e in response.json()["errors"])
+        assert engine.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_unparseable_yaml_rejected(self, engine):
+        """Test that YAML items are parsed up front."""
+        response = await post_batch({"items": [{"yaml_content": "not: valid: yaml:"}]})
+
+        assert response.status_code == 422
+        assert engine.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_yaml_validated_like_resume_data(self, engine):
+        """Test that YAML items get the same field checks as ResumeData items."""
+        response = await post_batch({"items": [{"yaml_content": "cv:\n  name: Jane Doe\n  phone: '12345'\n"}]})
+
+        assert response.status_code == 422
+        assert any("phone" in e.lower() for e in response.json()["errors"])
+        assert engine.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_item_needs_exactly_one_source(self, engine):
+        """Test that an item with both resume and YAML is rejected."""
+        response = await post_batch({"items": [
+            {"resume": {"name": "Jane Doe"}, "yaml_content": "cv:\n  name: Jane\n"},
+        ]})
+
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_rejected(self, engine):
+        """Test that an empty batch is a validation error."""
+        response = await post_batch({"items": []})
+
+        assert response.status_code == 422
+
+
+class TestBatchRendering:
+    """Tests for streamed and zipped batch results."""
+
+    @pytest.mark.asyncio
+    async def test_ndjson_reports_per_item_results(self, engine):
+        """Test that each item gets its own line, failures included."""
+        response = await post_batch({"items": [
+            {"resume": {"name": "Jane Doe"}},
+            {"resume": {"name": "Broken Resume"}},
+            {"yaml_content": "cv:\n  name: Yaml User\n"},
+        ]})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = {line["index"]: line for line in map(json.loads, response.text.splitlines())}
+        assert lines[0]["status"] == "ok"
+        assert lines[0]["filename"] == "Jane_Doe_CV.pdf"
+        assert base64.b64decode(lines[0]["pdf"]).startswith(b"%PDF")
+        assert lines[1]["status"] == "error"
+        assert "boom" in lines[1]["error"]
+        assert lines[2]["filename"] == "resume_3.pdf"
+
+    @pytest.mark.asyncio
+    async def test_zip_contains_pdfs_and_errors(self, engine):
+        """Test that the zip format bundles PDFs and an errors.json."""
+        response = await post_batch(
+            {"items": [{"resume": {"name": "Jane Doe"}}, {"resume": {"name": "Broken Resume"}}]},
+            format="zip",
+        )
+
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert sorted(archive.namelist()) == ["Jane_Doe_CV.pdf", "errors.json"]
+            errors = json.loads(archive.read("errors.json"))
+        assert errors[0]["index"] == 1
+
+    @pytest.mark.asyncio
+    async def test_identical_items_rendered_once(self, engine):
+        """Test that duplicate resumes in a batch reuse the cached PDF."""
+        await post_batch({"items": [{"resume": {"name": "Jane Doe"}}]})
+        await post_batch({"items": [{"resume": {"name": "Jane Doe"}}]})
+
+        assert engine.calls == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("format", ["ndjson", "zip"])
+    async def test_unexpected_error_fails_only_its_item(self, engine, monkeypatch, format):
+        """Test that an item failing with an arbitrary exception is reported like a render error."""
+        render_pdf = main.cached_render_pdf
+
+        async def crash_on_john(key, document):
+            if "John" in str(document):
+                raise RuntimeError("disk on fire")
+            return await render_pdf(key, document)
+
+        monkeypatch.setattr(main, "cached_render_pdf", crash_on_john)
+        response = await post_batch(
+            {"items": [{"resume": {"name": "Jane Doe"}}, {"resume": {"name": "John Doe"}}]},
+            format=format,
+        )
+
+        assert response.status_code == 200
+        if format == "zip":
+            with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+                assert sorted(archive.namelist()) == ["Jane_Doe_CV.pdf", "errors.json"]
+                errors = json.loads(archive.read("errors.json"))
+        else:
+            lines = list(map(json.loads, response.text.splitlines()))
+            assert [line["index"] for line in lines if line["status"] == "ok"] == [0]
+            errors = [line for line in lines if line["status"] == "error"]
+        assert errors[0]["index"] == 1
+        assert errors[0]["error"] == "Rendering failed unexpectedly"
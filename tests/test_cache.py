@@ -0,0 +1,205 @@
+"""Tests for the content-addressed PDF cache."""
+
+import os
+from datetime import date
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from api import cache
+from api.cache import CacheBackend, DiskCache, MemoryCache, cache_key, content_key
+from api.main import app
+
+
+class TestCacheKey:
+    """Tests for cache key derivation."""
+
+    def test_same_yaml_same_key(self):
+        """Identical YAML maps to the same key."""
+        assert cache_key("cv:\n  name: A\n") == cache_key("cv:\n  name: A\n")
+
+    def test_theme_changes_key(self):
+        """Switching theme produces a different key."""
+        assert cache_key("design:\n  theme: classic\n") != cache_key("design:\n  theme: sb2nov\n")
+
+    def test_rendercv_version_changes_key(self, monkeypatch):
+        """Upgrading rendercv invalidates old entries."""
+        before = cache_key("cv:\n  name: A\n")
+        monkeypatch.setattr(cache, "RENDERCV_VERSION", "999")
+
+        assert cache_key("cv:\n  name: A\n") != before
+
+    def test_yaml_and_dict_same_key(self):
+        """A document hashes the same as YAML text, reformatted YAML or a dict."""
+        document = {"cv": {"name": "A", "sections": {"b": ["x"], "a": ["y"]}}}
+
+        assert cache_key("cv:\n  name: A\n  sections:\n    b: [x]\n    a: [y]\n") == cache_key(document)
+        assert cache_key("cv: {name: A, sections: {b: [x], a: [y]}}  # one line\n") == cache_key(document)
+
+    def test_section_order_changes_key(self):
+        """Keys aren't sorted, since their order is the order of sections in the PDF."""
+        assert cache_key({"cv": {"sections": {"a": [], "b": []}}}) != cache_key({"cv": {"sections": {"b": [], "a": []}}})
+
+    def test_unparseable_yaml_hashed_as_text(self):
+        """Text that isn't valid YAML still gets a key."""
+        assert cache_key("not: valid: yaml:") != cache_key("not: valid: yaml: ")
+
+    def test_aliases_hashed_as_text(self):
+        """Aliased YAML isn't expanded: a small alias bomb hashes straight away."""
+        levels = ["a0: &a0 [x, x, x, x, x, x, x, x, x, x]"]
+        levels += [f"a{i}: &a{i} [{', '.join([f'*a{i - 1}'] * 10)}]" for i in range(1, 12)]
+        bomb = "\n".join(levels) + "\n"
+
+        assert cache_key(bomb) != cache_key(bomb + "# comment\n")
+
+    def test_content_key_ignores_date(self, monkeypatch):
+        """The cache key changes daily; the content key doesn't."""
+        document = "cv:\n  name: A\n"
+        before = cache_key(document), content_key(document)
+        monkeypatch.setattr(cache, "date", type("Tomorrow", (), {"today": staticmethod(lambda: date(2999, 1, 1))}))
+
+        assert cache_key(document) != before[0]
+        assert content_key(document) == before[1]
+
+
+class TestMemoryCache:
+    """Tests for the in-memory LRU backend."""
+
+    def test_hit_and_miss_counters(self):
+        """Lookups are counted as hits or misses."""
+        backend = MemoryCache(100)
+        assert backend.get("a") is None
+        backend.set("a", b"pdf")
+
+        assert backend.get("a") == b"pdf"
+        assert backend.stats()["hits"] == 1
+        assert backend.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used_over_budget(self):
+        """The least recently used PDF is dropped once the byte budget is exceeded."""
+        backend = MemoryCache(10)
+        backend.set("a", b"aaaa")
+        backend.set("b", b"bbbb")
+        backend.get("a")
+        backend.set("c", b"cccc")
+
+        assert backend.get("b") is None
+        assert backend.get("a") == b"aaaa"
+        assert backend.size <= 10
+
+    def test_oversized_entry_not_stored(self):
+        """A PDF larger than the whole budget is not cached."""
+        backend = MemoryCache(3)
+        backend.set("a", b"aaaa")
+
+        assert backend.get("a") is None
+
+
+class TestDiskCache:
+    """Tests for the on-disk backend."""
+
+    def test_roundtrip(self, tmp_path):
+        """Stored PDFs are read back from the cache directory."""
+        backend = DiskCache(tmp_path, 100)
+        backend.set("a", b"pdf")
+
+        assert backend.get("a") == b"pdf"
+        assert (tmp_path / "a.pdf").exists()
+
+    def test_evicts_oldest_over_budget(self, tmp_path):
+        """The oldest file is removed once the directory exceeds its budget."""
+        backend = DiskCache(tmp_path, 10)
+        backend.set("a", b"aaaa")
+        os.utime(tmp_path / "a.pdf", (1, 1))
+        backend.set("b", b"bbbb")
+        backend.set("c", b"cccc")
+
+        assert backend.get("a") is None
+        assert backend.get("c") == b"cccc"
+
+
+class TestNoCache:
+    """Tests for the disabled backend."""
+
+    def test_never_hits(self):
+        """The disabled backend never returns a stored PDF."""
+        backend = CacheBackend()
+        backend.set("a", b"pdf")
+
+        assert backend.get("a") is None
+
+
+class TestCachedEndpoints:
+    """Tests for caching and ETags on the render endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_generate_served_from_cache(self, engine):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/generate", json={"name": "Jane Doe"})
+            second = await client.post("/generate", json={"name": "Jane Doe"})
+
+        assert engine.calls == 1
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert first.content == second.content
+        assert first.headers["etag"] == second.headers["etag"]
+
+    @pytest.mark.asyncio
+    async def test_if_none_match_returns_304(self, engine):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/yaml/render", json={"yaml_content": "cv:\n  name: Jane\n"})
+            second = await client.post(
+                "/yaml/render",
+                json={"yaml_content": "cv:\n  name: Jane\n"},
+                headers={"If-None-Match": first.headers["etag"]},
+            )
+
+        assert second.status_code == 304
+        assert second.content == b""
+        assert engine.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_if_none_match_star_renders(self, engine):
+        """A wildcard If-None-Match doesn't turn a render request into a 304."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/generate", json={"name": "Jane Doe"}, headers={"If-None-Match": "*"})
+
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+
+    @pytest.mark.asyncio
+    async def test_different_theme_renders_again(self, engine):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/generate", json={"name": "Jane Doe", "theme": "classic"})
+            await client.post("/generate", json={"name": "Jane Doe", "theme": "sb2nov"})
+
+        assert engine.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_render_directory_released_after_response(self, engine, scratch_pool):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/generate", json={"name": "Jane Doe"})
+
+        assert response.status_code == 200
+        assert int(response.headers["content-length"]) == len(response.content)
+        # Wiped and handed back to the scratch pool for the next render
+        assert list(engine.output_dir.iterdir()) == []
+        assert scratch_pool.stats()["free"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_hit_streamed_from_file(self, engine, monkeypatch, tmp_path):
+        monkeypatch.setattr(cache, "_cache", DiskCache(tmp_path, 1024 * 1024))
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/generate", json={"name": "Jane Doe"})
+            second = await client.post("/generate", json={"name": "Jane Doe"})
+
+        assert engine.calls == 1
+        assert second.headers["x-cache"] == "HIT"
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
@@ -0,0 +1,109 @@
+"""Tests for the offline bulk rendering CLI."""
+
+import json
+
+import pytest
+
+import main as cli
+from api.cache import content_key
+
+
+RESUME_YAML = "cv:\n  name: Jane Doe\ndesign:\n  theme: classic\n"
+
+
+class TestFindInputs:
+    """Tests for collecting input files."""
+
+    def test_directory_and_manifest(self, tmp_path):
+        """YAML files come from directories and manifest lines, without duplicates."""
+        (tmp_path / "a.yaml").write_text(RESUME_YAML)
+        (tmp_path / "b.yml").write_text(RESUME_YAML)
+        (tmp_path / "notes.txt").write_text("ignored")
+        manifest = tmp_path / "list.txt"
+        manifest.write_text("# cohort\na.yaml\n\n")
+
+        inputs = cli.find_inputs([str(tmp_path)], str(manifest))
+
+        assert inputs == [tmp_path / "a.yaml", tmp_path / "b.yml"]
+
+
+class TestOutputPaths:
+    """Tests for naming the rendered PDFs."""
+
+    def test_same_name_in_different_directories(self, tmp_path):
+        """Inputs sharing a file name keep their directories instead of overwriting each other."""
+        first, second = tmp_path / "a" / "cv.yaml", tmp_path / "b" / "cv.yaml"
+
+        paths = cli.output_paths([first, second], tmp_path / "out")
+
+        assert paths == {first: tmp_path / "out" / "a" / "cv.pdf", second: tmp_path / "out" / "b" / "cv.pdf"}
+
+    def test_single_directory_flat(self, tmp_path):
+        """Files from one directory land directly in the output directory."""
+        path = tmp_path / "jane.yaml"
+
+        assert cli.output_paths([path], tmp_path / "out") == {path: tmp_path / "out" / "jane.pdf"}
+
+
+class TestLoadResume:
+    """Tests for validating input files against ResumeData."""
+
+    def test_rendercv_yaml_returned_unchanged(self, tmp_path):
+        """rendercv documents are validated and rendered as written."""
+        path = tmp_path / "jane.yaml"
+        path.write_text(RESUME_YAML)
+
+        assert cli.load_resume(path) == RESUME_YAML
+
+    def test_resume_data_converted(self, tmp_path):
+        """ResumeData documents are converted to a rendercv dict."""
+        path = tmp_path / "jane.yaml"
+        path.write_text("name: Jane Doe\ntheme: sb2nov\n")
+
+        document = cli.load_resume(path)
+
+        assert document["cv"]["name"] == "Jane Doe"
+        assert document["design"]["theme"] == "sb2nov"
+
+    def test_invalid_resume_rejected(self, tmp_path):
+        """Validation errors name the offending field."""
+        path = tmp_path / "jane.yaml"
+        path.write_text("cv:\n  name: Jane Doe\n  phone: '12345'\n")
+
+        with pytest.raises(ValueError, match="phone"):
+            cli.load_resume(path)
+
+    def test_examples_are_valid(self):
+        """The bundled examples pass validation."""
+        for path in cli.find_inputs(["examples"], None):
+            cli.load_resume(path)
+
+
+class TestMain:
+    """Tests for the CLI entry point."""
+
+    def test_up_to_date_files_skipped(self, tmp_path, capsys):
+        """Files whose hash matches the last render are not rendered again."""
+        source = tmp_path / "jane.yaml"
+        source.write_text(RESUME_YAML)
+        output_dir = tmp_path / "out"
+        output_dir.mkdir()
+        (output_dir / "jane.pdf").write_bytes(b"%PDF")
+        (output_dir / cli.MANIFEST_NAME).write_text(
+            json.dumps({str(source): content_key(RESUME_YAML)})
+        )
+
+        exit_code = cli.main([str(source), "-o", str(output_dir)])
+
+        assert exit_code == 0
+        assert "UP-TO-DATE" in capsys.readouterr().out
+
+    def test_invalid_file_fails_run(self, tmp_path, capsys):
+        """An invalid file is reported and makes the run exit non-zero."""
+        source = tmp_path / "broken.yaml"
+        source.write_text("cv:\n  name: ''\n")
+
+        exit_code = cli.main([str(source), "-o", str(tmp_path / "out")])
+
+        assert exit_code == 1
+        assert "INVALID" in capsys.readouterr().out
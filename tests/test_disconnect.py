@@ -0,0 +1,124 @@
+"""Tests for stopping renders whose client has gone away."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+
+from api import rendering
+from api.cancellation import RenderCancelled, cancel_scope
+from api.main import app
+from api.metrics import CLIENT_DISCONNECTS, RENDERS_CANCELLED
+
+
+@pytest.fixture
+def engine(make_engine):
+    """An engine that runs until its render is cancelled."""
+    return make_engine(delay=5)
+
+
+async def call_then_disconnect(path: str, payload: dict) -> list[dict]:
+    """Send a request straight to the app; the client disconnects once the body is read."""
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await call_app(path, payload, send, disconnect=True)
+    return sent
+
+
+async def call_app(path: str, payload: dict, send, disconnect: bool) -> None:
+    """Send a request straight to the app, then disconnect or keep waiting."""
+    body = json.dumps(payload).encode()
+    body_read = False
+
+    async def receive():
+        nonlocal body_read
+        if not body_read:
+            body_read = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        if not disconnect:
+            await asyncio.Event().wait()
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"test"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+
+
+class TestClientDisconnect:
+    """Tests for renders abandoned by their client."""
+
+    @pytest.mark.asyncio
+    async def test_render_stopped_on_disconnect(self, engine):
+        """The render is cancelled and counted when the client goes away."""
+        disconnects = CLIENT_DISCONNECTS.value(route="/generate")
+        cancelled = RENDERS_CANCELLED.value(stage="running")
+
+        started = time.monotonic()
+        sent = await call_then_disconnect("/generate", {"name": "Jane Doe"})
+
+        assert sent[0]["status"] == 499
+        # The render thread stops at its next cancellation check
+        while not engine.cancelled and time.monotonic() - started < 4:
+            await asyncio.sleep(0.01)
+        assert engine.cancelled
+        assert CLIENT_DISCONNECTS.value(route="/generate") == disconnects + 1
+        assert RENDERS_CANCELLED.value(stage="running") == cancelled + 1
+
+    def test_cancelled_subprocess_killed(self):
+        """A cancelled render kills its rendercv process group."""
+        process = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            process_group=0,
+        )
+        with cancel_scope() as cancel:
+            cancel.set()
+            with pytest.raises(RenderCancelled):
+                rendering.communicate(process)
+
+        assert process.returncode is not None
+
+
+class TestAbortedDownload:
+    """Tests for clients that go away while the response is being sent."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", ["/generate", "/generate/bundle"])
+    async def test_render_directory_freed(self, make_engine, scratch_pool, path):
+        """A failed send still hands the render directory back to the pool."""
+        make_engine()
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                raise OSError("connection reset")
+
+        with pytest.raises(OSError):
+            await call_app(path, {"name": "Jane Doe"}, send, disconnect=False)
+
+        stats = scratch_pool.stats()
+        assert stats["in_use"] == 0
+        assert stats["free"] == 1
@@ -0,0 +1,212 @@
+"""Tests for asynchronous render jobs."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient, ASGITransport
+
+from api import jobs
+from api.jobs import JobQueue, MemoryJobStore, SqliteJobStore, check_callback_url
+from api.main import app
+
+
+@pytest.fixture(autouse=True)
+def artifact_dir(monkeypatch, tmp_path):
+    """Keep job artifacts in a per-test directory."""
+    directory = tmp_path / "artifacts"
+    monkeypatch.setattr(jobs, "JOB_ARTIFACT_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def engine(make_engine, monkeypatch):
+    monkeypatch.setattr(jobs, "_job_queue", JobQueue(MemoryJobStore()))
+    return make_engine()
+
+
+async def wait_for(client, job_id):
+    for _ in range(100):
+        job = (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestJobEndpoints:
+    """Tests for submitting, polling and downloading jobs."""
+
+    @pytest.mark.asyncio
+    async def test_submit_poll_and_fetch(self, engine):
+        """Test the full job lifecycle through the API."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            submitted = await client.post(
+                "/jobs", json={"resume": {"name": "Jane Doe"}, "formats": ["pdf", "markdown"]}
+            )
+            assert submitted.status_code == 202
+            job = await wait_for(client, submitted.json()["job_id"])
+            artifact = await client.get(f"/jobs/{job['job_id']}/artifacts/Jane_Doe_CV.pdf")
+
+        assert job["status"] == "done"
+        assert job["artifacts"] == ["Jane_Doe_CV.pdf", "Jane_Doe_CV.md"]
+        assert artifact.status_code == 200
+        assert artifact.headers["content-type"] == "application/pdf"
+        assert artifact.content.startswith(b"%PDF")
+
+    @pytest.mark.asyncio
+    async def test_failed_job_reports_error(self, engine):
+        """Test that a failed render is visible when polling."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            submitted = await client.post("/jobs", json={"yaml_content": "cv:\n  name: Broken\n"})
+            job = await wait_for(client, submitted.json()["job_id"])
+
+        assert job["status"] == "failed"
+        assert "boom" in job["error"]
+        assert job["artifacts"] == []
+
+    @pytest.mark.asyncio
+    async def test_unknown_job(self, engine):
+        """Test that polling an unknown job returns 404."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/jobs/does-not-exist")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_remote_callback_rejected(self, engine):
+        """Test that callbacks to non-local hosts are refused."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/jobs", json={
+                "resume": {"name": "Jane Doe"},
+                "callback_url": "http://example.com/hook",
+            })
+
+        assert response.status_code == 422
+
+
+class TestJobQueue:
+    """Tests for queue ordering and bounds."""
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_runs_first(self, engine):
+        """Waiting jobs are taken by priority, then submission order."""
+        queue = JobQueue(MemoryJobStore(), workers=0)
+        await queue.submit("normal", ["pdf"], "a")
+        await queue.submit("low", ["pdf"], "b", priority=1)
+        await queue.submit("high", ["pdf"], "c", priority=9)
+        await queue.submit("low again", ["pdf"], "d", priority=1)
+
+        worker = asyncio.create_task(queue._work())
+        await queue._queue.join()
+        worker.cancel()
+
+        assert engine.documents == ["high", "low", "low again", "normal"]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self, engine):
+        """Submitting to a full queue fails fast with 503."""
+        queue = JobQueue(MemoryJobStore(), max_size=1, workers=0)
+        await queue.submit("one", ["pdf"], "a")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await queue.submit("two", ["pdf"], "b")
+
+        assert exc_info.value.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_artifacts_kept_on_disk_until_purged(self, engine, artifact_dir, monkeypatch):
+        """Artifacts are files in the job's directory, removed with the job."""
+        queue = JobQueue(MemoryJobStore())
+        job = await queue.submit("cv: {}", ["pdf"], "cv")
+        await queue._queue.join()
+
+        path = await queue.artifact(job["id"], "cv.pdf")
+        assert path == artifact_dir / job["id"] / "cv.pdf"
+        assert path.read_bytes().startswith(b"%PDF")
+        assert await queue.artifact(job["id"], "../cv.pdf") is None
+
+        monkeypatch.setattr(jobs, "JOB_TTL_SECONDS", -1)
+        await queue.submit("cv: {}", ["pdf"], "other")
+        await queue._queue.join()
+        queue.stop()
+
+        assert not path.parent.exists()
+        assert await queue.describe(job["id"]) is None
+
+    @pytest.mark.asyncio
+    async def test_unfinished_jobs_resumed_on_start(self, engine, tmp_path):
+        """Jobs a previous run left queued or running are rendered once the queue starts."""
+        store = SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+        store.create({"id": "a", "status": "running", "priority": 0, "yaml_content": "cv: {}",
+                      "formats": ["pdf"], "stem": "cv", "created": 1.0, "updated": 1.0})
+        queue = JobQueue(store)
+
+        await queue.start()
+        await queue._queue.join()
+        queue.stop()
+
+        job = await queue.describe("a")
+        assert job["status"] == "done"
+        assert job["artifacts"] == ["cv.pdf"]
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_fails_job(self, engine, monkeypatch):
+        """A crash outside rendercv marks the job failed instead of leaving it running."""
+
+        async def crash(*args):
+            raise RuntimeError("disk on fire")
+
+        monkeypatch.setattr(jobs, "render", crash)
+        queue = JobQueue(MemoryJobStore())
+        job = await queue.submit("cv: {}", ["pdf"], "cv")
+        await queue._queue.join()
+        queue.stop()
+
+        assert (await queue.describe(job["id"]))["status"] == "failed"
+
+
+class TestSqliteJobStore:
+    """Tests for the SQLite job backend."""
+
+    def test_roundtrip_and_unfinished(self, tmp_path):
+        """Jobs and artifacts persist, and unfinished jobs can be resumed."""
+        store = SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+        store.create({"id": "a", "status": "queued", "priority": 0, "yaml_content": "cv: {}",
+                      "formats": ["pdf"], "stem": "cv", "created": 1.0, "updated": 1.0})
+        store.save_artifacts("a", ["cv.pdf"])
+
+        reopened = SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+        assert reopened.get("a")["formats"] == ["pdf"]
+        assert reopened.artifact_names("a") == ["cv.pdf"]
+        assert [job["id"] for job in reopened.unfinished()] == ["a"]
+
+    def test_purge_drops_finished_jobs(self, tmp_path):
+        """Expired finished jobs are deleted with their artifacts."""
+        store = SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+        store.create({"id": "a", "status": "done", "priority": 0, "formats": ["pdf"],
+                      "created": 1.0, "updated": 1.0})
+        store.save_artifacts("a", ["cv.pdf"])
+        store.update("a", status="done")
+
+        assert store.purge(older_than=float("inf")) == ["a"]
+        assert store.get("a") is None
+        assert store.artifact_names("a") == []
+
+
+class TestCallbackUrl:
+    """Tests for callback URL restrictions."""
+
+    def test_local_url_allowed(self):
+        """Callbacks to an allowed local host are accepted."""
+        assert check_callback_url("http://localhost:9000/done") == "http://localhost:9000/done"
+
+    def test_other_scheme_rejected(self):
+        """Only http(s) callbacks are allowed."""
+        with pytest.raises(ValueError):
+            check_callback_url("file:///etc/passwd")
@@ -0,0 +1,99 @@
+"""Tests for per-render time, CPU and memory limits."""
+
+import asyncio
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from api import rendering
+from api.limits import RenderLimitExceeded, limit_process
+from api.metrics import RENDER_LIMITS_EXCEEDED
+
+
+def run_limited(code: str, **limits) -> subprocess.CompletedProcess:
+    process = subprocess.Popen(
+        [sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    limit_process(process.pid, **limits)
+    stdout, stderr = process.communicate(timeout=30)
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
+class TestRenderTimeout:
+    """Tests for the wall-clock limit in render()."""
+
+    @pytest.mark.asyncio
+    async def test_timeout_stops_render(self, make_engine, monkeypatch):
+        """A render over RENDER_TIMEOUT_SECONDS is stopped and answered with 504."""
+        engine = make_engine(delay=60)
+        monkeypatch.setattr(rendering, "RENDER_TIMEOUT_SECONDS", 0.2)
+        timeouts = RENDER_LIMITS_EXCEEDED.value(limit="timeout")
+
+        with pytest.raises(RenderLimitExceeded) as exc_info:
+            await rendering.render("cv: {}")
+
+        assert exc_info.value.status_code == 504
+        assert "0.2s" in exc_info.value.detail
+        assert RENDER_LIMITS_EXCEEDED.value(limit="timeout") == timeouts + 1
+        for _ in range(100):
+            if engine.cancelled:
+                break
+            await asyncio.sleep(0.01)
+        assert engine.cancelled
+
+
+class TestProcessLimits:
+    """Tests for rlimits on rendercv child processes."""
+
+    def test_cpu_limit_kills_busy_process(self):
+        """A process spinning past its CPU allowance is stopped by the kernel."""
+        result = run_limited("while True: pass", cpu_seconds=1)
+
+        assert result.returncode in (-signal.SIGXCPU, -signal.SIGKILL)
+
+    def test_memory_limit_fails_allocation(self):
+        """Allocations beyond the address-space limit fail with MemoryError."""
+        result = run_limited("b = bytearray(1024 * 1024 * 1024)", memory_mb=512)
+
+        assert "MemoryError" in result.stderr
+
+    def test_exit_mapped_to_limit_errors(self, monkeypatch):
+        """rlimit deaths become 504 (CPU) and 413 (memory) errors."""
+        monkeypatch.setattr(rendering, "RENDER_CPU_SECONDS", 30)
+        monkeypatch.setattr(rendering, "RENDER_MEMORY_MB", 256)
+
+        with pytest.raises(RenderLimitExceeded) as cpu:
+            rendering.check_exit(-signal.SIGXCPU, "")
+        with pytest.raises(RenderLimitExceeded) as memory:
+            rendering.check_exit(1, "Traceback ...\nMemoryError")
+        rendering.check_exit(1, "rendercv: invalid YAML")
+        # SIGKILL also comes from the OOM killer and from cancellation
+        rendering.check_exit(-signal.SIGKILL, "")
+
+        assert cpu.value.status_code == 504
+        assert memory.value.status_code == 413
+        assert "256 MB" in memory.value.detail
+
+    def test_inprocess_engine_warns_limits_ignored(self, monkeypatch, caplog):
+        """Limits the in-process engine can't enforce are called out at startup."""
+        monkeypatch.setattr(rendering, "_engine", None)
+        monkeypatch.setattr(rendering, "RENDER_ENGINE", "inprocess")
+        monkeypatch.setenv("RENDER_CPU_SECONDS", "30")
+        monkeypatch.setattr(rendering, "RENDER_CPU_SECONDS", 30)
+
+        rendering.get_engine()
+
+        assert "not enforced by the 'inprocess' engine" in caplog.text
+
+    def test_inprocess_engine_quiet_with_defaults(self, monkeypatch, caplog):
+        """The default CPU limit, meant for the other engines, doesn't warn."""
+        monkeypatch.setattr(rendering, "_engine", None)
+        monkeypatch.setattr(rendering, "RENDER_ENGINE", "inprocess")
+        monkeypatch.delenv("RENDER_CPU_SECONDS", raising=False)
+        monkeypatch.delenv("RENDER_MEMORY_MB", raising=False)
+
+        rendering.get_engine()
+
+        assert "not enforced" not in caplog.text
@@ -0,0 +1,107 @@
+"""Tests for the /metrics endpoint and the metric types behind it."""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from api.main import app, limiter
+from api.metrics import RATE_LIMITED, REQUESTS, STAGE_SECONDS, Counter, Histogram, _registry
+
+
+def stage_count(stage: str) -> int:
+    """Observations of a stage, as reported in the exposition format."""
+    prefix = f'{STAGE_SECONDS.name}_count{{stage="{stage}"}} '
+    for line in STAGE_SECONDS.collect():
+        if line.startswith(prefix):
+            return int(line.removeprefix(prefix))
+    return 0
+
+
+@pytest.fixture
+def unregistered():
+    """Remove metrics created by a test from the global registry afterwards."""
+    before = list(_registry)
+    yield
+    _registry[:] = before
+
+
+class TestMetricTypes:
+    """Tests for counters and histograms in the text exposition format."""
+
+    def test_counter_labels(self, unregistered):
+        """Counters keep one series per label combination."""
+        counter = Counter("test_total", "Test counter.", ("route",))
+        counter.inc(route="/a")
+        counter.inc(2, route="/b")
+
+        lines = counter.collect()
+        assert "# TYPE test_total counter" in lines
+        assert 'test_total{route="/a"} 1' in lines
+        assert 'test_total{route="/b"} 2' in lines
+
+    def test_histogram_buckets_are_cumulative(self, unregistered):
+        """Bucket counts include every smaller bucket, ending with +Inf."""
+        histogram = Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+
+        lines = histogram.collect()
+        assert 'test_seconds_bucket{le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{le="1"} 2' in lines
+        assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+        assert "test_seconds_count 3" in lines
+        assert "test_seconds_sum 5.55" in lines
+
+
+class TestMetricsEndpoint:
+    """Tests for request and stage metrics recorded by the API."""
+
+    @pytest.mark.asyncio
+    async def test_exposition_format(self):
+        """The endpoint serves Prometheus text with cache and queue gauges."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE http_requests_total counter" in response.text
+        assert "pdf_cache_hit_ratio " in response.text
+        assert "render_queue_depth 0" in response.text
+
+    @pytest.mark.asyncio
+    async def test_requests_counted_by_route_template(self):
+        """Path parameters don't create a series per value."""
+        before = REQUESTS.value(route="/jobs/{job_id}", method="GET", status=404)
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/jobs/first")
+            await client.get("/jobs/second")
+
+        assert REQUESTS.value(route="/jobs/{job_id}", method="GET", status=404) == before + 2
+
+    @pytest.mark.asyncio
+    async def test_render_stages_timed(self, engine):
+        """A /generate request records every stage of the pipeline."""
+        stages = ("validation", "resume_to_yaml", "render", "response_write")
+        before = {stage: stage_count(stage) for stage in stages}
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/generate", json={"name": "Jane Doe"})
+
+        assert response.status_code == 200
+        for stage in stages:
+            assert stage_count(stage) == before[stage] + 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_rejections_counted(self):
+        """Requests turned away by the limiter are counted per route."""
+        limiter.reset()
+        before = RATE_LIMITED.value(route="/yaml")
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            # /yaml allows 15 requests a minute per client
+            for _ in range(16):
+                await client.post("/yaml", json={"name": "Jane Doe"})
+        limiter.reset()
+
+        assert RATE_LIMITED.value(route="/yaml") == before + 1
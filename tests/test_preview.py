@@ -0,0 +1,259 @@
+"""Tests for the live-preview WebSocket and revision coalescing."""
+
+import asyncio
+import base64
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from limits import parse
+from starlette.websockets import WebSocketDisconnect
+
+from api import main, rendering
+from api.admission import AdmissionController
+from api.main import API_SECRET, app, limiter
+from api.metrics import PREVIEW_RENDERS_SUPERSEDED, RATE_LIMITED
+from api.preview import PreviewSession
+
+YAML = "cv:\n  name: Jane Doe\n"
+PREVIEW_URL = "ws://test/preview"
+AUTH = {"X-API-Key": API_SECRET}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+class TestPreviewSession:
+    """Tests for debouncing and superseded-render cancellation."""
+
+    @pytest.mark.asyncio
+    async def test_burst_rendered_once(self):
+        """Revisions sent in quick succession produce one render of the newest."""
+        rendered, published = [], []
+
+        async def render(document):
+            rendered.append(document)
+            return document
+
+        async def publish(revision, result):
+            published.append((revision, result))
+
+        session = PreviewSession(render, publish, debounce=0.05, max_delay=1)
+        runner = asyncio.create_task(session.run())
+        for revision in range(1, 6):
+            session.submit(revision, f"doc {revision}")
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.2)
+        runner.cancel()
+
+        assert rendered == ["doc 5"]
+        assert published == [(5, "doc 5")]
+
+    @pytest.mark.asyncio
+    async def test_newer_revision_cancels_running_render(self):
+        """A render still running for an older revision is cancelled and not published."""
+        started = asyncio.Event()
+        published = []
+
+        async def render(document):
+            if document == "slow":
+                started.set()
+                await asyncio.sleep(10)
+            return document
+
+        async def publish(revision, result):
+            published.append((revision, result))
+
+        superseded = PREVIEW_RENDERS_SUPERSEDED.value()
+        session = PreviewSession(render, publish, debounce=0.01, max_delay=1, min_interval=0)
+        runner = asyncio.create_task(session.run())
+        session.submit(1, "slow")
+        await started.wait()
+        session.submit(2, "fast")
+        await asyncio.sleep(0.1)
+        runner.cancel()
+
+        assert published == [(2, "fast")]
+        assert PREVIEW_RENDERS_SUPERSEDED.value() == superseded + 1
+
+    @pytest.mark.asyncio
+    async def test_max_delay_bounds_waiting(self):
+        """Continuous edits still get a preview once max_delay has passed."""
+        published = []
+
+        async def render(document):
+            return document
+
+        async def publish(revision, result):
+            published.append(revision)
+
+        session = PreviewSession(render, publish, debounce=0.05, max_delay=0.1)
+        runner = asyncio.create_task(session.run())
+        for revision in range(1, 16):
+            session.submit(revision, "doc")
+            await asyncio.sleep(0.02)
+        runner.cancel()
+
+        assert published
+
+    @pytest.mark.asyncio
+    async def test_min_interval_spaces_renders(self):
+        """A session doesn't start renders faster than min_interval allows."""
+        started = []
+
+        async def render(document):
+            started.append(time.monotonic())
+            return document
+
+        async def publish(revision, result):
+            pass
+
+        session = PreviewSession(render, publish, debounce=0.01, max_delay=1, min_interval=0.2)
+        runner = asyncio.create_task(session.run())
+        for revision in range(1, 4):
+            session.submit(revision, "doc")
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.3)
+        runner.cancel()
+
+        assert len(started) == 2
+        assert started[1] - started[0] >= 0.2
+
+
+class TestPreviewEndpoint:
+    """Tests for the /preview WebSocket."""
+
+    def test_requires_api_key(self, client):
+        """Connections without the API key are closed."""
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("ws://test/preview") as websocket:
+                websocket.receive_json()
+
+        assert exc_info.value.code == 1008
+
+    def test_png_pages_sent(self, client, engine):
+        """A revision is answered with a header message and one binary message per page."""
+        with client.websocket_connect(PREVIEW_URL, headers=AUTH) as websocket:
+            websocket.send_json({"revision": 1, "yaml_content": YAML})
+            header = websocket.receive_json()
+            pages = [websocket.receive_bytes() for _ in range(header["pages"])]
+
+        assert header == {"type": "rendered", "revision": 1, "format": "png", "pages": 2}
+        assert pages == [b"page 1", b"page 2"]
+
+    def test_resume_revision_rendered_as_pdf(self, client, engine):
+        """Resume data is converted and rendered to a single PDF message."""
+        with client.websocket_connect(f"{PREVIEW_URL}?format=pdf", headers=AUTH) as websocket:
+            websocket.send_json({"revision": 4, "resume": {"name": "Jane Doe"}})
+            header = websocket.receive_json()
+            pdf = websocket.receive_bytes()
+
+        assert header["revision"] == 4
+        assert header["pages"] == 1
+        assert pdf.startswith(b"%PDF")
+        assert engine.documents[0]["cv"]["name"] == "Jane Doe"
+
+    def test_invalid_revision_reported(self, client, engine):
+        """Validation errors come back immediately in the friendly format."""
+        with client.websocket_connect(PREVIEW_URL, headers=AUTH) as websocket:
+            websocket.send_json({"revision": 2, "resume": {"name": "Jane", "email": "nope"}})
+            message = websocket.receive_json()
+
+        assert message["type"] == "invalid"
+        assert message["revision"] == 2
+        assert any("email" in error.lower() for error in message["errors"])
+        assert engine.documents == []
+
+    def test_foreign_origin_rejected(self, client):
+        """Pages from origins outside ALLOWED_ORIGINS can't open a preview."""
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(
+                PREVIEW_URL, headers={**AUTH, "Origin": "https://evil.example"}
+            ) as websocket:
+                websocket.receive_json()
+
+        assert exc_info.value.code == 1008
+
+    def test_key_accepted_as_subprotocol(self, client, engine):
+        """Browsers pass the key as a subprotocol and get resume-preview back."""
+        key = base64.urlsafe_b64encode(API_SECRET.encode()).decode().rstrip("=")
+        with client.websocket_connect(PREVIEW_URL, subprotocols=["resume-preview", f"key.{key}"]) as websocket:
+            websocket.send_json({"revision": 1, "yaml_content": YAML})
+            header = websocket.receive_json()
+
+        assert websocket.accepted_subprotocol == "resume-preview"
+        assert header["type"] == "rendered"
+
+    def test_key_in_query_rejected(self, client):
+        """The key isn't read from the URL, where access logs would record it."""
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(f"{PREVIEW_URL}?api_key={API_SECRET}") as websocket:
+                websocket.receive_json()
+
+        assert exc_info.value.code == 1008
+
+    def test_busy_server_reports_retry_after(self, client, engine, monkeypatch):
+        """Previews go through admission control and say when to retry."""
+        admission = AdmissionController(concurrency=1, max_wait=30, initial=2)
+        for _ in range(45):
+            admission.start("classic")
+        monkeypatch.setattr(rendering, "_admission", admission)
+
+        with client.websocket_connect(PREVIEW_URL, headers=AUTH) as websocket:
+            websocket.send_json({"revision": 1, "yaml_content": YAML})
+            message = websocket.receive_json()
+
+        assert message["type"] == "error"
+        assert message["retry_after"] == 60
+        assert engine.documents == []
+
+    def test_unexpected_error_reported_and_session_kept(self, client, engine, monkeypatch):
+        """A render failing with any exception is reported, and the next revision still renders."""
+        render = main.render
+        calls = 0
+
+        async def fail_once(document, formats):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise OSError("disk full")
+            return await render(document, formats)
+
+        monkeypatch.setattr(main, "render", fail_once)
+        with client.websocket_connect(PREVIEW_URL, headers=AUTH) as websocket:
+            websocket.send_json({"revision": 1, "yaml_content": YAML})
+            error = websocket.receive_json()
+            websocket.send_json({"revision": 2, "yaml_content": YAML})
+            header = websocket.receive_json()
+
+        assert error == {"type": "error", "detail": "Rendering failed unexpectedly", "revision": 1}
+        assert header["type"] == "rendered"
+        assert header["revision"] == 2
+
+    def test_session_cap(self, client, monkeypatch):
+        """Connections beyond PREVIEW_MAX_SESSIONS are told to come back later."""
+        monkeypatch.setattr(main, "PREVIEW_MAX_SESSIONS", 0)
+
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(PREVIEW_URL, headers=AUTH) as websocket:
+                websocket.receive_json()
+
+        assert exc_info.value.code == 1013
+
+    def test_connections_rate_limited(self, client, monkeypatch):
+        """Each client address may only open so many previews a minute."""
+        monkeypatch.setattr(main, "PREVIEW_CONNECTION_LIMIT", parse("1/minute"))
+        limiter.reset()
+        limited = RATE_LIMITED.value(route="/preview")
+
+        with client.websocket_connect(PREVIEW_URL, headers=AUTH):
+            pass
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(PREVIEW_URL, headers=AUTH) as websocket:
+                websocket.receive_json()
+
+        assert exc_info.value.code == 1008
+        assert RATE_LIMITED.value(route="/preview") == limited + 1
+        limiter.reset()
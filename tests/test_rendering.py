@@ -0,0 +1,163 @@
+"""Tests for the rendercv rendering engines."""
+
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from api import rendering
+from api.rendering import InProcessEngine, RenderResult, SubprocessEngine, check_formats
+
+
+class TestEngineSelection:
+    """Tests for choosing the render engine from configuration."""
+
+    def test_known_engines_registered(self):
+        """Both engines can be selected by name."""
+        assert rendering.ENGINES["inprocess"] is InProcessEngine
+        assert rendering.ENGINES["subprocess"] is SubprocessEngine
+
+    def test_unknown_engine_rejected(self, monkeypatch):
+        """An unknown RENDER_ENGINE fails loudly instead of falling back."""
+        monkeypatch.setattr(rendering, "RENDER_ENGINE", "latex")
+        monkeypatch.setattr(rendering, "_engine", None)
+
+        with pytest.raises(RuntimeError, match="Unknown RENDER_ENGINE"):
+            rendering.get_engine()
+
+    def test_engine_is_reused(self, monkeypatch):
+        """The engine is created once and shared between renders."""
+        monkeypatch.setattr(rendering, "RENDER_ENGINE", "inprocess")
+        monkeypatch.setattr(rendering, "_engine", None)
+
+        assert rendering.get_engine() is rendering.get_engine()
+
+
+class TestInProcessEngine:
+    """Tests for rendering through rendercv's Python API."""
+
+    def test_invalid_yaml(self, tmp_path):
+        """Unparseable YAML is reported as a render failure."""
+        with pytest.raises(HTTPException) as exc_info:
+            InProcessEngine().render("not: valid: yaml: content:", ("pdf",), tmp_path)
+
+        assert exc_info.value.status_code == 500
+        assert "rendercv failed" in exc_info.value.detail
+
+    def test_schema_error_mentions_location(self, tmp_path):
+        """rendercv validation errors point at the offending field."""
+        with pytest.raises(HTTPException) as exc_info:
+            InProcessEngine().render("cv:\n  name: Jane\ndesign:\n  theme: nope\n", ("pdf",), tmp_path)
+
+        assert exc_info.value.status_code == 500
+        assert "design" in exc_info.value.detail
+
+    def test_dict_document_rendered_without_yaml(self, tmp_path):
+        """A rendercv dict is validated directly and gives the same output as YAML."""
+        document = {"cv": {"name": "Jane Doe"}, "design": {"theme": "classic"}}
+
+        from_dict = InProcessEngine().render(document, ("markdown",), tmp_path / "dict")
+        from_yaml = InProcessEngine().render(
+            "cv:\n  name: Jane Doe\ndesign:\n  theme: classic\n", ("markdown",), tmp_path / "yaml"
+        )
+
+        assert from_dict.markdown.read_text() == from_yaml.markdown.read_text()
+        assert document == {"cv": {"name": "Jane Doe"}, "design": {"theme": "classic"}}
+
+    def test_dict_schema_error_mentions_location(self, tmp_path):
+        """Validation errors for dicts point at the offending field too."""
+        with pytest.raises(HTTPException) as exc_info:
+            InProcessEngine().render({"cv": {"name": "Jane", "email": "nope"}}, ("pdf",), tmp_path)
+
+        assert "cv.email" in exc_info.value.detail
+
+
+class TestFormats:
+    """Tests for rendering only the requested formats."""
+
+    def test_unknown_format_rejected(self):
+        """Formats outside FORMATS are a client error."""
+        with pytest.raises(HTTPException) as exc_info:
+            check_formats(["pdf", "docx"])
+
+        assert exc_info.value.status_code == 400
+        assert "docx" in exc_info.value.detail
+
+    def test_duplicate_formats_collapsed(self):
+        """Repeated formats are rendered once, keeping request order."""
+        assert check_formats(["html", "pdf", "html"]) == ("html", "pdf")
+
+    def test_markdown_only_skips_typst(self, tmp_path):
+        """Asking for Markdown doesn't produce Typst, PDF or PNG output."""
+        result = InProcessEngine().render(
+            "cv:\n  name: Jane Doe\ndesign:\n  theme: classic\n", ("markdown",), tmp_path
+        )
+
+        assert "Jane Doe" in result.markdown.read_text()
+        assert result.pdf is None
+        assert result.typst is None
+        assert result.png == []
+        assert [path.name for path in tmp_path.iterdir()] == ["resume.md"]
+
+    def test_html_includes_markdown_intermediate(self, tmp_path):
+        """HTML is built from the Markdown intermediate in the same render."""
+        result = InProcessEngine().render(
+            "cv:\n  name: Jane Doe\ndesign:\n  theme: classic\n", ("html", "markdown"), tmp_path
+        )
+
+        assert "Jane Doe" in result.html.read_text()
+        assert "Jane Doe" in result.markdown.read_text()
+
+
+class TestRenderResultFiles:
+    """Tests for naming rendered artifacts."""
+
+    def test_files_named_after_stem(self):
+        """Each artifact gets the stem plus its extension; PNGs are numbered."""
+        result = RenderResult(
+            pdf=Path("resume.pdf"),
+            markdown=Path("resume.md"),
+            png=[Path("resume_1.png"), Path("resume_2.png")],
+        )
+
+        assert result.files("Jane_CV") == [
+            ("Jane_CV.pdf", Path("resume.pdf")),
+            ("Jane_CV.md", Path("resume.md")),
+            ("Jane_CV_1.png", Path("resume_1.png")),
+            ("Jane_CV_2.png", Path("resume_2.png")),
+        ]
+
+    def test_cleanup_removes_directory(self, tmp_path):
+        """cleanup() deletes the render directory and everything in it."""
+        directory = tmp_path / "render"
+        directory.mkdir()
+        (directory / "resume.pdf").write_bytes(b"pdf")
+
+        RenderResult(directory=directory).cleanup()
+
+        assert not directory.exists()
+
+
+class TestCancelledRender:
+    """Tests for callers that stop waiting for a render."""
+
+    @pytest.mark.asyncio
+    async def test_slot_held_until_thread_finishes(self, make_engine, scratch_pool, monkeypatch):
+        """Cancelling the caller keeps the slot until the render ends, then discards its output."""
+        import asyncio
+
+        engine = make_engine(delay=5, cancellable=False)
+        monkeypatch.setattr(rendering, "_render_slots", asyncio.Semaphore(1))
+
+        task = asyncio.create_task(rendering.render("cv: {}"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert rendering._render_slots.locked()
+
+        engine.release.set()
+        await asyncio.to_thread(engine.finished.wait, 5)
+        await asyncio.sleep(0.05)
+        assert not rendering._render_slots.locked()
+        assert scratch_pool.stats()["in_use"] == 0
@@ -0,0 +1,85 @@
+"""Tests for the reusable render scratch directories."""
+
+from api import scratch
+from api.scratch import ScratchPool, clear_directory
+
+
+class TestScratchRoot:
+    """Tests for choosing where scratch space lives."""
+
+    def test_explicit_directory(self, monkeypatch, tmp_path):
+        """RENDER_SCRATCH_DIR overrides the automatic choice."""
+        monkeypatch.setattr(scratch, "RENDER_SCRATCH_DIR", str(tmp_path / "scratch"))
+
+        assert scratch.scratch_root() == tmp_path / "scratch"
+        assert (tmp_path / "scratch").is_dir()
+
+    def test_falls_back_without_shm(self, monkeypatch, tmp_path):
+        """Without /dev/shm the system temp directory is used."""
+        monkeypatch.setattr(scratch, "SHM_DIR", tmp_path / "missing")
+
+        assert scratch.scratch_root() != tmp_path / "missing"
+
+
+class TestScratchPool:
+    """Tests for handing out and reusing scratch directories."""
+
+    def test_released_directory_reused_empty(self, tmp_path):
+        """A released directory comes back wiped on the next acquire."""
+        pool = ScratchPool(tmp_path, keep=2)
+        first = pool.acquire()
+        (first / "resume.pdf").write_bytes(b"pdf")
+        (first / "nested").mkdir()
+        pool.release(first)
+
+        second = pool.acquire()
+
+        assert second == first
+        assert list(second.iterdir()) == []
+        assert pool.stats()["reused"] == 1
+
+    def test_extra_directories_deleted(self, tmp_path):
+        """Only `keep` directories are kept; the rest are removed."""
+        pool = ScratchPool(tmp_path, keep=1)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+
+        assert first.exists()
+        assert not second.exists()
+        assert pool.stats()["free"] == 1
+
+    def test_foreign_directory_deleted(self, tmp_path):
+        """Directories the pool didn't create are deleted, not kept."""
+        pool = ScratchPool(tmp_path / "root", keep=2)
+        foreign = tmp_path / "foreign"
+        foreign.mkdir()
+        pool.release(foreign)
+
+        assert not foreign.exists()
+        assert pool.stats()["free"] == 0
+
+    def test_close_removes_everything(self, tmp_path):
+        """close() deletes both free and in-use directories."""
+        pool = ScratchPool(tmp_path, keep=2)
+        in_use, free = pool.acquire(), pool.acquire()
+        pool.release(free)
+        pool.close()
+
+        assert list(tmp_path.iterdir()) == []
+        assert not in_use.exists()
+
+
+class TestClearDirectory:
+    """Tests for wiping a scratch directory between jobs."""
+
+    def test_keeps_directory(self, tmp_path):
+        """clear_directory empties a directory without removing it."""
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "b.txt").write_text("b")
+
+        clear_directory(tmp_path)
+
+        assert tmp_path.is_dir()
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,39 @@
+"""Tests for the YAML serialization helpers."""
+
+import pytest
+import yaml
+
+from api.main import ResumeData, resume_to_yaml
+from api.serialization import dump_yaml, load_yaml, load_yaml_without_aliases
+
+
+class TestYamlSerialization:
+    """Tests that the fast path emits and parses the same YAML as PyYAML's Python code."""
+
+    def test_output_matches_pure_python_dumper(self):
+        """dump_yaml output is byte-for-byte what the pure-Python dumper produces."""
+        data = resume_to_yaml(ResumeData(
+            name="Zoë Ångström",
+            summary="Builds things — quickly. " * 20,
+            experience=[{"company": "Acme", "position": "Engineer", "start_date": "2020-01",
+                         "highlights": ["Cut costs by **30%**"]}],
+        ))
+
+        expected = yaml.dump(data, Dumper=yaml.SafeDumper, default_flow_style=False,
+                             allow_unicode=True, sort_keys=False)
+        assert dump_yaml(data) == expected
+
+    def test_roundtrip(self):
+        """Loading dumped YAML gives back the same data, in order."""
+        data = {"cv": {"name": "Jane", "sections": {"b": [1, 2], "a": None}}}
+
+        loaded = load_yaml(dump_yaml(data))
+
+        assert loaded == data
+        assert list(loaded["cv"]["sections"]) == ["b", "a"]
+
+    def test_aliases_rejected(self):
+        """The alias-free loader refuses documents that reuse a node."""
+        assert load_yaml_without_aliases("cv:\n  name: A\n  tags: [a, a]\n") == {"cv": {"name": "A", "tags": ["a", "a"]}}
+        with pytest.raises(yaml.YAMLError):
+            load_yaml_without_aliases("a: &x [1, 2]\nb: *x\n")
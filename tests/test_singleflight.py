@@ -0,0 +1,156 @@
+"""Tests for sharing one render between identical concurrent requests."""
+
+import asyncio
+import fcntl
+import os
+
+import pytest
+
+from api import cache, main, scratch
+from api.cache import DiskCache
+from api.metrics import RENDERS_COALESCED
+from api.rendering import RenderResult
+from api.scratch import ScratchPool
+from api.singleflight import SingleFlight, file_lock
+
+YAML = "cv:\n  name: Jane Doe\n"
+
+
+@pytest.fixture
+def engine(make_engine, monkeypatch, tmp_path):
+    """A render that takes a moment, into a pool that deletes released directories."""
+    monkeypatch.setattr(scratch, "_scratch", ScratchPool(tmp_path, keep=0))
+    monkeypatch.setattr(main, "_pdf_flights", SingleFlight(cleanup=RenderResult.cleanup))
+    return make_engine(delay=0.1)
+
+
+class TestSingleFlight:
+    """Tests for in-process coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Callers with the same key get one result, cleaned up after the last release."""
+        calls, cleaned = [], []
+
+        async def start():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        flights = SingleFlight(cleanup=cleaned.append)
+        coalesced = RENDERS_COALESCED.value()
+        first, second = await asyncio.gather(flights.join("key", start), flights.join("key", start))
+
+        assert first is second
+        assert calls == [1]
+        assert RENDERS_COALESCED.value() == coalesced + 1
+        first.release()
+        assert cleaned == []
+        second.release()
+        assert cleaned == ["result"]
+
+    @pytest.mark.asyncio
+    async def test_abandoned_call_cancelled(self):
+        """When every caller gives up, the call is cancelled and the next caller starts anew."""
+        cancelled = asyncio.Event()
+
+        async def start():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        flights = SingleFlight()
+        waiter = asyncio.create_task(flights.join("key", start))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+        assert not flights.in_flight("key")
+
+    @pytest.mark.asyncio
+    async def test_one_leaving_caller_keeps_call_running(self):
+        """A caller giving up doesn't cancel the call for the others."""
+
+        async def start():
+            await asyncio.sleep(0.05)
+            return "result"
+
+        flights = SingleFlight()
+        leaving = asyncio.create_task(flights.join("key", start))
+        staying = asyncio.create_task(flights.join("key", start))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+
+        assert (await staying).result == "result"
+
+
+class TestSharedPdfRender:
+    """Tests for identical PDF requests sharing a render."""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_render_once(self, engine, monkeypatch):
+        """Concurrent identical documents are rendered once and all get the same bytes."""
+        key = cache.cache_key(YAML)
+
+        results = await asyncio.gather(*(main.cached_render_pdf(key, YAML) for _ in range(4)))
+
+        assert engine.calls == 1
+        assert {pdf for pdf, _ in results} == {b"%PDF-1.7 " + YAML.encode()}
+
+    @pytest.mark.asyncio
+    async def test_render_directory_kept_until_last_release(self, engine, monkeypatch):
+        """The shared render directory is removed only after every request released it."""
+        monkeypatch.setattr(cache, "_cache", cache.CacheBackend())
+        key = cache.cache_key(YAML)
+
+        first, second = await asyncio.gather(
+            main.shared_pdf_render(key, YAML), main.shared_pdf_render(key, YAML)
+        )
+        pdf = first.result.pdf
+        first.release()
+        assert pdf.exists()
+        second.release()
+        assert not pdf.exists()
+
+    @pytest.mark.asyncio
+    async def test_other_process_render_awaited(self, engine, monkeypatch, tmp_path):
+        """With a disk cache, a render locked by another worker is waited for and served from the cache."""
+        disk = DiskCache(tmp_path, 1024 * 1024)
+        monkeypatch.setattr(cache, "_cache", disk)
+        key = cache.cache_key(YAML)
+
+        # Another uvicorn worker holds the lock while it renders
+        fd = os.open(disk.lock_path(key), os.O_RDWR | os.O_CREAT)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        waiting = asyncio.create_task(main.render_pdf_once(key, YAML))
+        await asyncio.sleep(0.2)
+        assert not waiting.done()
+        disk.set(key, b"%PDF-1.7 other worker")
+        os.close(fd)
+
+        result = await asyncio.wait_for(waiting, 2)
+        assert result.pdf.read_bytes() == b"%PDF-1.7 other worker"
+        assert engine.calls == 0
+
+
+class TestFileLock:
+    """Tests for the cross-process lock file."""
+
+    @pytest.mark.asyncio
+    async def test_exclusive_and_removed(self, tmp_path):
+        """Only one holder at a time, and the file is gone afterwards."""
+        path = tmp_path / "key.lock"
+        order = []
+
+        async def hold(name):
+            async with file_lock(path):
+                order.append(f"{name} in")
+                await asyncio.sleep(0.15)
+                order.append(f"{name} out")
+
+        await asyncio.gather(hold("a"), hold("b"))
+
+        assert order in (["a in", "a out", "b in", "b out"], ["b in", "b out", "a in", "a out"])
+        assert not path.exists()
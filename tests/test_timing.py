@@ -0,0 +1,78 @@
+"""Tests for per-request timing spans and the Server-Timing header."""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from api import main, timing
+from api.main import app
+
+
+def header_spans(header: str) -> dict[str, float]:
+    spans = {}
+    for entry in header.split(", "):
+        name, duration = entry.split(";dur=")
+        spans[name] = float(duration)
+    return spans
+
+
+class TestSpans:
+    """Tests for span collection."""
+
+    def test_same_name_summed(self):
+        """Repeated spans of one name add up instead of growing the header."""
+        with timing.collect() as spans:
+            timing.record("render", 0.25)
+            timing.record("render", 0.5)
+
+        assert spans == {"render": 0.75}
+
+    def test_nothing_collected_outside_a_request(self):
+        """Spans recorded with no collection active are only observed in metrics."""
+        with timing.collect() as spans:
+            pass
+        timing.record("render", 0.1)
+
+        assert spans == {}
+
+    def test_server_timing_format(self):
+        """Durations are reported in milliseconds."""
+        assert timing.server_timing({"validation": 0.0012, "render": 0.5}) == (
+            "validation;dur=1.2, render;dur=500.0"
+        )
+
+
+class TestServerTimingHeader:
+    """Tests for the Server-Timing header on API responses."""
+
+    @pytest.mark.asyncio
+    async def test_generate_reports_stages(self, engine):
+        """A /generate response breaks its time down by stage."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/generate", json={"name": "Jane Doe"})
+
+        assert response.status_code == 200
+        spans = header_spans(response.headers["server-timing"])
+        for name in ("validation", "resume_to_yaml", "render_queue", "render", "pdf_compile", "total"):
+            assert name in spans
+        assert spans["total"] >= spans["render"]
+
+    @pytest.mark.asyncio
+    async def test_spans_not_shared_between_requests(self, engine):
+        """Each request reports only its own spans."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/generate", json={"name": "Jane Doe"})
+            response = await client.get("/health")
+
+        assert list(header_spans(response.headers["server-timing"])) == ["total"]
+
+    @pytest.mark.asyncio
+    async def test_header_disabled(self, monkeypatch):
+        """SERVER_TIMING=false leaves the header out."""
+        monkeypatch.setattr(main, "SERVER_TIMING", False)
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/health")
+
+        assert "server-timing" not in response.headers
@@ -0,0 +1,110 @@
+"""Tests for the per-theme Typst compiler cache."""
+
+import threading
+
+import pytest
+
+from api.rendering import InProcessEngine
+from api.typst_compilers import TypstCompilerCache
+
+
+class FakeCompiler:
+    """Stands in for typst.Compiler and records what it compiled."""
+
+    def __init__(self):
+        self.calls = []
+
+    def compile(self, input=None, output=None, format=None, root=None):
+        self.calls.append((format, input))
+        if output is not None:
+            output.write_bytes(b"%PDF-1.7")
+            return None
+        return [b"page1", b"page2"]
+
+
+@pytest.fixture
+def fake_compilers(monkeypatch):
+    created = []
+
+    def create(self):
+        created.append(FakeCompiler())
+        return created[-1]
+
+    monkeypatch.setattr(TypstCompilerCache, "_create", create)
+    return created
+
+
+class TestTypstCompilerCache:
+    """Tests for borrowing and returning compilers."""
+
+    def test_compiler_reused_for_same_theme(self, fake_compilers):
+        """A returned compiler is handed out again for the same theme."""
+        cache = TypstCompilerCache()
+        with cache.compiler("classic") as first:
+            pass
+        with cache.compiler("classic") as second:
+            pass
+
+        assert first is second
+        assert cache.stats()["compilers_created"] == 1
+        assert cache.stats()["compilers_reused"] == 1
+
+    def test_themes_get_separate_compilers(self, fake_compilers):
+        """Each theme keeps its own compiler."""
+        cache = TypstCompilerCache()
+        with cache.compiler("classic") as classic:
+            pass
+        with cache.compiler("sb2nov") as sb2nov:
+            pass
+
+        assert classic is not sb2nov
+        assert cache.stats()["themes"] == ["classic", "sb2nov"]
+
+    def test_busy_compiler_not_shared(self, fake_compilers):
+        """Concurrent renders of one theme never share a compiler."""
+        cache = TypstCompilerCache()
+        inside = threading.Event()
+        release = threading.Event()
+        borrowed = []
+
+        def hold():
+            with cache.compiler("classic") as compiler:
+                borrowed.append(compiler)
+                inside.set()
+                release.wait(timeout=5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        inside.wait(timeout=5)
+        with cache.compiler("classic") as other:
+            borrowed.append(other)
+        release.set()
+        thread.join()
+
+        assert borrowed[0] is not borrowed[1]
+
+
+class TestInProcessEngineCompilers:
+    """Tests that the in-process engine compiles with cached compilers."""
+
+    def test_successive_renders_share_compiler(self, fake_compilers, tmp_path):
+        """Two renders of the same theme use one compiler for PDF and PNG."""
+        engine = InProcessEngine()
+        document = {"cv": {"name": "Jane Doe"}, "design": {"theme": "classic"}}
+        for name in ("first", "second"):
+            (tmp_path / name).mkdir()
+            result = engine.render(document, ("pdf", "png"), tmp_path / name)
+
+        assert len(fake_compilers) == 1
+        assert [fmt for fmt, _ in fake_compilers[0].calls] == ["pdf", "png", "pdf", "png"]
+        assert fake_compilers[0].calls[-1][1] == tmp_path / "second" / "resume.typ"
+        assert result.pdf.read_bytes() == b"%PDF-1.7"
+        assert [path.name for path in result.png] == ["resume_1.png", "resume_2.png"]
+
+    def test_warm_up_compiles_every_theme(self, fake_compilers):
+        """Warm-up leaves one ready compiler per theme."""
+        engine = InProcessEngine()
+        engine.warm_up(["classic", "sb2nov"])
+
+        assert engine.compilers.stats()["themes"] == ["classic", "sb2nov"]
+        assert len(fake_compilers) == 2
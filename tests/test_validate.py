@@ -0,0 +1,142 @@
+"""Tests for the standalone /validate endpoint."""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from api import main
+from api.main import app, limiter
+
+RESUME = {
+    "name": "Jane Doe",
+    "experience": [
+        {"company": "Acme", "position": "Engineer", "start_date": "2020-01"},
+        {"company": "Globex", "position": "Lead", "start_date": "2022-05"},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    monkeypatch.setattr(main, "_validated_documents", main.OrderedDict())
+
+
+async def post_validate(payload):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/validate", json=payload)
+
+
+async def validated_id():
+    response = await post_validate({"document": RESUME})
+    assert response.status_code == 200
+    return response.json()["document_id"]
+
+
+class TestFullValidation:
+    """Tests for validating a whole document."""
+
+    @pytest.mark.asyncio
+    async def test_valid_document(self):
+        """A valid resume is accepted and gets an id for later patches."""
+        response = await post_validate({"document": RESUME})
+
+        assert response.json()["valid"] is True
+        assert response.json()["document_id"] in main._validated_documents
+
+    @pytest.mark.asyncio
+    async def test_invalid_document_uses_friendly_errors(self):
+        """Errors have the same shape as the rest of the API."""
+        response = await post_validate({"document": {"name": "Jane", "email": "nope"}})
+
+        assert response.status_code == 422
+        assert response.json()["errors"] == [
+            "Email: Please enter a valid email address (e.g., name@example.com)"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_empty_request_rejected(self):
+        """A request needs a document or a patch."""
+        response = await post_validate({})
+
+        assert response.status_code == 422
+
+
+class TestPatchValidation:
+    """Tests for revalidating one section of a stored document."""
+
+    @pytest.mark.asyncio
+    async def test_valid_entry_patch_is_stored(self):
+        """A valid entry replaces the stored one."""
+        document_id = await validated_id()
+        response = await post_validate({
+            "document_id": document_id,
+            "path": "experience[1]",
+            "value": {"company": "Initech", "position": "Lead", "start_date": "2023-01"},
+        })
+
+        assert response.status_code == 200
+        assert main._validated_documents[document_id].experience[1].company == "Initech"
+
+    @pytest.mark.asyncio
+    async def test_invalid_entry_patch(self):
+        """Errors in a patched entry name the field, and the stored document is kept."""
+        document_id = await validated_id()
+        response = await post_validate({
+            "document_id": document_id,
+            "path": "experience[0]",
+            "value": {"company": "Acme", "position": "Engineer", "start_date": "Jan 2020"},
+        })
+
+        assert response.status_code == 422
+        assert response.json()["errors"][0].startswith("Start Date:")
+        assert main._validated_documents[document_id].experience[0].start_date == "2020-01"
+
+    @pytest.mark.asyncio
+    async def test_append_entry(self):
+        """Patching one past the last index appends an entry."""
+        document_id = await validated_id()
+        await post_validate({
+            "document_id": document_id,
+            "path": "experience[2]",
+            "value": {"company": "Hooli", "position": "CTO", "start_date": "2024"},
+        })
+
+        assert len(main._validated_documents[document_id].experience) == 3
+
+    @pytest.mark.asyncio
+    async def test_scalar_field_patch(self):
+        """Top-level fields are validated with their own rules."""
+        document_id = await validated_id()
+        response = await post_validate({"document_id": document_id, "path": "phone", "value": "12"})
+
+        assert response.status_code == 422
+        assert response.json()["errors"][0].startswith("Phone:")
+
+    @pytest.mark.asyncio
+    async def test_stackoverflow_rule_applies_to_entry(self):
+        """Rules spanning an entry's fields run on patched entries too."""
+        document_id = await validated_id()
+        response = await post_validate({
+            "document_id": document_id,
+            "path": "social_networks[0]",
+            "value": {"network": "StackOverflow", "username": "jane"},
+        })
+
+        assert response.status_code == 422
+        assert "user_id/username" in response.json()["errors"][0]
+
+    @pytest.mark.asyncio
+    async def test_unknown_document_id(self):
+        """Expired ids ask the client to resend the document."""
+        response = await post_validate({"document_id": "missing", "path": "phone", "value": None})
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_bad_paths(self):
+        """Unknown fields, out-of-range indexes and indexed scalars are rejected."""
+        document_id = await validated_id()
+        for path in ("nickname", "experience[5]", "phone[0]"):
+            response = await post_validate({"document_id": document_id, "path": path, "value": None})
+            assert response.status_code == 400, path
@@ -176,3 +176,38 @@ class TestValidation:
         assert "errors" in data
         # Should have multiple errors
         assert len(data["errors"]) >= 2
+
+
+class TestFieldTypes:
+    """Tests for the shared field types in api.validation."""
+
+    def test_required_str_strips_whitespace(self):
+        """Required strings are stripped and blank ones rejected."""
+        from pydantic import ValidationError
+        from api.main import SkillEntry
+
+        assert SkillEntry(label="  Languages ", details="Python").label == "Languages"
+        with pytest.raises(ValidationError, match="cannot be empty"):
+            SkillEntry(label="   ", details="Python")
+
+    def test_optional_dates_normalized(self):
+        """Empty optional dates become None and 'Present' is lower-cased."""
+        from api.main import EducationEntry
+
+        entry = EducationEntry(institution="MIT", area="CS", start_date="", end_date="Present")
+        assert entry.start_date is None
+        assert entry.end_date == "present"
+
+    def test_date_must_match_whole_value(self):
+        """Trailing characters after a valid date are rejected."""
+        from pydantic import ValidationError
+        from api.main import ExperienceEntry
+
+        with pytest.raises(ValidationError, match="YYYY-MM"):
+            ExperienceEntry(company="Acme", position="Dev", start_date="2020-01x")
+
+    def test_phone_punctuation_removed(self):
+        """Spaces, dashes and parentheses are removed from phone numbers."""
+        from api.main import ResumeData
+
+        assert ResumeData(name="Jane", phone="+1 (415) 555-1234").phone == "+14155551234"
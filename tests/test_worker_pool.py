@@ -0,0 +1,65 @@
+"""Tests for the pre-warmed rendercv worker pool."""
+
+import pytest
+from fastapi import HTTPException
+
+from api.worker_pool import RenderWorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = RenderWorkerPool(size=1, max_jobs=2)
+    yield pool
+    pool.close()
+
+
+class TestRenderWorkerPool:
+    """Tests for job dispatch, error reporting and worker recycling."""
+
+    def test_render_error_is_reported(self, pool, tmp_path):
+        """rendercv errors in a worker surface as HTTP errors in the caller."""
+        with pytest.raises(HTTPException) as exc_info:
+            pool.render("not: valid: yaml: content:", ("pdf",), tmp_path)
+
+        assert exc_info.value.status_code == 500
+        assert "rendercv failed" in exc_info.value.detail
+
+    def test_stats_track_jobs(self, pool, tmp_path):
+        """Completed jobs are counted and the worker returns to idle."""
+        with pytest.raises(HTTPException):
+            pool.render("not: valid: yaml: content:", ("pdf",), tmp_path)
+
+        stats = pool.stats()
+        assert stats["jobs_completed"] == 1
+        assert stats["busy"] == 0
+        assert stats["idle"] == 1
+        assert stats["queue_depth"] == 0
+
+    def test_worker_recycled_after_max_jobs(self, pool, tmp_path):
+        """A worker is replaced once it has served max_jobs renders."""
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                pool.render({"cv": {"name": "Jane"}, "design": {"theme": "nope"}}, ("pdf",), tmp_path)
+
+        assert pool.stats()["workers_recycled"] == 1
+        assert pool.stats()["idle"] == 1
+
+    def test_closed_pool_rejects_jobs(self, pool, tmp_path):
+        """Rendering after shutdown fails fast with 503."""
+        pool.close()
+
+        with pytest.raises(HTTPException) as exc_info:
+            pool.render("cv:\n  name: Jane\n", ("pdf",), tmp_path)
+
+        assert exc_info.value.status_code == 503
+
+    def test_wait_ready_reports_warm_up(self, tmp_path):
+        """Workers report per-theme warm-up timings once they are ready."""
+        pool = RenderWorkerPool(size=1, warmup_themes=("classic",))
+        try:
+            (timings,) = pool.wait_ready()
+        finally:
+            pool.close()
+
+        assert list(timings) == ["classic"]
+        assert timings["classic"]["seconds"] >= 0
@@ -1,11 +1,11 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { Button } from "@/components/ui/button";
 import { Textarea } from "@/components/ui/textarea";
 import { Label } from "@/components/ui/label";
 import { Download, FileText, AlertCircle } from "lucide-react";
-import { renderYaml } from "@/lib/api";
+import { openPreview, renderYaml, type PreviewChannel } from "@/lib/api";
 
 interface YamlEditorProps {
     onRenderPdf: (yaml: string) => void;
@@ -16,6 +16,38 @@ export function YamlEditor({ onRenderPdf, isLoading }: YamlEditorProps) {
     const [yaml, setYaml] = useState("");
     const [error, setError] = useState<string | null>(null);
     const [rendering, setRendering] = useState(false);
+    const [previewPages, setPreviewPages] = useState<string[]>([]);
+    const [previewErrors, setPreviewErrors] = useState<string[]>([]);
+    const preview = useRef<PreviewChannel | null>(null);
+
+    useEffect(() => {
+        preview.current = openPreview({
+            onRender: ({ pages }) => {
+                setPreviewErrors([]);
+                setPreviewPages((previous) => {
+                    previous.forEach((url) => URL.revokeObjectURL(url));
+                    return pages.map((page) => URL.createObjectURL(page));
+                });
+            },
+            onError: (_revision, errors) => setPreviewErrors(errors),
+        });
+        return () => {
+            preview.current?.close();
+            preview.current = null;
+            setPreviewPages((previous) => {
+                previous.forEach((url) => URL.revokeObjectURL(url));
+                return [];
+            });
+        };
+    }, []);
+
+    const handleChange = (value: string) => {
+        setYaml(value);
+        // Sent on every keystroke; the server only renders the latest revision
+        if (value.trim()) {
+            preview.current?.send(value);
+        }
+    };
 
     const handleRender = async () => {
         if (!yaml.trim()) {
@@ -56,7 +88,7 @@ export function YamlEditor({ onRenderPdf, isLoading }: YamlEditorProps) {
                 <Label>Paste RenderCV YAML</Label>
                 <Textarea
                     value={yaml}
-                    onChange={(e) => setYaml(e.target.value)}
+                    onChange={(e) => handleChange(e.target.value)}
                     placeholder={`cv:
   name: John Doe
   headline: Software Engineer
@@ -74,6 +106,29 @@ export function YamlEditor({ onRenderPdf, isLoading }: YamlEditorProps) {
                 />
             </div>
 
+            {previewErrors.length > 0 && (
+                <div className="flex items-start gap-2 text-muted-foreground">
+                    <AlertCircle className="h-4 w-4 mt-0.5" />
+                    <ul className="text-sm">
+                        {previewErrors.map((previewError) => (
+                            <li key={previewError}>{previewError}</li>
+                        ))}
+                    </ul>
+                </div>
+            )}
+
+            {previewPages.length > 0 && (
+                <div className="space-y-2">
+                    <Label>Preview</Label>
+                    <div className="grid gap-2">
+                        {previewPages.map((url, page) => (
+                            // eslint-disable-next-line @next/next/no-img-element
+                            <img key={url} src={url} alt={`Page ${page + 1}`} className="w-full border rounded" />
+                        ))}
+                    </div>
+                </div>
+            )}
+
             {error && (
                 <div className="flex items-center gap-2 text-destructive">
                     <AlertCircle className="h-4 w-4" />
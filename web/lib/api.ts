@@ -145,3 +145,103 @@ export async function renderYaml(yamlContent: string): Promise<Blob> {
 
     return response.blob();
 }
+
+export interface PreviewRender {
+    revision: number;
+    format: "png" | "pdf";
+    // One blob per page for PNG, a single PDF blob otherwise
+    pages: Blob[];
+}
+
+export interface PreviewHandlers {
+    onRender: (preview: PreviewRender) => void;
+    onError: (revision: number | null, errors: string[]) => void;
+}
+
+export interface PreviewChannel {
+    send: (yamlContent: string) => void;
+    close: () => void;
+}
+
+// Live preview over a WebSocket. Send every edit: the server coalesces
+// bursts and cancels renders superseded by a newer revision, so only the
+// latest revision comes back.
+//
+// Protocol: the API key is offered as a subprotocol, "key." plus the
+// base64url key, next to "resume-preview" (other clients may send
+// X-API-Key instead). Revisions are JSON, {revision, yaml_content} or
+// {revision, resume}. A render is answered with
+// {type: "rendered", revision, format, pages} followed by one binary
+// message per page (one for PDF). Invalid revisions get
+// {type: "invalid", revision, errors} straight away and failed renders
+// {type: "error", revision, detail}, plus retry_after (seconds) when the
+// server is too busy. Close code 1008 means refused, 1013 too many sessions.
+export function openPreview(handlers: PreviewHandlers, format: "png" | "pdf" = "png"): PreviewChannel {
+    const url = new URL("/preview", API_URL);
+    url.protocol = url.protocol === "https:" ? "wss:" : "ws:";
+    url.searchParams.set("format", format);
+
+    // Browsers can't set headers on WebSockets, so the key travels as a
+    // subprotocol rather than in the URL, where it would be logged
+    const key = btoa(API_SECRET).replace(/\+/g, "-").replace(/\//g, "_").replace(/=+$/, "");
+    const socket = new WebSocket(url, ["resume-preview", `key.${key}`]);
+    socket.binaryType = "blob";
+
+    let revision = 0;
+    let unsent: string | null = null;
+    let incoming: PreviewRender & { expected: number } | null = null;
+
+    const deliver = () => {
+        if (incoming && incoming.pages.length === incoming.expected) {
+            const { revision, format, pages } = incoming;
+            incoming = null;
+            handlers.onRender({ revision, format, pages });
+        }
+    };
+
+    socket.onopen = () => {
+        if (unsent !== null) {
+            socket.send(unsent);
+            unsent = null;
+        }
+    };
+
+    socket.onmessage = (event: MessageEvent) => {
+        if (typeof event.data !== "string") {
+            incoming?.pages.push(event.data as Blob);
+            deliver();
+            return;
+        }
+        const message = JSON.parse(event.data);
+        if (message.type === "rendered") {
+            incoming = { revision: message.revision, format: message.format, pages: [], expected: message.pages };
+            deliver();
+        } else if (message.type === "invalid") {
+            handlers.onError(message.revision, message.errors);
+        } else if (message.type === "error") {
+            handlers.onError(message.revision, [message.detail]);
+        }
+    };
+
+    socket.onclose = (event: CloseEvent) => {
+        if (event.code === 1008 || event.code === 1013) {
+            handlers.onError(null, [event.reason || "Preview connection refused"]);
+        }
+    };
+
+    return {
+        send(yamlContent: string) {
+            revision += 1;
+            const message = JSON.stringify({ revision, yaml_content: yamlContent });
+            if (socket.readyState === WebSocket.OPEN) {
+                socket.send(message);
+            } else {
+                // Only the newest revision matters once the socket opens
+                unsent = message;
+            }
+        },
+        close() {
+            socket.close();
+        },
+    };
+}